@@ -2,6 +2,8 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django; WebSocket connections to /ws/boards/<id>/ get the
+board's live events (tasks/streams.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -13,4 +15,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# imported after Django is set up
+from tasks.streams import board_websocket  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        await board_websocket(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
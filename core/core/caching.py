@@ -0,0 +1,18 @@
+from django.conf import settings
+
+
+# -------------------------
+# SHARED CACHE CHECK
+# Cross-request caches that are invalidated on write (workspace roles,
+# user search) only stay correct if every worker sees the invalidation.
+# The locmem default is per process, so they're skipped with it.
+# -------------------------
+PER_PROCESS_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def cache_is_shared(alias="default"):
+    """Whether the cache is shared by all workers (Redis, Memcached, database, files)."""
+    return settings.CACHES[alias]["BACKEND"] not in PER_PROCESS_CACHES
@@ -0,0 +1,198 @@
+import cProfile
+import io
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# REQUEST PROFILING
+# Times every request's SQL (count and duration, through a database
+# execute wrapper), its serializer .data calls and its total, and returns
+# them as a Server-Timing header. Requests slower than SLOW_REQUEST_MS
+# are logged with their statements grouped by normalised SQL, optionally
+# an EXPLAIN ANALYZE of the slowest SELECTs, and, for the
+# PROFILE_SAMPLE_RATE share of requests run under cProfile, the hottest
+# functions. The middleware is sync-only: under ASGI Django runs it in
+# the same thread as the (sync) views, so their queries are seen too.
+# -------------------------
+
+# statements kept per request for the slow-request log
+MAX_STATEMENTS = 500
+SLOW_LOG_STATEMENTS = 20
+PROFILE_LINES = 25
+
+_local = threading.local()
+
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(\.\d+)?\b"), "?"),
+    (re.compile(r"\((?:\?, )+\?\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalise_sql(sql):
+    """SQL with literals replaced by ?, so the same statement compares equal."""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.serializer_ms = 0.0
+        self.serializing = False
+        # (alias, sql, params, ms, many)
+        self.statements = []
+
+    def execute_wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                ms = (time.perf_counter() - started) * 1000
+                self.queries += 1
+                self.sql_ms += ms
+                if len(self.statements) < MAX_STATEMENTS:
+                    self.statements.append((alias, sql, params, ms, many))
+        return wrapper
+
+    def server_timing(self, total_ms):
+        return (
+            f'db;dur={self.sql_ms:.1f};desc="{self.queries} queries", '
+            f"serializer;dur={self.serializer_ms:.1f}, "
+            f"total;dur={total_ms:.1f}"
+        )
+
+
+# -------------------------
+# SERIALIZER TIMING
+# DRF serializes lazily in .data, so the outermost .data call of a
+# request is timed; nested serializers go through to_representation and
+# are part of it.
+# -------------------------
+_serializers_timed = False
+
+
+def _timed_data(data):
+    def timed(self):
+        profile = getattr(_local, "profile", None)
+        if profile is None or profile.serializing:
+            return data.fget(self)
+        profile.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            profile.serializer_ms += (time.perf_counter() - started) * 1000
+            profile.serializing = False
+    return property(timed)
+
+
+def time_serializers():
+    global _serializers_timed
+    if not _serializers_timed:
+        serializers.Serializer.data = _timed_data(serializers.Serializer.data)
+        serializers.ListSerializer.data = _timed_data(serializers.ListSerializer.data)
+        _serializers_timed = True
+
+
+# -------------------------
+# SLOW REQUEST LOG
+# -------------------------
+def _explain(alias, sql, params):
+    """EXPLAIN ANALYZE runs the statement again, so only plain SELECTs get one."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql" or not sql.lstrip().upper().startswith("SELECT") or " FOR UPDATE" in sql:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            return "\n".join(row[0] for row in cursor.fetchall())
+    except DatabaseError as error:
+        return f"EXPLAIN failed: {error}"
+
+
+def slow_request_report(request, response, profile, total_ms, profiler=None):
+    lines = [
+        f"Slow request {request.method} {request.get_full_path()} -> {response.status_code} "
+        f"in {total_ms:.1f} ms (db {profile.sql_ms:.1f} ms over {profile.queries} queries, "
+        f"serializer {profile.serializer_ms:.1f} ms)"
+    ]
+
+    grouped = defaultdict(lambda: [0, 0.0])
+    for _, sql, _, ms, _ in profile.statements:
+        group = grouped[normalise_sql(sql)]
+        group[0] += 1
+        group[1] += ms
+    for sql, (count, ms) in sorted(grouped.items(), key=lambda item: -item[1][1])[:SLOW_LOG_STATEMENTS]:
+        lines.append(f"  {ms:8.1f} ms  x{count:<4} {sql}")
+
+    if settings.SLOW_REQUEST_EXPLAIN:
+        slowest = sorted((s for s in profile.statements if not s[4]), key=lambda s: -s[3])
+        for alias, sql, params, ms, _ in slowest[:settings.SLOW_REQUEST_EXPLAIN_LIMIT]:
+            plan = _explain(alias, sql, params)
+            if plan is not None:
+                lines.append(f"  EXPLAIN ANALYZE ({ms:.1f} ms) {normalise_sql(sql)}")
+                lines.extend(f"    {line}" for line in plan.splitlines())
+
+    if profiler is not None:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        lines.append("  profile:")
+        lines.extend(f"    {line}" for line in out.getvalue().strip().splitlines())
+    return "\n".join(lines)
+
+
+# -------------------------
+# MIDDLEWARE
+# -------------------------
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        time_serializers()
+
+    def __call__(self, request):
+        profile = _local.profile = RequestProfile()
+        profiler = cProfile.Profile() if random.random() < settings.PROFILE_SAMPLE_RATE else None
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.execute_wrapper(connection.alias)))
+                if profiler is not None:
+                    try:
+                        profiler.enable()
+                    except ValueError:
+                        # another profiler is already running in this thread
+                        profiler = None
+                    else:
+                        stack.callback(profiler.disable)
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        response["Server-Timing"] = profile.server_timing(total_ms)
+        if total_ms >= settings.SLOW_REQUEST_MS:
+            logger.warning(slow_request_report(request, response, profile, total_ms, profiler))
+        return response
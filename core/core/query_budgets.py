@@ -0,0 +1,136 @@
+import difflib
+from collections import Counter
+
+from django.urls import resolve
+
+from .profiling import normalise_sql
+
+
+# -------------------------
+# QUERY BUDGETS
+# Most SQL queries one request may run, per viewset action
+# ("TaskViewSet.list") or per view for function and plain API views
+# ("add_workspace_member"). tasks.tests.QueryBudgetTests sends every request
+# in tasks.benchmarks.ENDPOINTS with a cold cache against seeded data at N
+# and 10N rows, and fails when a count is over budget or grows with N.
+# Raise a budget only together with the change that needs the query.
+# -------------------------
+QUERY_BUDGETS = {
+    # projects/views.py
+    "WorkspaceViewSet.list": 2,
+    "WorkspaceViewSet.create": 6,
+    "WorkspaceViewSet.retrieve": 2,
+    "WorkspaceViewSet.update": 4,
+    "WorkspaceViewSet.partial_update": 4,
+    "WorkspaceViewSet.destroy": 7,
+    "WorkspaceViewSet.stats": 5,
+    "WorkspaceViewSet.export": 3,
+    "WorkspaceViewSet.invite_bulk": 8,
+    "WorkspaceMemberViewSet.list": 3,
+    "WorkspaceMemberViewSet.retrieve": 3,
+    "ProjectViewSet.list": 2,
+    "ProjectViewSet.create": 3,
+    "ProjectViewSet.retrieve": 2,
+    "ProjectViewSet.update": 7,
+    "ProjectViewSet.partial_update": 6,
+    "ProjectViewSet.destroy": 4,
+    "BoardViewSet.list": 2,
+    "BoardViewSet.create": 5,
+    "BoardViewSet.retrieve": 2,
+    "BoardViewSet.update": 7,
+    "BoardViewSet.partial_update": 6,
+    "BoardViewSet.destroy": 6,
+    "BoardViewSet.snapshot": 5,
+    "BoardViewSet.stats": 5,
+    "BoardViewSet.import_tasks": 12,
+    "search_user_for_invite": 2,
+    "add_workspace_member": 8,
+    "update_member_role": 3,
+    "remove_workspace_member": 3,
+
+    # tasks/views.py
+    "SprintViewSet.list": 4,
+    "SprintViewSet.retrieve": 4,
+    "SprintViewSet.burndown": 3,
+    "SprintViewSet.burnup": 3,
+    "SprintViewSet.velocity": 3,
+    "TaskListViewSet.list": 4,
+    "TaskListViewSet.retrieve": 4,
+    "TaskViewSet.list": 5,
+    "TaskViewSet.create": 10,
+    "TaskViewSet.retrieve": 5,
+    "TaskViewSet.update": 6,
+    "TaskViewSet.partial_update": 6,
+    "TaskViewSet.destroy": 8,
+    "TaskViewSet.tree": 5,
+    "TaskViewSet.descendants": 3,
+    "TaskViewSet.search": 3,
+    "TaskViewSet.move": 11,
+    "TaskViewSet.bulk": 7,
+    "TaskAssigneeViewSet.list": 2,
+    "TaskAssigneeViewSet.create": 8,
+    "TaskAssigneeViewSet.retrieve": 2,
+    "TaskAssigneeViewSet.update": 8,
+    "TaskAssigneeViewSet.partial_update": 7,
+    "TaskAssigneeViewSet.destroy": 5,
+    "CommentViewSet.list": 2,
+    "CommentViewSet.create": 6,
+    "CommentViewSet.retrieve": 2,
+    "CommentViewSet.update": 6,
+    "CommentViewSet.partial_update": 5,
+    "CommentViewSet.destroy": 5,
+    "ActivityLogViewSet.list": 2,
+    "ActivityLogViewSet.retrieve": 2,
+
+    # users/views.py
+    "WorkspaceUserViewSet.list": 3,
+    "WorkspaceUserViewSet.retrieve": 3,
+    "search_users": 3,
+    "current_user": 1,
+    "register": 3,
+
+    # DRF / simplejwt
+    "APIRootView": 1,
+    "TokenObtainPairView": 1,
+    "TokenRefreshView": 1,
+}
+
+
+def budget_key(path, method):
+    """Budget name of the view a request is routed to."""
+    view = resolve(path.split("?")[0]).func
+    name = view.cls.__name__ if hasattr(view, "cls") else view.__name__
+    actions = getattr(view, "actions", None)
+    return f"{name}.{actions[method.lower()]}" if actions else name
+
+
+def view_keys(patterns):
+    """Budget names of every view (and viewset action) behind the given URL patterns."""
+    keys = set()
+    for pattern in patterns:
+        view = pattern.callback
+        name = view.cls.__name__ if hasattr(view, "cls") else view.__name__
+        actions = getattr(view, "actions", None)
+        if actions:
+            keys.update(f"{name}.{action}" for action in actions.values())
+        else:
+            keys.add(name)
+    return keys
+
+
+def describe_queries(queries):
+    """Numbered statements, repeats folded into one line with a count."""
+    counts = Counter(normalise_sql(query["sql"]) for query in queries)
+    return "\n".join(
+        f"  {i:>3}. {'[×%d] ' % count if count > 1 else ''}{sql}"
+        for i, (sql, count) in enumerate(counts.items(), start=1)
+    )
+
+
+def query_diff(before, after, labels=("N", "10N")):
+    """Unified diff of the (normalised) statements of two runs of one request."""
+    return "\n".join(difflib.unified_diff(
+        [normalise_sql(query["sql"]) for query in before],
+        [normalise_sql(query["sql"]) for query in after],
+        *labels, lineterm="",
+    ))
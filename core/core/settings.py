@@ -21,6 +21,13 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL  = config('DEFAULT_FROM_EMAIL')
 FRONTEND_URL        = config('FRONTEND_URL', default='http://localhost:5173')
 
+# Invite email delivery (projects/emails.py). Off = deliver inline after commit.
+INVITE_EMAIL_ASYNC        = config('INVITE_EMAIL_ASYNC',        default=True, cast=bool)
+INVITE_EMAIL_BATCH_SIZE   = config('INVITE_EMAIL_BATCH_SIZE',   default=50,   cast=int)
+INVITE_EMAIL_MAX_ATTEMPTS = config('INVITE_EMAIL_MAX_ATTEMPTS', default=5,    cast=int)
+INVITE_EMAIL_RETRY_DELAY  = config('INVITE_EMAIL_RETRY_DELAY',  default=30.0, cast=float)  # seconds, doubles per attempt
+INVITE_EMAIL_SEND_TIMEOUT = config('INVITE_EMAIL_SEND_TIMEOUT', default=300,  cast=int)  # seconds a claimed invite stays with its sender
+
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +55,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'rest_framework',
 
@@ -69,6 +77,42 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Keyset pagination for tasks, comments and activity (tasks/pagination.py);
+# clients may ask for ?page_size= up to API_MAX_PAGE_SIZE.
+API_PAGE_SIZE     = config('API_PAGE_SIZE',     default=50,  cast=int)
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=500, cast=int)
+
+# Max items per /api/tasks/bulk/ request
+TASK_BULK_LIMIT = config('TASK_BULK_LIMIT', default=500, cast=int)
+
+# Task import (tasks/imports.py): records written per transaction, and the
+# most records one POST /api/boards/{id}/import/ may carry (use
+# `manage.py import_tasks` for larger files)
+IMPORT_BATCH_SIZE = config('IMPORT_BATCH_SIZE', default=2000, cast=int)
+IMPORT_API_MAX_RECORDS = config('IMPORT_API_MAX_RECORDS', default=20000, cast=int)
+
+# Deepest level /api/tasks/{id}/tree/ walks below a root (tasks/hierarchy.py)
+TASK_TREE_MAX_DEPTH = config('TASK_TREE_MAX_DEPTH', default=50, cast=int)
+
+# Max invites per /api/workspaces/{id}/invite-bulk/ request
+WORKSPACE_INVITE_BULK_LIMIT = config('WORKSPACE_INVITE_BULK_LIMIT', default=500, cast=int)
+
+# Activity log writer (tasks/utils.py). SyncActivitySink inserts inline;
+# tasks.utils.BufferedActivitySink batches inserts per worker after commit.
+ACTIVITY_LOG_SINK           = config('ACTIVITY_LOG_SINK', default='tasks.utils.SyncActivitySink')
+ACTIVITY_LOG_BATCH_SIZE     = config('ACTIVITY_LOG_BATCH_SIZE',     default=200, cast=int)
+ACTIVITY_LOG_FLUSH_INTERVAL = config('ACTIVITY_LOG_FLUSH_INTERVAL', default=2.0, cast=float)
+
+# Live board events (tasks/events.py). InProcessBroker only reaches clients
+# connected to the same worker; tasks.events.RedisBroker fans out across
+# workers through BOARD_EVENTS_REDIS_URL.
+BOARD_EVENTS_BROKER    = config('BOARD_EVENTS_BROKER',    default='tasks.events.InProcessBroker')
+BOARD_EVENTS_REDIS_URL = config('BOARD_EVENTS_REDIS_URL', default='redis://localhost:6379/0')
+
+# Monthly activity_log partitions (manage.py activity_partitions)
+ACTIVITY_LOG_PARTITIONS_AHEAD = config('ACTIVITY_LOG_PARTITIONS_AHEAD', default=3,  cast=int)
+ACTIVITY_LOG_RETENTION_MONTHS = config('ACTIVITY_LOG_RETENTION_MONTHS', default=12, cast=int)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -78,6 +122,8 @@ SIMPLE_JWT = {
 
 
 MIDDLEWARE = [
+    # outermost, so its total covers the other middleware too
+    'core.profiling.RequestProfilingMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -119,9 +165,53 @@ DATABASES = {
         'PASSWORD': 'root123',
         'HOST': 'localhost',
         'PORT': '5432',
+        # The test database is built straight from the models (see
+        # core/test_runner.py) since several tables are not migration-managed.
+        'TEST': {
+            'MIGRATE': False,
+        },
+    }
+}
+
+TEST_RUNNER = 'core.test_runner.UnmanagedModelTestRunner'
+
+
+# Cache
+# Defaults to per-process memory; point CACHE_BACKEND / CACHE_LOCATION at a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache) in production.
+
+CACHES = {
+    'default': {
+        'BACKEND':  config('CACHE_BACKEND',  default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='taskflow'),
     }
 }
 
+# Seconds a user's {workspace_id: role} map stays cached (projects/permissions.py);
+# only used with a shared CACHE_BACKEND (Redis, Memcached, ...), never locmem
+WORKSPACE_ROLE_CACHE_TTL = config('WORKSPACE_ROLE_CACHE_TTL', default=300, cast=int)
+
+# Seconds board / workspace stats stay cached; task writes change the key anyway (tasks/stats.py)
+STATS_CACHE_TTL = config('STATS_CACHE_TTL', default=300, cast=int)
+
+# Workspace export (tasks/exports.py): rows fetched per server-side cursor
+# round trip, and bytes gathered before a block is sent
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+EXPORT_BLOCK_SIZE = config('EXPORT_BLOCK_SIZE', default=65536, cast=int)
+
+# Seconds a user typeahead result page stays cached (users/search.py)
+USER_SEARCH_CACHE_TTL = config('USER_SEARCH_CACHE_TTL', default=30, cast=int)
+
+# Request profiling (core/profiling.py): Server-Timing on every response;
+# requests over SLOW_REQUEST_MS are logged with their SQL, optionally with
+# EXPLAIN ANALYZE of the slowest SELECTs (re-runs them, so off by default),
+# and PROFILE_SAMPLE_RATE of requests run under cProfile for that log.
+# Off unless DEBUG: the header tells any client the query count and DB time.
+REQUEST_PROFILING          = config('REQUEST_PROFILING',          default=DEBUG, cast=bool)
+SLOW_REQUEST_MS            = config('SLOW_REQUEST_MS',            default=1000,  cast=int)
+SLOW_REQUEST_EXPLAIN       = config('SLOW_REQUEST_EXPLAIN',       default=False, cast=bool)
+SLOW_REQUEST_EXPLAIN_LIMIT = config('SLOW_REQUEST_EXPLAIN_LIMIT', default=3,     cast=int)
+PROFILE_SAMPLE_RATE        = config('PROFILE_SAMPLE_RATE',        default=0.0,   cast=float)
 
 
 # Password validation
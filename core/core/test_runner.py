@@ -0,0 +1,23 @@
+from django.apps import apps
+from django.test.runner import DiscoverRunner
+
+
+class UnmanagedModelTestRunner(DiscoverRunner):
+    """
+    workspace, workspace_member, project and board are created outside of
+    Django's migrations (managed = False), so the test database would not
+    get those tables. Flip them to managed for the duration of the run.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        self.unmanaged_models = [
+            model for model in apps.get_models() if not model._meta.managed
+        ]
+        for model in self.unmanaged_models:
+            model._meta.managed = True
+        super().setup_test_environment(**kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        for model in self.unmanaged_models:
+            model._meta.managed = False
@@ -13,7 +13,9 @@ from projects.views import (
     remove_workspace_member,   # NEW
 )
 
+from tasks.streams import board_events
 from tasks.views import (
+    SprintViewSet,
     TaskListViewSet,
     TaskViewSet,
     TaskAssigneeViewSet,
@@ -39,6 +41,7 @@ router.register("workspace-members", WorkspaceMemberViewSet, basename="workspace
 # ======================
 # TASKS
 # ======================
+router.register("sprints",        SprintViewSet,       basename="sprint")
 router.register("task-lists",     TaskListViewSet,     basename="task-list")
 router.register("tasks",          TaskViewSet,         basename="task")
 router.register("task-assignees", TaskAssigneeViewSet, basename="task-assignee")
@@ -48,6 +51,9 @@ router.register("activity",       ActivityLogViewSet,  basename="activity")
 urlpatterns = [
     path("admin/", admin.site.urls),
 
+    # Live board events (Server-Sent Events)
+    path("api/boards/<int:board_id>/events/", board_events, name="board-events"),
+
     # ROUTER URLS
     path("api/", include(router.urls)),
 
@@ -1,7 +1,13 @@
 from django.contrib import admin
-from .models import Workspace, WorkspaceMember, Project, Board
+from .models import Workspace, WorkspaceMember, Project, Board, InviteEmail
 
 admin.site.register(Workspace)
 admin.site.register(WorkspaceMember)
 admin.site.register(Project)
 admin.site.register(Board)
+
+
+@admin.register(InviteEmail)
+class InviteEmailAdmin(admin.ModelAdmin):
+    list_display = ("invitee", "workspace", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status",)
@@ -0,0 +1,320 @@
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import InviteEmail, Project
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# INVITE EMAIL DELIVERY
+# add_workspace_member records an InviteEmail row and returns at once.
+# After commit the row is handed to a per-process delivery thread that
+# sends up to INVITE_EMAIL_BATCH_SIZE messages over one SMTP connection.
+# Failed sends are retried with exponential backoff up to
+# INVITE_EMAIL_MAX_ATTEMPTS; every outcome is written back to the row.
+# A sender first claims its rows (SENDING, locked with SKIP LOCKED) so the
+# thread, other workers and the cron command never send one twice; a
+# claim that isn't settled within INVITE_EMAIL_SEND_TIMEOUT (the worker
+# died) is due again. `manage.py send_invite_emails` delivers anything a
+# restart left behind.
+# =========================
+
+def workspace_project_lists(workspace_ids):
+    """{workspace_id: "Web, Mobile"} for the invite body, in one query."""
+    names = {workspace_id: [] for workspace_id in workspace_ids}
+    for workspace_id, name in Project.objects.filter(workspace_id__in=names).values_list("workspace_id", "name"):
+        names[workspace_id].append(name)
+    return {
+        workspace_id: ", ".join(projects) if projects else "No projects yet"
+        for workspace_id, projects in names.items()
+    }
+
+
+def build_invite_message(inviter, invitee, workspace, role, project_list=None):
+    subject = f"{inviter.username} invited you to '{workspace.name}' on TaskFlow"
+
+    # All projects in this workspace, listed in the email
+    if project_list is None:
+        project_list = workspace_project_lists([workspace.id])[workspace.id]
+
+    # Plain-text version
+    plain_message = f"""Hi {invitee.username},
+
+{inviter.username} ({inviter.email}) has invited you to join the workspace "{workspace.name}" on TaskFlow as a {role}.
+
+Workspace: {workspace.name}
+Your role:  {role}
+Projects:   {project_list}
+
+Log in to TaskFlow to get started:
+{getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')}
+
+If you didn't expect this invitation, you can safely ignore this email.
+
+— The TaskFlow Team
+"""
+
+    # HTML version
+    html_message = f"""
+<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <style>
+    body {{ margin: 0; padding: 0; background: #0d0f16; font-family: 'Segoe UI', Arial, sans-serif; }}
+    .wrapper {{ max-width: 560px; margin: 40px auto; background: #13151f; border-radius: 16px; overflow: hidden; border: 1px solid rgba(255,255,255,0.08); }}
+    .header {{ background: linear-gradient(135deg, #6366f1, #8b5cf6); padding: 32px 36px 28px; }}
+    .logo {{ font-size: 22px; font-weight: 800; color: #fff; letter-spacing: -0.5px; margin-bottom: 4px; }}
+    .logo span {{ opacity: 0.7; font-weight: 400; }}
+    .header-sub {{ font-size: 13px; color: rgba(255,255,255,0.7); margin-top: 4px; }}
+    .body {{ padding: 32px 36px; }}
+    .greeting {{ font-size: 20px; font-weight: 700; color: #fff; margin-bottom: 12px; }}
+    .desc {{ font-size: 14px; color: rgba(255,255,255,0.55); line-height: 1.7; margin-bottom: 28px; }}
+    .desc strong {{ color: rgba(255,255,255,0.85); }}
+    .card {{ background: rgba(255,255,255,0.04); border: 1px solid rgba(255,255,255,0.08); border-radius: 12px; padding: 20px 24px; margin-bottom: 28px; }}
+    .card-row {{ display: flex; align-items: flex-start; gap: 12px; margin-bottom: 14px; }}
+    .card-row:last-child {{ margin-bottom: 0; }}
+    .card-label {{ font-size: 11px; font-weight: 700; text-transform: uppercase; letter-spacing: 0.08em; color: rgba(255,255,255,0.25); width: 70px; flex-shrink: 0; padding-top: 2px; }}
+    .card-value {{ font-size: 14px; color: rgba(255,255,255,0.8); font-weight: 500; }}
+    .badge {{ display: inline-block; padding: 2px 10px; border-radius: 20px; font-size: 12px; font-weight: 600;
+              background: rgba(99,102,241,0.15); border: 1px solid rgba(99,102,241,0.3); color: #818cf8; }}
+    .cta {{ display: block; text-align: center; padding: 14px 32px; background: linear-gradient(135deg, #6366f1, #8b5cf6);
+            color: #fff; text-decoration: none; border-radius: 10px; font-size: 15px; font-weight: 700;
+            letter-spacing: -0.2px; margin-bottom: 28px; }}
+    .footer {{ padding: 20px 36px 28px; border-top: 1px solid rgba(255,255,255,0.06); }}
+    .footer-text {{ font-size: 12px; color: rgba(255,255,255,0.2); line-height: 1.6; }}
+  </style>
+</head>
+<body>
+  <div class="wrapper">
+    <div class="header">
+      <div class="logo">⚡ TaskFlow</div>
+      <div class="header-sub">Workspace Invitation</div>
+    </div>
+    <div class="body">
+      <div class="greeting">You're invited, {invitee.username}! 🎉</div>
+      <p class="desc">
+        <strong>{inviter.username}</strong> ({inviter.email}) has invited you to join
+        the <strong>{workspace.name}</strong> workspace on TaskFlow
+        as a <strong>{role}</strong>.
+      </p>
+
+      <div class="card">
+        <div class="card-row">
+          <div class="card-label">Workspace</div>
+          <div class="card-value">{workspace.name}</div>
+        </div>
+        <div class="card-row">
+          <div class="card-label">Your role</div>
+          <div class="card-value"><span class="badge">{role}</span></div>
+        </div>
+        <div class="card-row">
+          <div class="card-label">Projects</div>
+          <div class="card-value">{project_list}</div>
+        </div>
+        <div class="card-row">
+          <div class="card-label">Invited by</div>
+          <div class="card-value">{inviter.username} &lt;{inviter.email}&gt;</div>
+        </div>
+      </div>
+
+      <a class="cta" href="{getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')}">
+        Open TaskFlow →
+      </a>
+    </div>
+    <div class="footer">
+      <div class="footer-text">
+        If you didn't expect this invitation, you can safely ignore this email.<br>
+        You're receiving this because {inviter.email} added you to a TaskFlow workspace.
+      </div>
+    </div>
+  </div>
+</body>
+</html>
+"""
+
+    return EmailMultiAlternatives(
+        subject=subject,
+        body=plain_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[invitee.email],
+        alternatives=[(html_message, "text/html")],
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next try, after `attempts` failed tries."""
+    return settings.INVITE_EMAIL_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def _record_failure(invite, error):
+    invite.attempts += 1
+    invite.last_error = f"{type(error).__name__}: {error}"
+    if invite.attempts >= settings.INVITE_EMAIL_MAX_ATTEMPTS:
+        invite.status = InviteEmail.FAILED
+        logger.error("Invite email %s to %s failed: %s", invite.id, invite.invitee.email, invite.last_error)
+    else:
+        invite.status = InviteEmail.RETRYING
+        invite.next_attempt_at = timezone.now() + timezone.timedelta(seconds=retry_delay(invite.attempts))
+    invite.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def claim_invites(invite_ids):
+    """
+    Marks the pending invites among invite_ids as SENDING for this sender and
+    returns their ids. Rows another sender holds (locked or claimed within
+    INVITE_EMAIL_SEND_TIMEOUT) are left out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            InviteEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status__in=[InviteEmail.QUEUED, InviteEmail.RETRYING])
+                | Q(status=InviteEmail.SENDING, next_attempt_at__lte=now),
+                pk__in=invite_ids,
+            )
+            .values_list("id", flat=True)
+        )
+        InviteEmail.objects.filter(pk__in=ids).update(
+            status=InviteEmail.SENDING,
+            next_attempt_at=now + timezone.timedelta(seconds=settings.INVITE_EMAIL_SEND_TIMEOUT),
+        )
+    return ids
+
+
+def deliver_invites(invite_ids):
+    """
+    Claims the pending invites among invite_ids, sends them over a single
+    connection and records each outcome. Returns the invites that are due
+    for another try.
+    """
+    invites = list(
+        InviteEmail.objects.filter(pk__in=claim_invites(invite_ids))
+        .select_related("workspace", "invitee", "inviter")
+    )
+    if not invites:
+        return []
+
+    project_lists = workspace_project_lists({invite.workspace_id for invite in invites})
+
+    mail = get_connection(fail_silently=False)
+    try:
+        mail.open()
+    except Exception as error:
+        for invite in invites:
+            _record_failure(invite, error)
+        return [invite for invite in invites if invite.status == InviteEmail.RETRYING]
+
+    try:
+        for invite in invites:
+            try:
+                message = build_invite_message(
+                    invite.inviter, invite.invitee, invite.workspace, invite.role,
+                    project_lists[invite.workspace_id],
+                )
+                mail.send_messages([message])
+            except Exception as error:
+                _record_failure(invite, error)
+            else:
+                invite.attempts += 1
+                invite.status = InviteEmail.SENT
+                invite.sent_at = timezone.now()
+                invite.last_error = ""
+                invite.save(update_fields=["attempts", "status", "sent_at", "last_error"])
+    finally:
+        mail.close()
+
+    return [invite for invite in invites if invite.status == InviteEmail.RETRYING]
+
+
+def deliver_due_invites():
+    """
+    Delivers every queued invite, every retry whose backoff has passed and
+    every claim its sender didn't settle in time.
+    """
+    due = InviteEmail.objects.filter(
+        status__in=[InviteEmail.QUEUED, InviteEmail.RETRYING, InviteEmail.SENDING],
+        next_attempt_at__lte=timezone.now(),
+    ).values_list("id", flat=True)
+    ids = list(due)
+    for start in range(0, len(ids), settings.INVITE_EMAIL_BATCH_SIZE):
+        deliver_invites(ids[start:start + settings.INVITE_EMAIL_BATCH_SIZE])
+    return len(ids)
+
+
+class InviteMailer:
+    """Per-process delivery thread fed with invite ids."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def enqueue(self, invite_id):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        self.queue.put(invite_id)
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < settings.INVITE_EMAIL_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                for invite in deliver_invites(batch):
+                    self.retry_later(invite)
+            except Exception:
+                logger.exception("Invite email delivery failed for %s", batch)
+            finally:
+                db_connection.close()
+
+    def retry_later(self, invite):
+        timer = threading.Timer(retry_delay(invite.attempts), self.enqueue, [invite.id])
+        timer.daemon = True
+        timer.start()
+
+
+_mailer = InviteMailer()
+
+
+def queue_invite_emails(invites):
+    """
+    Saves unsaved InviteEmail rows in one INSERT and queues them for
+    delivery once the current transaction commits. Never blocks on SMTP and
+    never raises for mail problems; the rows' status tells what happened.
+    With INVITE_EMAIL_ASYNC off, delivery runs inline after commit.
+    """
+    invites = InviteEmail.objects.bulk_create(invites)
+    ids = [invite.id for invite in invites]
+    def deliver():
+        if settings.INVITE_EMAIL_ASYNC:
+            for invite_id in ids:
+                _mailer.enqueue(invite_id)
+        else:
+            deliver_invites(ids)
+
+    transaction.on_commit(deliver)
+    return invites
+
+
+def send_workspace_invite_email(inviter, invitee, workspace, role):
+    """Queues one invitation mail; see queue_invite_emails."""
+    (invite,) = queue_invite_emails([
+        InviteEmail(workspace=workspace, invitee=invitee, inviter=inviter, role=role)
+    ])
+    return invite
@@ -0,0 +1,114 @@
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .emails import queue_invite_emails
+from .models import InviteEmail, WorkspaceMember
+from .permissions import invalidate_workspace_roles
+from users.search import invalidate_user_search
+
+
+# =========================
+# BULK WORKSPACE INVITATIONS
+# Takes [{email, role}] and returns one result per item, in order:
+#   added | already_member | not_found | duplicate | invalid
+# Users are resolved and existing members detected with one query each,
+# memberships go in with a single INSERT, and the invite mails are queued
+# as one batch (project list rendered once per workspace). Anyone added
+# concurrently is skipped by the INSERT and reported as already_member.
+# =========================
+VALID_ROLES = {"ADMIN", "MEMBER"}
+
+# returns only the rows actually inserted
+INSERT_MEMBERS_SQL = """
+    INSERT INTO workspace_member (workspace_id, user_id, role, joined_at)
+    SELECT %s, new.user_id, new.role, %s
+    FROM unnest(%s::integer[], %s::varchar[]) AS new (user_id, role)
+    ON CONFLICT DO NOTHING
+    RETURNING user_id
+"""
+
+
+def _result(email, status, **extra):
+    return {"email": email, "status": status, **extra}
+
+
+def bulk_invite(inviter, workspace, items, default_role="MEMBER"):
+    results = [None] * len(items)
+    wanted = {}
+
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {"email": item}
+        email = str(item.get("email") or "").strip().lower()
+        role = str(item.get("role") or default_role).strip().upper()
+
+        if not email:
+            results[index] = _result(email, "invalid", error="An email is required.")
+        elif role not in VALID_ROLES:
+            results[index] = _result(email, "invalid", error=f"Invalid role '{role}'.")
+        elif email in wanted:
+            results[index] = _result(email, "duplicate")
+        else:
+            wanted[email] = (index, role)
+
+    users = {}
+    for user in (
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=wanted)
+        .order_by("id")
+    ):
+        users.setdefault(user.email_lower, user)
+
+    members = dict(
+        WorkspaceMember.objects.filter(
+            workspace=workspace, user_id__in=[user.id for user in users.values()]
+        ).values_list("user_id", "role")
+    )
+
+    added = []
+    for email, (index, role) in wanted.items():
+        user = users.get(email)
+        if user is None:
+            results[index] = _result(email, "not_found")
+        elif user.id in members:
+            results[index] = _result(email, "already_member", user_id=user.id, role=members[user.id])
+        else:
+            added.append((index, user, role))
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(INSERT_MEMBERS_SQL, [
+                workspace.id, timezone.now(),
+                [user.id for _, user, _ in added], [role for _, _, role in added],
+            ])
+            inserted = {user_id for (user_id,) in cursor.fetchall()}
+
+        skipped = [(index, user) for index, user, _ in added if user.id not in inserted]
+        if skipped:
+            roles = dict(
+                WorkspaceMember.objects.filter(
+                    workspace=workspace, user_id__in=[user.id for _, user in skipped]
+                ).values_list("user_id", "role")
+            )
+            for index, user in skipped:
+                results[index] = _result(
+                    user.email.lower(), "already_member", user_id=user.id, role=roles.get(user.id),
+                )
+            added = [entry for entry in added if entry[1].id in inserted]
+
+        invites = queue_invite_emails([
+            InviteEmail(workspace=workspace, invitee=user, inviter=inviter, role=role)
+            for _, user, role in added
+        ])
+
+    for (index, user, role), invite in zip(added, invites):
+        results[index] = _result(
+            user.email.lower(), "added",
+            user_id=user.id, role=role, invite_email={"id": invite.id, "status": invite.status},
+        )
+
+    if added:
+        invalidate_workspace_roles(*(user for _, user, _ in added))
+        invalidate_user_search(workspace.id)
+    return results
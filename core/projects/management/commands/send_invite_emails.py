@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from projects.emails import deliver_due_invites
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued invite emails and retries whose backoff has passed, "
+        "e.g. the ones a worker restart left behind. Safe to run from cron."
+    )
+
+    def handle(self, *args, **options):
+        count = deliver_due_invites()
+        self.stdout.write(f"Attempted {count} invite email(s).")
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.11 on 2026-10-18 16:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_alter_project_table_alter_workspace_table_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InviteEmail',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('role', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RETRYING', 'Retrying'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='QUEUED', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('invitee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invite_emails', to=settings.AUTH_USER_MODEL)),
+                ('inviter', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='projects.workspace')),
+            ],
+            options={
+                'db_table': 'invite_email',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='invite_email_due_idx')],
+            },
+        ),
+    ]
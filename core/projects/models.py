@@ -5,6 +5,41 @@ from django.utils import timezone
 User = settings.AUTH_USER_MODEL
 
 
+# =========================
+# TENANT SCOPING
+# =========================
+class WorkspaceScopedQuerySet(models.QuerySet):
+    """
+    Restricts rows to the workspaces a user belongs to with
+    `<workspace_field> IN (SELECT workspace_id FROM workspace_member ...)`.
+    Unlike joining through workspacemember__user this never fans out, so
+    no DISTINCT is needed. Subclasses set the lookup path to the workspace.
+    """
+    workspace_field = "workspace"
+
+    def visible_to(self, user):
+        return self.filter(**{
+            f"{self.workspace_field}__in": member_workspace_ids(user),
+        })
+
+
+def member_workspace_ids(user):
+    """Subquery of the workspace ids the user is a member of."""
+    return WorkspaceMember.objects.filter(user=user).values("workspace_id")
+
+
+class WorkspaceQuerySet(WorkspaceScopedQuerySet):
+    workspace_field = "pk"
+
+
+class ProjectQuerySet(WorkspaceScopedQuerySet):
+    workspace_field = "workspace"
+
+
+class BoardQuerySet(WorkspaceScopedQuerySet):
+    workspace_field = "project__workspace"
+
+
 # =========================
 # WORKSPACE
 # =========================
@@ -20,6 +55,8 @@ class Workspace(models.Model):
 
     created_at = models.DateTimeField(default=timezone.now)
 
+    objects = WorkspaceQuerySet.as_manager()
+
     class Meta:
         db_table = "workspace"
         managed = False
@@ -91,6 +128,8 @@ class Project(models.Model):
 
     created_at = models.DateTimeField(default=timezone.now)
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         db_table = "project"
         managed = False
@@ -113,9 +152,72 @@ class Board(models.Model):
 
     name = models.CharField(max_length=255)
 
+    objects = BoardQuerySet.as_manager()
+
     class Meta:
         db_table = "board"
         managed = False
 
     def __str__(self):
         return self.name
+
+
+# =========================
+# INVITE EMAIL (delivery status)
+# One row per invitation mail; projects/emails.py delivers it in the
+# background and records the outcome here.
+# =========================
+class InviteEmail(models.Model):
+    QUEUED   = "QUEUED"
+    RETRYING = "RETRYING"
+    SENDING  = "SENDING"
+    SENT     = "SENT"
+    FAILED   = "FAILED"
+
+    STATUS_CHOICES = [
+        (QUEUED,   "Queued"),
+        (RETRYING, "Retrying"),
+        (SENDING,  "Sending"),
+        (SENT,     "Sent"),
+        (FAILED,   "Failed"),
+    ]
+
+    id = models.AutoField(primary_key=True)
+
+    workspace = models.ForeignKey(
+        Workspace,
+        on_delete=models.CASCADE
+    )
+
+    invitee = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="invite_emails"
+    )
+
+    inviter = models.ForeignKey(
+        User,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+"
+    )
+
+    role = models.CharField(max_length=20)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "invite_email"
+        indexes = [
+            # pending mail due for (re)delivery
+            models.Index(fields=["status", "next_attempt_at"], name="invite_email_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"Invite to {self.invitee} ({self.status})"
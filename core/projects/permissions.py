@@ -1,7 +1,75 @@
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.permissions import BasePermission
+from core.caching import cache_is_shared
 from .models import Workspace, WorkspaceMember
 
 
+# =========================
+# MEMBERSHIP / ROLE RESOLVER
+# One query per user per request. With a shared cache backend the map is
+# also cached across requests; a per-process cache (the locmem default)
+# can't be invalidated on the other workers, so it isn't used for this.
+# =========================
+
+def _roles_cache_key(user_id):
+    return f"workspace_roles:{user_id}"
+
+
+def _roles_cache_shared():
+    return settings.WORKSPACE_ROLE_CACHE_TTL > 0 and cache_is_shared()
+
+
+def get_workspace_roles(user):
+    """
+    Returns {workspace_id: role} for every workspace the user belongs to.
+    The map is memoised on the user object (DRF keeps the same instance for
+    the whole request) and, with a shared cache backend, cached for
+    WORKSPACE_ROLE_CACHE_TTL seconds.
+    """
+    if not user or not user.is_authenticated:
+        return {}
+
+    roles = getattr(user, "_workspace_roles", None)
+    if roles is None:
+        shared = _roles_cache_shared()
+        key    = _roles_cache_key(user.pk)
+        roles  = cache.get(key) if shared else None
+        if roles is None:
+            roles = dict(
+                WorkspaceMember.objects.filter(user=user)
+                .values_list("workspace_id", "role")
+            )
+            if shared:
+                cache.set(key, roles, settings.WORKSPACE_ROLE_CACHE_TTL)
+        user._workspace_roles = roles
+    return roles
+
+
+def invalidate_workspace_roles(*users):
+    """
+    Drops the cached role map for each user (User instances or ids).
+    Call after any write to workspace_member.
+    """
+    for user in users:
+        if hasattr(user, "__dict__"):
+            user.__dict__.pop("_workspace_roles", None)
+    cache.delete_many([_roles_cache_key(getattr(user, "pk", user)) for user in users])
+
+
+def get_workspace_role(user, workspace):
+    """
+    Returns the user's role in the workspace, or None if not a member.
+    Accepts either a Workspace instance or a workspace id (int / str).
+    """
+    workspace_id = workspace.pk if isinstance(workspace, Workspace) else workspace
+    try:
+        workspace_id = int(workspace_id)
+    except (TypeError, ValueError):
+        return None
+    return get_workspace_roles(user).get(workspace_id)
+
+
 # =========================
 # DRF PERMISSION CLASSES
 # (used with permission_classes=[...] on views)
@@ -9,26 +77,23 @@ from .models import Workspace, WorkspaceMember
 
 class IsWorkspaceMember(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return WorkspaceMember.objects.filter(
-            user=request.user,
-            workspace=obj,
-        ).exists()
+        return is_workspace_member(request.user, obj)
 
 
 class IsWorkspaceAdmin(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return WorkspaceMember.objects.filter(
-            user=request.user,
-            workspace=obj,
-            role="ADMIN",
-        ).exists()
+        return get_workspace_role(request.user, obj) == "ADMIN"
 
 
 # =========================
-# HELPER FUNCTION
+# HELPER FUNCTIONS
 # (used inline inside perform_create / perform_destroy etc.)
 # =========================
 
+def is_workspace_member(user, workspace):
+    return get_workspace_role(user, workspace) is not None
+
+
 def is_workspace_admin(user, workspace):
     """
     Returns True if the user is a superuser OR an ADMIN member of the workspace.
@@ -36,11 +101,4 @@ def is_workspace_admin(user, workspace):
     """
     if user.is_superuser:
         return True
-
-    workspace_id = workspace.pk if isinstance(workspace, Workspace) else workspace
-
-    return WorkspaceMember.objects.filter(
-        user=user,
-        workspace_id=workspace_id,
-        role="ADMIN",
-    ).exists()
\ No newline at end of file
+    return get_workspace_role(user, workspace) == "ADMIN"
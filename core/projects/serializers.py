@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Workspace, Project, Board, WorkspaceMember
+from .permissions import is_workspace_admin
 
 
 class WorkspaceSerializer(serializers.ModelSerializer):
@@ -14,11 +15,7 @@ class WorkspaceSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if not request:
             return False
-        return WorkspaceMember.objects.filter(
-            user=request.user,
-            workspace=obj,
-            role="ADMIN",
-        ).exists() or request.user.is_superuser
+        return is_workspace_admin(request.user, obj)
 
 
 class ProjectSerializer(serializers.ModelSerializer):
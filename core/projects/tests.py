@@ -1,3 +1,392 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+from datetime import date
+from smtplib import SMTPException
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .emails import claim_invites, deliver_due_invites, deliver_invites
+from .models import Workspace, WorkspaceMember, Project, Board, InviteEmail
+from .permissions import get_workspace_role, is_workspace_admin
+from tasks.models import Sprint, TaskList, Task, TaskAssignee, Comment
+
+
+class BoardSnapshotTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("owner", "owner@example.com", "pw")
+        self.workspace = Workspace.objects.create(name="Acme", owner=self.user)
+        WorkspaceMember.objects.create(workspace=self.workspace, user=self.user, role="ADMIN")
+        self.project = Project.objects.create(name="Web", workspace=self.workspace)
+        self.board = Board.objects.create(name="Main", project=self.project)
+        self.columns = [
+            TaskList.objects.create(board=self.board, title="To Do", position=1),
+            TaskList.objects.create(board=self.board, title="Done", position=2),
+        ]
+        self.sprint = Sprint.objects.create(
+            name="Sprint 1", board=self.board,
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 14),
+        )
+        self.client.force_authenticate(self.user)
+
+    def add_cards(self, count):
+        for i in range(count):
+            assignee = User.objects.create_user(f"dev{Task.objects.count()}")
+            task = Task.objects.create(
+                title=f"Card {i}",
+                task_list=self.columns[i % 2],
+                sprint=self.sprint,
+                position=i,
+            )
+            TaskAssignee.objects.create(task=task, user=assignee)
+
+    def fetch_snapshot(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"/api/boards/{self.board.id}/snapshot/")
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_snapshot_groups_cards_by_column(self):
+        self.add_cards(3)
+        response, _ = self.fetch_snapshot()
+
+        self.assertEqual(response.data["workspace"], self.workspace.id)
+        self.assertEqual(response.data["project"], self.project.id)
+        todo, done = response.data["columns"]
+        self.assertEqual([c["title"] for c in todo["tasks"]], ["Card 0", "Card 2"])
+        self.assertEqual([c["title"] for c in done["tasks"]], ["Card 1"])
+
+        card = todo["tasks"][0]
+        self.assertEqual(card["sprint_name"], "Sprint 1")
+        self.assertEqual(card["workspace"], self.workspace.id)
+        self.assertEqual(len(card["assignees"]), 1)
+
+    def test_snapshot_query_count_is_flat(self):
+        self.add_cards(2)
+        _, small = self.fetch_snapshot()
+
+        self.add_cards(20)
+        _, large = self.fetch_snapshot()
+
+        self.assertEqual(small, large)
+
+    def test_snapshot_hidden_from_non_members(self):
+        outsider = User.objects.create_user("outsider")
+        self.client.force_authenticate(outsider)
+        response = self.client.get(f"/api/boards/{self.board.id}/snapshot/")
+        self.assertEqual(response.status_code, 404)
+
+
+class WorkspaceRoleCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user("admin", "admin@example.com", "pw")
+        self.member = User.objects.create_user("member", "member@example.com", "pw")
+
+    def make_workspaces(self, count):
+        for i in range(count):
+            workspace = Workspace.objects.create(name=f"WS {i}", owner=self.admin)
+            WorkspaceMember.objects.create(workspace=workspace, user=self.admin, role="ADMIN")
+
+    def list_workspaces(self):
+        # fresh instance per request, like DRF's authentication does
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/workspaces/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(ws["is_admin"] for ws in response.data))
+        return len(ctx.captured_queries)
+
+    def test_is_admin_does_not_query_per_workspace(self):
+        self.make_workspaces(2)
+        cache.clear()
+        small = self.list_workspaces()
+
+        self.make_workspaces(20)
+        cache.clear()
+        large = self.list_workspaces()
+
+        self.assertEqual(small, large)
+
+    def test_role_changes_invalidate_cache(self):
+        workspace = Workspace.objects.create(name="Acme", owner=self.admin)
+        WorkspaceMember.objects.create(workspace=workspace, user=self.admin, role="ADMIN")
+        self.client.force_authenticate(self.admin)
+
+        self.assertIsNone(get_workspace_role(self.member, workspace))
+
+        self.client.post("/api/add-workspace-member/", {
+            "workspace": workspace.id, "email": self.member.email, "role": "MEMBER",
+        })
+        member = User.objects.get(pk=self.member.pk)
+        self.assertEqual(get_workspace_role(member, workspace), "MEMBER")
+
+        membership = WorkspaceMember.objects.get(workspace=workspace, user=member)
+        self.client.patch("/api/update-member-role/", {"member_id": membership.id, "role": "ADMIN"})
+        member = User.objects.get(pk=self.member.pk)
+        self.assertTrue(is_workspace_admin(member, workspace.id))
+
+        self.client.delete("/api/remove-member/", {"member_id": membership.id})
+        member = User.objects.get(pk=self.member.pk)
+        self.assertIsNone(get_workspace_role(member, str(workspace.id)))
+
+    def test_per_process_cache_is_not_used_across_requests(self):
+        get_workspace_role(self.admin, 1)
+        self.assertIsNone(cache.get(f"workspace_roles:{self.admin.pk}"))
+
+    def test_stale_shared_cache_does_not_break_adding_a_member(self):
+        workspace = Workspace.objects.create(name="Acme", owner=self.admin)
+        WorkspaceMember.objects.create(workspace=workspace, user=self.admin, role="ADMIN")
+        WorkspaceMember.objects.create(workspace=workspace, user=self.member, role="MEMBER")
+        self.client.force_authenticate(self.admin)
+
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location,
+        }}):
+            # written by another worker before the member was added
+            cache.set(f"workspace_roles:{self.member.pk}", {})
+            response = self.client.post("/api/add-workspace-member/", {
+                "workspace": workspace.id, "email": self.member.email,
+            })
+            self.assertEqual(response.status_code, 400)
+            self.assertIsNone(cache.get(f"workspace_roles:{self.member.pk}"))
+
+
+class FlakyEmailBackend(locmem.EmailBackend):
+    """locmem backend that fails the next `failures` sends and counts opens."""
+    failures = 0
+    opened = 0
+
+    def open(self):
+        FlakyEmailBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if FlakyEmailBackend.failures:
+            FlakyEmailBackend.failures -= 1
+            raise SMTPException("451 Try again later")
+        return super().send_messages(messages)
+
+
+@override_settings(INVITE_EMAIL_ASYNC=False, INVITE_EMAIL_MAX_ATTEMPTS=2)
+class InviteEmailTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", "admin@example.com", "pw")
+        self.workspace = Workspace.objects.create(name="Acme", owner=self.admin)
+        WorkspaceMember.objects.create(workspace=self.workspace, user=self.admin, role="ADMIN")
+        self.client.force_authenticate(self.admin)
+        FlakyEmailBackend.failures = FlakyEmailBackend.opened = 0
+
+    def invite(self, username):
+        User.objects.create_user(username, f"{username}@example.com")
+        return self.client.post("/api/add-workspace-member/", {
+            "workspace": self.workspace.id, "email": f"{username}@example.com",
+        })
+
+    def test_invite_is_queued_then_sent_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.invite("carol")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["invite_email"]["status"], InviteEmail.QUEUED)
+        self.assertEqual(mail.outbox, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(mail.outbox[0].to, ["carol@example.com"])
+        self.assertEqual(InviteEmail.objects.get().status, InviteEmail.SENT)
+
+    @override_settings(EMAIL_BACKEND="projects.tests.FlakyEmailBackend")
+    def test_batch_shares_one_connection_and_failures_retry(self):
+        for name in ("a", "b", "c"):
+            self.invite(name)
+        FlakyEmailBackend.failures = 1
+
+        retry = deliver_invites(InviteEmail.objects.values_list("id", flat=True))
+
+        self.assertEqual(FlakyEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual([invite.status for invite in retry], [InviteEmail.RETRYING])
+
+        FlakyEmailBackend.failures = 1
+        deliver_invites([retry[0].id])
+        failed = InviteEmail.objects.get(pk=retry[0].id)
+        self.assertEqual((failed.status, failed.attempts), (InviteEmail.FAILED, 2))
+        self.assertIn("451", failed.last_error)
+
+    def test_claimed_invites_are_not_sent_twice(self):
+        with self.captureOnCommitCallbacks():
+            self.invite("carol")
+        invite = InviteEmail.objects.get()
+
+        # another worker holds the row
+        self.assertEqual(claim_invites([invite.id]), [invite.id])
+        self.assertEqual(deliver_due_invites(), 0)
+        self.assertEqual(deliver_invites([invite.id]), [])
+        self.assertEqual(mail.outbox, [])
+
+        # ... and died before settling it
+        InviteEmail.objects.filter(pk=invite.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_due_invites(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(InviteEmail.objects.get().status, InviteEmail.SENT)
+
+    def test_bad_invite_does_not_stop_the_batch(self):
+        with self.captureOnCommitCallbacks():
+            self.invite("a")
+            self.invite("b")
+        broken = InviteEmail.objects.order_by("id").first()
+        InviteEmail.objects.filter(pk=broken.pk).update(inviter=None)
+
+        deliver_invites(InviteEmail.objects.values_list("id", flat=True))
+
+        self.assertEqual(len(mail.outbox), 1)
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, InviteEmail.RETRYING)
+        self.assertIn("AttributeError", broken.last_error)
+
+    def test_bulk_invite_reports_each_email(self):
+        User.objects.create_user("dave", "Dave@Example.com")
+        User.objects.create_user("erin", "erin@example.com")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/workspaces/{self.workspace.id}/invite-bulk/", {"invites": [
+                {"email": "dave@example.com", "role": "admin"},
+                {"email": "admin@example.com"},
+                {"email": "nobody@example.com"},
+                {"email": "DAVE@example.com"},
+                {"email": "erin@example.com", "role": "OWNER"},
+                "erin@example.com",
+            ]}, format="json")
+
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["added", "already_member", "not_found", "duplicate", "invalid", "added"])
+        self.assertEqual(response.data["results"][0]["role"], "ADMIN")
+        self.assertEqual(WorkspaceMember.objects.filter(workspace=self.workspace).count(), 3)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["Dave@example.com", "erin@example.com"])
+
+    def test_bulk_invite_reports_members_added_concurrently(self):
+        frank = User.objects.create_user("frank", "frank@example.com")
+        User.objects.create_user("gina", "gina@example.com")
+
+        def add_frank_first(execute, sql, params, many, context):
+            # another request adds frank between the membership check and the INSERT
+            if sql.lstrip().startswith("INSERT INTO workspace_member"):
+                WorkspaceMember.objects.create(workspace=self.workspace, user=frank, role="ADMIN")
+            return execute(sql, params, many, context)
+
+        with self.captureOnCommitCallbacks(execute=True), connection.execute_wrapper(add_frank_first):
+            response = self.client.post(f"/api/workspaces/{self.workspace.id}/invite-bulk/", {
+                "invites": ["frank@example.com", "gina@example.com"],
+            }, format="json")
+
+        frank_result, gina_result = response.data["results"]
+        self.assertEqual((frank_result["status"], frank_result["role"]), ("already_member", "ADMIN"))
+        self.assertNotIn("invite_email", frank_result)
+        self.assertEqual(gina_result["status"], "added")
+        self.assertEqual([m.to[0] for m in mail.outbox], ["gina@example.com"])
+
+    def test_bulk_invite_query_count_does_not_grow_with_batch(self):
+        def invite(names):
+            for name in names:
+                User.objects.create_user(name, f"{name}@example.com")
+            cache.clear()
+            self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(f"/api/workspaces/{self.workspace.id}/invite-bulk/", {
+                    "invites": [{"email": f"{name}@example.com"} for name in names],
+                }, format="json")
+            return len(queries)
+
+        self.assertEqual(invite(["u1", "u2"]), invite([f"v{i}" for i in range(20)]))
+
+
+class StatsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("owner", "owner@example.com", "pw")
+        self.workspace = Workspace.objects.create(name="Acme", owner=self.user)
+        WorkspaceMember.objects.create(workspace=self.workspace, user=self.user, role="ADMIN")
+        project = Project.objects.create(name="Web", workspace=self.workspace)
+        self.board = Board.objects.create(name="Main", project=project)
+        self.column = TaskList.objects.create(board=self.board, title="To Do", position=1)
+        self.client.force_authenticate(self.user)
+
+        past = date(2000, 1, 1)
+        first = Task.objects.create(title="A", task_list=self.column, story_points=5, priority="HIGH", due_date=past)
+        Task.objects.create(title="B", task_list=self.column, story_points=3, status="DONE", due_date=past)
+        Task.objects.create(title="C", task_list=self.column, work_type="BUG")
+        TaskAssignee.objects.create(task=first, user=self.user)
+
+    def test_board_stats(self):
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.client.get(f"/api/boards/{self.board.id}/stats/").data
+
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["overdue"], 1)
+        self.assertEqual(stats["unassigned"], 2)
+        self.assertEqual(stats["story_points"], {"total": 8, "completed": 3, "remaining": 5})
+        self.assertEqual(stats["by_status"], {"TODO": 2, "IN_PROGRESS": 0, "DONE": 1})
+        self.assertEqual(stats["by_work_type"]["BUG"], 1)
+        self.assertEqual(stats["by_assignee"][0]["points"], 5)
+        # board, version, one aggregate, one per-assignee grouping
+        self.assertEqual(len([q for q in queries.captured_queries if "COUNT" in q["sql"]]), 2)
+
+    def test_task_writes_invalidate_cached_stats(self):
+        url = f"/api/workspaces/{self.workspace.id}/stats/"
+        self.assertEqual(self.client.get(url).data["total"], 3)
+
+        self.client.post("/api/tasks/", {"title": "D", "task_list_id": self.column.id})
+
+        self.assertEqual(self.client.get(url).data["total"], 4)
+        self.assertEqual(self.client.get(f"/api/boards/{self.board.id}/stats/").data["total"], 4)
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2, EXPORT_BLOCK_SIZE=64)
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("owner", "owner@example.com", "pw")
+        self.workspace = Workspace.objects.create(name="Acme", owner=self.user)
+        WorkspaceMember.objects.create(workspace=self.workspace, user=self.user, role="ADMIN")
+        project = Project.objects.create(name="Web", workspace=self.workspace)
+        column = TaskList.objects.create(board=Board.objects.create(name="Main", project=project), title="To Do", position=1)
+        for i in range(5):
+            task = Task.objects.create(title=f"Card, {i}", task_list=column)
+        TaskAssignee.objects.create(task=task, user=self.user)
+        Comment.objects.create(task=task, user=self.user, message="done")
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/workspaces/{self.workspace.id}/export/"
+
+    def test_ndjson_streams_every_resource(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row["type"] for row in rows], ["tasks"] * 5 + ["comments"])
+        self.assertEqual(rows[4]["assignees"], [self.user.id])
+
+    def test_csv_gzip(self):
+        response = self.client.get(self.url, {"format": "csv"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+        lines = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        self.assertTrue(lines[0].startswith("id,title,"))
+        self.assertEqual(len(lines), 6)
+        self.assertIn('"Card, 0"', lines[1])
+
+        response = self.client.get(self.url, {"format": "csv", "resource": "tasks,comments"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_members_cannot_export(self):
+        member = User.objects.create_user("member")
+        WorkspaceMember.objects.create(workspace=self.workspace, user=member)
+        self.client.force_authenticate(member)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
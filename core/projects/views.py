@@ -1,167 +1,41 @@
-from django.contrib.auth.models import User
-from django.core.mail import send_mail
+import io
+from itertools import islice
+
 from django.conf import settings as django_settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.renderers import JSONRenderer
 
 from .models import Workspace, WorkspaceMember, Project, Board
+from .emails import send_workspace_invite_email
+from .invites import bulk_invite
 from .serializers import (
     WorkspaceSerializer,
     ProjectSerializer,
     BoardSerializer,
     WorkspaceMemberSerializer,
 )
+from .permissions import (
+    is_workspace_admin,
+    is_workspace_member,
+    invalidate_workspace_roles,
+)
 
-from tasks.models import TaskList
-
-
-# =========================
-# PERMISSION HELPER
-# =========================
-def is_workspace_admin(user, workspace):
-    if user.is_superuser:
-        return True
-    if isinstance(workspace, Workspace):
-        workspace_id = workspace.pk
-    else:
-        workspace_id = workspace
-    return WorkspaceMember.objects.filter(
-        user=user,
-        workspace_id=workspace_id,
-        role="ADMIN",
-    ).exists()
-
-
-# =========================
-# EMAIL HELPER
-# =========================
-def send_workspace_invite_email(inviter, invitee, workspace, role):
-    """
-    Sends a workspace invitation email to the invitee.
-    Falls back silently if email is misconfigured — never breaks the invite flow.
-    """
-    subject = f"{inviter.username} invited you to '{workspace.name}' on TaskFlow"
-
-    # Fetch all projects in this workspace to list them in the email
-    projects = Project.objects.filter(workspace=workspace).values_list("name", flat=True)
-    project_list = ", ".join(projects) if projects else "No projects yet"
-
-    # Plain-text version
-    plain_message = f"""Hi {invitee.username},
-
-{inviter.username} ({inviter.email}) has invited you to join the workspace "{workspace.name}" on TaskFlow as a {role}.
-
-Workspace: {workspace.name}
-Your role:  {role}
-Projects:   {project_list}
-
-Log in to TaskFlow to get started:
-{getattr(django_settings, 'FRONTEND_URL', 'http://localhost:5173')}
-
-If you didn't expect this invitation, you can safely ignore this email.
-
-— The TaskFlow Team
-"""
-
-    # HTML version
-    html_message = f"""
-<!DOCTYPE html>
-<html>
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <style>
-    body {{ margin: 0; padding: 0; background: #0d0f16; font-family: 'Segoe UI', Arial, sans-serif; }}
-    .wrapper {{ max-width: 560px; margin: 40px auto; background: #13151f; border-radius: 16px; overflow: hidden; border: 1px solid rgba(255,255,255,0.08); }}
-    .header {{ background: linear-gradient(135deg, #6366f1, #8b5cf6); padding: 32px 36px 28px; }}
-    .logo {{ font-size: 22px; font-weight: 800; color: #fff; letter-spacing: -0.5px; margin-bottom: 4px; }}
-    .logo span {{ opacity: 0.7; font-weight: 400; }}
-    .header-sub {{ font-size: 13px; color: rgba(255,255,255,0.7); margin-top: 4px; }}
-    .body {{ padding: 32px 36px; }}
-    .greeting {{ font-size: 20px; font-weight: 700; color: #fff; margin-bottom: 12px; }}
-    .desc {{ font-size: 14px; color: rgba(255,255,255,0.55); line-height: 1.7; margin-bottom: 28px; }}
-    .desc strong {{ color: rgba(255,255,255,0.85); }}
-    .card {{ background: rgba(255,255,255,0.04); border: 1px solid rgba(255,255,255,0.08); border-radius: 12px; padding: 20px 24px; margin-bottom: 28px; }}
-    .card-row {{ display: flex; align-items: flex-start; gap: 12px; margin-bottom: 14px; }}
-    .card-row:last-child {{ margin-bottom: 0; }}
-    .card-label {{ font-size: 11px; font-weight: 700; text-transform: uppercase; letter-spacing: 0.08em; color: rgba(255,255,255,0.25); width: 70px; flex-shrink: 0; padding-top: 2px; }}
-    .card-value {{ font-size: 14px; color: rgba(255,255,255,0.8); font-weight: 500; }}
-    .badge {{ display: inline-block; padding: 2px 10px; border-radius: 20px; font-size: 12px; font-weight: 600;
-              background: rgba(99,102,241,0.15); border: 1px solid rgba(99,102,241,0.3); color: #818cf8; }}
-    .cta {{ display: block; text-align: center; padding: 14px 32px; background: linear-gradient(135deg, #6366f1, #8b5cf6);
-            color: #fff; text-decoration: none; border-radius: 10px; font-size: 15px; font-weight: 700;
-            letter-spacing: -0.2px; margin-bottom: 28px; }}
-    .footer {{ padding: 20px 36px 28px; border-top: 1px solid rgba(255,255,255,0.06); }}
-    .footer-text {{ font-size: 12px; color: rgba(255,255,255,0.2); line-height: 1.6; }}
-  </style>
-</head>
-<body>
-  <div class="wrapper">
-    <div class="header">
-      <div class="logo">⚡ TaskFlow</div>
-      <div class="header-sub">Workspace Invitation</div>
-    </div>
-    <div class="body">
-      <div class="greeting">You're invited, {invitee.username}! 🎉</div>
-      <p class="desc">
-        <strong>{inviter.username}</strong> ({inviter.email}) has invited you to join
-        the <strong>{workspace.name}</strong> workspace on TaskFlow
-        as a <strong>{role}</strong>.
-      </p>
-
-      <div class="card">
-        <div class="card-row">
-          <div class="card-label">Workspace</div>
-          <div class="card-value">{workspace.name}</div>
-        </div>
-        <div class="card-row">
-          <div class="card-label">Your role</div>
-          <div class="card-value"><span class="badge">{role}</span></div>
-        </div>
-        <div class="card-row">
-          <div class="card-label">Projects</div>
-          <div class="card-value">{project_list}</div>
-        </div>
-        <div class="card-row">
-          <div class="card-label">Invited by</div>
-          <div class="card-value">{inviter.username} &lt;{inviter.email}&gt;</div>
-        </div>
-      </div>
-
-      <a class="cta" href="{getattr(django_settings, 'FRONTEND_URL', 'http://localhost:5173')}">
-        Open TaskFlow →
-      </a>
-    </div>
-    <div class="footer">
-      <div class="footer-text">
-        If you didn't expect this invitation, you can safely ignore this email.<br>
-        You're receiving this because {inviter.email} added you to a TaskFlow workspace.
-      </div>
-    </div>
-  </div>
-</body>
-</html>
-"""
-
-    try:
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=django_settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[invitee.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-    except Exception as e:
-        # Log but don't crash — member was already added successfully
-        print(f"[TaskFlow] Invite email failed for {invitee.email}: {e}")
+from tasks.exports import RESOURCES as EXPORT_RESOURCES, CSVRenderer, NDJSONRenderer, export_response
+from tasks.imports import ImportFormatError, format_of, import_tasks, normalise_records, read_records
+from tasks.locations import sync_board_location, sync_project_location
+from tasks.models import Task, TaskList
+from tasks.serializers import TaskListSerializer, TaskSerializer
+from tasks.stats import board_stats, workspace_stats
+from tasks.versions import bump_board_versions
+from users.search import find_users, invalidate_user_search
 
 
 # =========================
@@ -172,9 +46,7 @@ class WorkspaceViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Workspace.objects.filter(
-            workspacemember__user=self.request.user
-        ).distinct()
+        return Workspace.objects.visible_to(self.request.user)
 
     def perform_create(self, serializer):
         if not self.request.user.is_superuser:
@@ -185,6 +57,7 @@ class WorkspaceViewSet(ModelViewSet):
             user=self.request.user,
             defaults={"role": "ADMIN"},
         )
+        invalidate_workspace_roles(self.request.user)
 
     def perform_update(self, serializer):
         workspace = self.get_object()
@@ -195,7 +68,64 @@ class WorkspaceViewSet(ModelViewSet):
     def perform_destroy(self, instance):
         if not is_workspace_admin(self.request.user, instance):
             raise PermissionDenied("Only workspace admins can delete this workspace.")
+        member_ids = list(instance.workspacemember_set.values_list("user_id", flat=True))
         instance.delete()
+        invalidate_workspace_roles(*member_ids)
+
+    # BULK INVITE
+    # POST /api/workspaces/{id}/invite-bulk/
+    # Body: { invites: [ { email, role? }, ... ], role?: default role }
+    # One result per invite, in order: { email, status, ... }
+    @action(detail=True, methods=["post"], url_path="invite-bulk")
+    def invite_bulk(self, request, pk=None):
+        workspace = self.get_object()
+        if not is_workspace_admin(request.user, workspace):
+            raise PermissionDenied("Only workspace admins can add members.")
+
+        invites = request.data.get("invites") if isinstance(request.data, dict) else None
+        if not isinstance(invites, list) or not invites:
+            raise ValidationError({"invites": ["A non-empty list is required."]})
+        if len(invites) > django_settings.WORKSPACE_INVITE_BULK_LIMIT:
+            raise ValidationError(
+                {"invites": [f"At most {django_settings.WORKSPACE_INVITE_BULK_LIMIT} invites per request."]}
+            )
+
+        results = bulk_invite(request.user, workspace, invites, request.data.get("role") or "MEMBER")
+        return Response({"results": results})
+
+    # EXPORT
+    # GET /api/workspaces/{id}/export/?format=ndjson|csv&resource=tasks,comments,activity
+    # Streams every row of the workspace; NDJSON lines carry a "type", CSV
+    # takes one resource (default tasks). Gzipped when the client accepts it.
+    @action(
+        detail=True,
+        methods=["get"],
+        renderer_classes=[JSONRenderer, NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request, pk=None):
+        workspace = self.get_object()
+        if not is_workspace_admin(request.user, workspace):
+            raise PermissionDenied("Only workspace admins can export a workspace.")
+
+        export_format = "csv" if request.accepted_renderer.format == "csv" else "ndjson"
+        default = "tasks" if export_format == "csv" else ",".join(EXPORT_RESOURCES)
+        resources = [r.strip() for r in request.query_params.get("resource", default).split(",") if r.strip()]
+
+        unknown = set(resources) - set(EXPORT_RESOURCES)
+        if unknown or not resources:
+            raise ValidationError({"resource": [f"Choose from: {', '.join(EXPORT_RESOURCES)}."]})
+        if export_format == "csv" and len(resources) != 1:
+            raise ValidationError({"resource": ["CSV exports one resource at a time."]})
+
+        return export_response(request, workspace.id, export_format, resources)
+
+    # GET /api/workspaces/{id}/stats/
+    # Task counts by status / priority / type / assignee, overdue and
+    # story points across every board in the workspace (cached).
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        workspace = self.get_object()
+        return Response({"workspace": workspace.id, **workspace_stats(workspace.id)})
 
 
 # =========================
@@ -207,12 +137,10 @@ class ProjectViewSet(ModelViewSet):
 
     def get_queryset(self):
         workspace_id = self.request.query_params.get("workspace")
-        qs = Project.objects.filter(
-            workspace__workspacemember__user=self.request.user
-        )
+        qs = Project.objects.visible_to(self.request.user)
         if workspace_id:
             qs = qs.filter(workspace_id=workspace_id)
-        return qs.distinct()
+        return qs
 
     def perform_create(self, serializer):
         workspace_id = self.request.data.get("workspace")
@@ -222,12 +150,17 @@ class ProjectViewSet(ModelViewSet):
 
     def perform_update(self, serializer):
         project = self.get_object()
-        if not is_workspace_admin(self.request.user, project.workspace):
+        if not is_workspace_admin(self.request.user, project.workspace_id):
             raise PermissionDenied("Only workspace admins can update projects.")
-        serializer.save()
+        with transaction.atomic():
+            updated = serializer.save()
+            # tasks carry a copy of their workspace id
+            if updated.workspace_id != project.workspace_id:
+                sync_project_location(updated.id)
+                bump_board_versions(*Board.objects.filter(project=updated).values_list("id", flat=True))
 
     def perform_destroy(self, instance):
-        if not is_workspace_admin(self.request.user, instance.workspace):
+        if not is_workspace_admin(self.request.user, instance.workspace_id):
             raise PermissionDenied("Only workspace admins can delete projects.")
         instance.delete()
 
@@ -242,14 +175,12 @@ class BoardViewSet(ModelViewSet):
     def get_queryset(self):
         project_id = self.request.query_params.get("project")
 
-        qs = Board.objects.filter(
-            project__workspace__workspacemember__user=self.request.user
-        )
+        qs = Board.objects.visible_to(self.request.user)
 
         if project_id:
             qs = qs.filter(project_id=project_id)
 
-        return qs.distinct()
+        return qs.select_related("project")
 
     def perform_create(self, serializer):
         project_id = self.request.data.get("project")
@@ -257,7 +188,7 @@ class BoardViewSet(ModelViewSet):
             project = Project.objects.get(pk=project_id)
         except Project.DoesNotExist:
             raise PermissionDenied("Project not found.")
-        if not is_workspace_admin(self.request.user, project.workspace):
+        if not is_workspace_admin(self.request.user, project.workspace_id):
             raise PermissionDenied("Only workspace admins can create boards.")
         board = serializer.save()
         TaskList.objects.bulk_create(
@@ -272,15 +203,98 @@ class BoardViewSet(ModelViewSet):
 
     def perform_update(self, serializer):
         board = self.get_object()
-        if not is_workspace_admin(self.request.user, board.project.workspace):
+        if not is_workspace_admin(self.request.user, board.project.workspace_id):
             raise PermissionDenied("Only workspace admins can update boards.")
-        serializer.save()
+        with transaction.atomic():
+            updated = serializer.save()
+            # tasks carry a copy of their project / workspace ids
+            if updated.project_id != board.project_id:
+                sync_board_location(updated.id)
+                bump_board_versions(updated.id)
 
     def perform_destroy(self, instance):
-        if not is_workspace_admin(self.request.user, instance.project.workspace):
+        if not is_workspace_admin(self.request.user, instance.project.workspace_id):
             raise PermissionDenied("Only workspace admins can delete boards.")
         instance.delete()
 
+    # IMPORT
+    # POST /api/boards/{id}/import/
+    # multipart: file=<.csv | .json | .ndjson>, mode?=skip|update
+    # or JSON:   { tasks: [ { key, title, status, assignees, parent, sprint, comments, ... } ], mode? }
+    # Up to IMPORT_API_MAX_RECORDS records; larger files go through
+    # `manage.py import_tasks`. Returns the import report.
+    @action(detail=True, methods=["post"], url_path="import")
+    def import_tasks(self, request, pk=None):
+        board = self.get_object()
+        if not is_workspace_admin(request.user, board.project.workspace_id):
+            raise PermissionDenied("Only workspace admins can import tasks.")
+
+        upload = request.FILES.get("file")
+        if upload is not None:
+            stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            records = read_records(stream, format_of(upload.name))
+        elif isinstance(request.data.get("tasks"), list):
+            records = normalise_records(request.data["tasks"])
+        else:
+            raise ValidationError({"file": ["Upload a file or send a list of tasks."]})
+
+        limit = django_settings.IMPORT_API_MAX_RECORDS
+        try:
+            records = list(islice(records, limit + 1))
+        except ImportFormatError as error:
+            raise ValidationError({"file": [str(error)]})
+        if len(records) > limit:
+            raise ValidationError({"tasks": [f"At most {limit} records per request; use the import_tasks command."]})
+
+        mode = request.data.get("mode") or "skip"
+        if mode not in ("skip", "update"):
+            raise ValidationError({"mode": ["Must be 'skip' or 'update'."]})
+
+        try:
+            report = import_tasks(board, request.user, records, mode=mode)
+        except ValueError as error:
+            raise ValidationError(str(error))
+        return Response(report)
+
+    # GET /api/boards/{id}/stats/
+    # Same numbers as the workspace stats, for one board (cached).
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        board = self.get_object()
+        return Response({"board": board.id, **board_stats(board.id)})
+
+    # GET /api/boards/{id}/snapshot/
+    # Columns + cards + assignees for a whole board in one response.
+    # Query count is constant: board, columns, cards, assignees.
+    # Cards take the same ?fields= / ?exclude= / ?view= as /api/tasks/.
+    @action(detail=True, methods=["get"])
+    def snapshot(self, request, pk=None):
+        board = self.get_object()
+
+        fields = TaskSerializer.requested_fields(request.query_params)
+        if fields is not None:
+            fields |= {"task_list"}  # cards are grouped by it
+
+        columns = list(board.task_lists.all())
+        tasks = Task.objects.filter(board=board).with_card_relations(fields)
+
+        cards_by_column = {column.id: [] for column in columns}
+        context = self.get_serializer_context()
+        card_context = {**context, "fields": fields}
+        for card in TaskSerializer(tasks, many=True, context=card_context).data:
+            cards_by_column.setdefault(card["task_list"], []).append(card)
+
+        return Response({
+            "id":        board.id,
+            "name":      board.name,
+            "project":   board.project_id,
+            "workspace": board.project.workspace_id,
+            "columns": [
+                {**column_data, "tasks": cards_by_column[column_data["id"]]}
+                for column_data in TaskListSerializer(columns, many=True, context=context).data
+            ],
+        })
+
 
 # =========================
 # WORKSPACE MEMBERS (LIST)
@@ -291,12 +305,11 @@ class WorkspaceMemberViewSet(ReadOnlyModelViewSet):
 
     def get_queryset(self):
         workspace_id = self.request.query_params.get("workspace")
-        if not workspace_id:
+        if not workspace_id or not is_workspace_member(self.request.user, workspace_id):
             return WorkspaceMember.objects.none()
         return WorkspaceMember.objects.filter(
             workspace_id=workspace_id,
-            workspace__workspacemember__user=self.request.user,
-        ).select_related("user").distinct()
+        ).select_related("user")
 
 
 # =========================
@@ -315,16 +328,7 @@ def search_user_for_invite(request):
     if not is_workspace_admin(request.user, workspace_id):
         return Response({"error": "Only workspace admins can search for invites."}, status=status.HTTP_403_FORBIDDEN)
 
-    users = (
-        User.objects.filter(email__icontains=query)
-        .exclude(workspacemember__workspace_id=workspace_id)
-        .order_by("email")[:5]
-    )
-
-    return Response([
-        {"id": u.id, "email": u.email, "username": u.username}
-        for u in users
-    ])
+    return Response(find_users(query, workspace_id, members=False))
 
 
 # =========================
@@ -371,20 +375,31 @@ def add_workspace_member(request):
             status=status.HTTP_404_NOT_FOUND,
         )
 
-    if WorkspaceMember.objects.filter(workspace=workspace, user=user).exists():
+    if is_workspace_member(user, workspace):
         return Response(
             {"error": "This user is already a member of the workspace."},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    member = WorkspaceMember.objects.create(
-        workspace=workspace,
-        user=user,
-        role=role,
-    )
+    try:
+        # added by someone else since the check above
+        with transaction.atomic():
+            member = WorkspaceMember.objects.create(
+                workspace=workspace,
+                user=user,
+                role=role,
+            )
+    except IntegrityError:
+        invalidate_workspace_roles(user)
+        return Response(
+            {"error": "This user is already a member of the workspace."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    invalidate_workspace_roles(user)
+    invalidate_user_search(workspace.id)
 
-    # ✅ Send invite email (non-blocking — errors are logged, not raised)
-    send_workspace_invite_email(
+    # ✅ Queue the invite email — delivered in the background, status on the row
+    invite = send_workspace_invite_email(
         inviter=request.user,
         invitee=user,
         workspace=workspace,
@@ -401,6 +416,10 @@ def add_workspace_member(request):
                 "username": user.username,
                 "role":     member.role,
             },
+            "invite_email": {
+                "id":     invite.id,
+                "status": invite.status,
+            },
         },
         status=status.HTTP_201_CREATED,
     )
@@ -451,6 +470,7 @@ def update_member_role(request):
 
     member.role = role
     member.save(update_fields=["role"])
+    invalidate_workspace_roles(member.user)
 
     return Response({
         "message": f"Role updated to {role}.",
@@ -497,4 +517,6 @@ def remove_workspace_member(request):
             )
 
     member.delete()
+    invalidate_workspace_roles(member.user)
+    invalidate_user_search(member.workspace_id)
     return Response({"message": "Member removed successfully."}, status=status.HTTP_200_OK)
\ No newline at end of file
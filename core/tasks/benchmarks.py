@@ -0,0 +1,521 @@
+import functools
+import math
+import statistics
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, resolve
+from django.urls.resolvers import URLResolver
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from projects.models import Board, InviteEmail, Project, Workspace, WorkspaceMember
+
+from .models import ActivityLog, Comment, Sprint, Task, TaskAssignee, TaskList
+
+
+# -------------------------
+# API BENCHMARK
+# Sends requests to every API route in-process through django.test.Client,
+# authenticated as one user with a JWT, from `concurrency` threads. Each
+# request is timed and its SQL queries counted. Paths are filled in from
+# the user's data (the first workspace they administer, its biggest board,
+# ...). Writes act on throwaway rows made in a per-request setup, which is
+# not timed, and deleted afterwards.
+# -------------------------
+
+# marks the rows a benchmark writes, so teardown can find them
+SCRATCH = "benchmark scratch"
+
+# API routes not benchmarked, with the reason
+EXCLUDED_ROUTES = {
+    "api/boards/<int:board_id>/events/": "event stream, stays open until the client leaves",
+}
+
+
+class Endpoint:
+    """
+    One benchmarked request. `path` is formatted with the fixture (plus
+    whatever setup(fixture) returns); data(values) builds a JSON body;
+    teardown(values, response) removes what the request created.
+    """
+
+    def __init__(self, method, path, data=None, setup=None, teardown=None):
+        self.method = method
+        self.path = path
+        self.data = data
+        self.setup = setup
+        self.teardown = teardown
+
+    @property
+    def name(self):
+        return f"{self.method} {self.path}"
+
+    def sample_path(self):
+        """The path with every placeholder set to 1 and no query string, for resolve()."""
+        return self.path.format_map(_SampleValues()).split("?")[0]
+
+
+# -------------------------
+# SCRATCH ROWS (setup / teardown)
+# -------------------------
+@functools.cache
+def _scratch_password():
+    return make_password(SCRATCH)
+
+
+def _marker(values):
+    return {"marker": f"{SCRATCH} {uuid.uuid4().hex}"}
+
+
+def _scratch_user(values):
+    marker = uuid.uuid4().hex
+    user = User.objects.create(
+        username=f"scratch_{marker}", email=f"scratch_{marker}@example.com",
+        password=_scratch_password(),
+    )
+    return {"scratch_user": user.id, "scratch_username": user.username, "scratch_email": user.email}
+
+
+def _scratch_member(values):
+    scratch = _scratch_user(values)
+    member = WorkspaceMember.objects.create(workspace_id=values["workspace"], user_id=scratch["scratch_user"])
+    return {**scratch, "scratch": member.id}
+
+
+def _scratch_workspace(values):
+    workspace = Workspace.objects.create(name=SCRATCH, owner_id=values["user"])
+    WorkspaceMember.objects.create(workspace=workspace, user_id=values["user"], role="ADMIN")
+    return {"scratch": workspace.id}
+
+
+def _scratch_project(values):
+    return {"scratch": Project.objects.create(name=SCRATCH, workspace_id=values["workspace"]).id}
+
+
+def _scratch_board(values):
+    return {"scratch": Board.objects.create(name=SCRATCH, project_id=values["project"]).id}
+
+
+def _scratch_task(values):
+    marker = _marker(values)
+    task = Task.objects.create(title=marker["marker"], task_list_id=values["task_list"], created_by_id=values["user"])
+    return {**marker, "scratch": task.id}
+
+
+def _scratch_assignee(values):
+    task = _scratch_task(values)
+    assignee = TaskAssignee.objects.create(task_id=task["scratch"], user_id=values["user"])
+    return {**task, "scratch_task": task["scratch"], "scratch": assignee.id}
+
+
+def _scratch_comment(values):
+    comment = Comment.objects.create(task_id=values["task"], user_id=values["user"], message=SCRATCH)
+    return {"scratch": comment.id}
+
+
+def _delete(model, key="scratch"):
+    def teardown(values, response):
+        model.objects.filter(pk=values[key]).delete()
+    return teardown
+
+
+def _delete_created(model):
+    def teardown(values, response):
+        if response.status_code == 201:
+            model.objects.filter(pk=response.json()["id"]).delete()
+    return teardown
+
+
+def _delete_marked_tasks(values, response):
+    Task.objects.filter(title=values["marker"]).delete()
+
+
+def _delete_scratch_user(values, response):
+    User.objects.filter(pk=values["scratch_user"]).delete()
+
+
+def _delete_invited_user(values, response):
+    # the invite mail goes out on a background thread; let it finish first
+    for _ in range(50 if settings.INVITE_EMAIL_ASYNC else 0):
+        pending = InviteEmail.objects.filter(
+            invitee_id=values["scratch_user"],
+            status__in=[InviteEmail.QUEUED, InviteEmail.RETRYING, InviteEmail.SENDING],
+        )
+        if not pending.exists():
+            break
+        time.sleep(0.1)
+    _delete_scratch_user(values, response)
+
+
+def _delete_registered_user(values, response):
+    User.objects.filter(username=values["marker"][-30:]).delete()
+
+
+def _delete_imported_task(values, response):
+    Task.objects.filter(board_id=values["board"], external_key=values["marker"][-30:]).delete()
+
+
+# -------------------------
+# ROUTES
+# -------------------------
+ENDPOINTS = [
+    Endpoint("GET", "/api/"),
+
+    # workspaces
+    Endpoint("GET", "/api/workspaces/"),
+    Endpoint("POST", "/api/workspaces/", data=lambda v: {"name": SCRATCH}, teardown=_delete_created(Workspace)),
+    Endpoint("GET", "/api/workspaces/{workspace}/"),
+    Endpoint("PATCH", "/api/workspaces/{scratch}/", data=lambda v: {"name": SCRATCH},
+             setup=_scratch_workspace, teardown=_delete(Workspace)),
+    Endpoint("PUT", "/api/workspaces/{scratch}/", data=lambda v: {"name": SCRATCH},
+             setup=_scratch_workspace, teardown=_delete(Workspace)),
+    Endpoint("DELETE", "/api/workspaces/{scratch}/", setup=_scratch_workspace, teardown=_delete(Workspace)),
+    Endpoint("GET", "/api/workspaces/{workspace}/stats/"),
+    Endpoint("GET", "/api/workspaces/{workspace}/export/?format=ndjson&resource=tasks"),
+    Endpoint("POST", "/api/workspaces/{workspace}/invite-bulk/",
+             data=lambda v: {"invites": [{"email": v["scratch_email"]}]},
+             setup=_scratch_user, teardown=_delete_invited_user),
+
+    # members
+    Endpoint("GET", "/api/workspace-members/?workspace={workspace}"),
+    Endpoint("GET", "/api/workspace-members/{member}/?workspace={workspace}"),
+    Endpoint("GET", "/api/search-user/?workspace={workspace}&q={username}"),
+    Endpoint("POST", "/api/add-workspace-member/",
+             data=lambda v: {"workspace": v["workspace"], "email": v["scratch_email"]},
+             setup=_scratch_user, teardown=_delete_invited_user),
+    Endpoint("PATCH", "/api/update-member-role/", data=lambda v: {"member_id": v["scratch"], "role": "MEMBER"},
+             setup=_scratch_member, teardown=_delete_scratch_user),
+    Endpoint("DELETE", "/api/remove-member/", data=lambda v: {"member_id": v["scratch"]},
+             setup=_scratch_member, teardown=_delete_scratch_user),
+
+    # projects and boards
+    Endpoint("GET", "/api/projects/?workspace={workspace}"),
+    Endpoint("POST", "/api/projects/", data=lambda v: {"name": SCRATCH, "workspace": v["workspace"]},
+             teardown=_delete_created(Project)),
+    Endpoint("GET", "/api/projects/{project}/"),
+    Endpoint("PATCH", "/api/projects/{scratch}/", data=lambda v: {"name": SCRATCH},
+             setup=_scratch_project, teardown=_delete(Project)),
+    Endpoint("PUT", "/api/projects/{scratch}/", data=lambda v: {"name": SCRATCH, "workspace": v["workspace"]},
+             setup=_scratch_project, teardown=_delete(Project)),
+    Endpoint("DELETE", "/api/projects/{scratch}/", setup=_scratch_project, teardown=_delete(Project)),
+    Endpoint("GET", "/api/boards/?project={project}"),
+    Endpoint("POST", "/api/boards/", data=lambda v: {"name": SCRATCH, "project": v["project"]},
+             teardown=_delete_created(Board)),
+    Endpoint("GET", "/api/boards/{board}/"),
+    Endpoint("PATCH", "/api/boards/{scratch}/", data=lambda v: {"name": SCRATCH},
+             setup=_scratch_board, teardown=_delete(Board)),
+    Endpoint("PUT", "/api/boards/{scratch}/", data=lambda v: {"name": SCRATCH, "project": v["project"]},
+             setup=_scratch_board, teardown=_delete(Board)),
+    Endpoint("DELETE", "/api/boards/{scratch}/", setup=_scratch_board, teardown=_delete(Board)),
+    Endpoint("GET", "/api/boards/{board}/snapshot/"),
+    Endpoint("GET", "/api/boards/{board}/snapshot/?view=card"),
+    Endpoint("GET", "/api/boards/{board}/stats/"),
+    Endpoint("POST", "/api/boards/{board}/import/",
+             data=lambda v: {"tasks": [{"key": v["marker"][-30:], "summary": SCRATCH}]},
+             setup=_marker, teardown=_delete_imported_task),
+
+    # sprints and columns
+    Endpoint("GET", "/api/sprints/?board={board}"),
+    Endpoint("GET", "/api/sprints/{sprint}/"),
+    Endpoint("GET", "/api/sprints/{sprint}/burndown/"),
+    Endpoint("GET", "/api/sprints/{sprint}/burnup/"),
+    Endpoint("GET", "/api/sprints/velocity/?board={board}"),
+    Endpoint("GET", "/api/task-lists/?board={board}"),
+    Endpoint("GET", "/api/task-lists/{task_list}/"),
+
+    # tasks
+    Endpoint("GET", "/api/tasks/?board={board}"),
+    Endpoint("GET", "/api/tasks/?board={board}&view=card"),
+    Endpoint("POST", "/api/tasks/",
+             data=lambda v: {"title": v["marker"], "task_list_id": v["task_list"], "assignees": [v["user"]]},
+             setup=_marker, teardown=_delete_marked_tasks),
+    Endpoint("GET", "/api/tasks/{task}/"),
+    Endpoint("PATCH", "/api/tasks/{scratch}/", data=lambda v: {"priority": "HIGH"},
+             setup=_scratch_task, teardown=_delete_marked_tasks),
+    Endpoint("PUT", "/api/tasks/{scratch}/", data=lambda v: {"title": v["marker"], "priority": "HIGH"},
+             setup=_scratch_task, teardown=_delete_marked_tasks),
+    Endpoint("DELETE", "/api/tasks/{scratch}/", setup=_scratch_task, teardown=_delete_marked_tasks),
+    Endpoint("GET", "/api/tasks/{parent}/tree/"),
+    Endpoint("GET", "/api/tasks/descendants/?ids={parent}"),
+    Endpoint("GET", "/api/tasks/search/?q={word}&board={board}"),
+    Endpoint("POST", "/api/tasks/move/", data=lambda v: {"task": v["scratch"], "task_list": v["task_list"]},
+             setup=_scratch_task, teardown=_delete_marked_tasks),
+    Endpoint("PATCH", "/api/tasks/bulk/", data=lambda v: {"tasks": [{"id": v["scratch"], "priority": "HIGH"}]},
+             setup=_scratch_task, teardown=_delete_marked_tasks),
+
+    # assignees, comments, activity
+    Endpoint("GET", "/api/task-assignees/"),
+    Endpoint("POST", "/api/task-assignees/", data=lambda v: {"task": v["scratch"], "user": v["user"]},
+             setup=_scratch_task, teardown=_delete_marked_tasks),
+    Endpoint("GET", "/api/task-assignees/{assignee}/"),
+    Endpoint("PATCH", "/api/task-assignees/{scratch}/", data=lambda v: {"user": v["user"]},
+             setup=_scratch_assignee, teardown=_delete_marked_tasks),
+    Endpoint("PUT", "/api/task-assignees/{scratch}/", data=lambda v: {"task": v["scratch_task"], "user": v["user"]},
+             setup=_scratch_assignee, teardown=_delete_marked_tasks),
+    Endpoint("DELETE", "/api/task-assignees/{scratch}/", setup=_scratch_assignee, teardown=_delete_marked_tasks),
+    Endpoint("GET", "/api/comments/?task={task}"),
+    Endpoint("POST", "/api/comments/", data=lambda v: {"task": v["task"], "message": SCRATCH},
+             teardown=_delete_created(Comment)),
+    Endpoint("GET", "/api/comments/{comment}/"),
+    Endpoint("PATCH", "/api/comments/{scratch}/", data=lambda v: {"message": SCRATCH},
+             setup=_scratch_comment, teardown=_delete(Comment)),
+    Endpoint("PUT", "/api/comments/{scratch}/", data=lambda v: {"task": v["task"], "message": SCRATCH},
+             setup=_scratch_comment, teardown=_delete(Comment)),
+    Endpoint("DELETE", "/api/comments/{scratch}/", setup=_scratch_comment, teardown=_delete(Comment)),
+    Endpoint("GET", "/api/activity/"),
+    Endpoint("GET", "/api/activity/?entity_type=Task&entity_id={task}"),
+    Endpoint("GET", "/api/activity/{activity}/"),
+
+    # users and auth
+    Endpoint("GET", "/api/me/"),
+    Endpoint("GET", "/api/users/?workspace={workspace}"),
+    Endpoint("GET", "/api/users/{member_user}/?workspace={workspace}"),
+    Endpoint("GET", "/api/users/search/?workspace={workspace}&q={username}"),
+    Endpoint("POST", "/api/auth/register/",
+             data=lambda v: {"username": v["marker"][-30:], "email": "", "password": SCRATCH},
+             setup=_marker, teardown=_delete_registered_user),
+    Endpoint("POST", "/api/token/",
+             data=lambda v: {"username": v["scratch_username"], "password": SCRATCH},
+             setup=_scratch_user, teardown=_delete_scratch_user),
+    Endpoint("POST", "/api/token/refresh/", data=lambda v: {"refresh": v["refresh"]}),
+]
+
+
+def api_patterns():
+    """{route: URL pattern} of every API URL, format-suffix variants left out."""
+    patterns = {}
+
+    def walk(resolver_patterns, prefix):
+        for pattern in resolver_patterns:
+            # resolve() drops the leading ^ of each regex part
+            route = prefix + str(pattern.pattern).removeprefix("^")
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, route)
+            elif route.startswith("api/") and "format" not in route:
+                patterns.setdefault(route, pattern)
+
+    walk(get_resolver().url_patterns, "")
+    return patterns
+
+
+def uncovered_routes(endpoints=ENDPOINTS):
+    """API routes that no endpoint reaches and are not in EXCLUDED_ROUTES."""
+    covered = {resolve(endpoint.sample_path()).route for endpoint in endpoints}
+    return sorted(set(api_patterns()) - covered - set(EXCLUDED_ROUTES))
+
+
+class _SampleValues(dict):
+    def __missing__(self, key):
+        return 1
+
+
+# -------------------------
+# FIXTURE
+# -------------------------
+def load_fixture(user):
+    """
+    Ids the endpoint paths are filled with: the first workspace the user
+    administers and, in it, the board with the most tasks.
+    """
+    workspace_id = (
+        WorkspaceMember.objects.filter(user=user, role="ADMIN")
+        .order_by("workspace_id").values_list("workspace_id", flat=True).first()
+    )
+    if workspace_id is None:
+        raise ValueError(f"{user.username} is not an admin of any workspace.")
+
+    board_id = (
+        Task.objects.filter(workspace_id=workspace_id)
+        .values("board_id").annotate(tasks=Count("id")).order_by("-tasks")
+        .values_list("board_id", flat=True).first()
+    )
+    if board_id is None:
+        raise ValueError("The workspace has no tasks; run seed_benchmark_data first.")
+
+    tasks = Task.objects.filter(board_id=board_id)
+    title = tasks.values_list("title", flat=True).first()
+    member = (
+        WorkspaceMember.objects.filter(workspace_id=workspace_id)
+        .exclude(user=user).values_list("id", "user_id").first()
+    ) or (None, user.id)
+
+    return {
+        "user": user.id,
+        "username": user.username,
+        "refresh": str(RefreshToken.for_user(user)),
+        "workspace": workspace_id,
+        "project": Board.objects.values_list("project_id", flat=True).get(pk=board_id),
+        "board": board_id,
+        "task_list": TaskList.objects.filter(board_id=board_id).values_list("id", flat=True).first(),
+        "sprint": (
+            Sprint.objects.filter(board_id=board_id).order_by("-is_active", "-start_date")
+            .values_list("id", flat=True).first()
+        ),
+        "task": tasks.values_list("id", flat=True).first(),
+        "parent": (
+            tasks.filter(parent__isnull=False).values_list("parent_id", flat=True).first()
+            or tasks.values_list("id", flat=True).first()
+        ),
+        "word": title.split()[-1] if title else "task",
+        "comment": Comment.objects.filter(workspace_id=workspace_id).values_list("id", flat=True).first(),
+        "assignee": TaskAssignee.objects.filter(workspace_id=workspace_id).values_list("id", flat=True).first(),
+        "activity": ActivityLog.objects.filter(workspace_id=workspace_id).values_list("id", flat=True).first(),
+        "member": member[0],
+        "member_user": member[1],
+    }
+
+
+def dataset_size(workspace_id):
+    return {
+        "tasks": Task.objects.filter(workspace_id=workspace_id).count(),
+        "comments": Comment.objects.filter(workspace_id=workspace_id).count(),
+        "assignees": TaskAssignee.objects.filter(workspace_id=workspace_id).count(),
+        "activity": ActivityLog.objects.filter(workspace_id=workspace_id).count(),
+        "members": WorkspaceMember.objects.filter(workspace_id=workspace_id).count(),
+    }
+
+
+# -------------------------
+# RUNNER
+# -------------------------
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def send(client, endpoint, fixture):
+    """One request, setup and teardown included: (ms, captured queries, status)."""
+    values = dict(fixture)
+    if endpoint.setup is not None:
+        values.update(endpoint.setup(values))
+    path = endpoint.path.format_map(values)
+    send = getattr(client, endpoint.method.lower())
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        if endpoint.method == "GET":
+            response = send(path)
+        else:
+            data = endpoint.data(values) if endpoint.data is not None else None
+            response = send(path, data, content_type="application/json")
+        if response.streaming:
+            # the client closes a streamed response once it is read to the end
+            b"".join(response.streaming_content)
+        elapsed = (time.perf_counter() - started) * 1000
+
+    if endpoint.teardown is not None:
+        endpoint.teardown(values, response)
+    return elapsed, queries.captured_queries, response.status_code
+
+
+def measure(endpoint, fixture, token, requests=50, concurrency=4, warmup=2):
+    """
+    Sends `requests` requests from `concurrency` threads (or the calling
+    thread when 1), after `warmup` untimed requests per thread.
+    """
+    samples, spans = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency)
+
+    def worker(count):
+        client = Client(headers={"Authorization": f"Bearer {token}"})
+        for _ in range(warmup):
+            send(client, endpoint, fixture)
+        barrier.wait()
+        started = time.perf_counter()
+        timings = []
+        for _ in range(count):
+            elapsed, queries, status = send(client, endpoint, fixture)
+            timings.append((elapsed, len(queries), status))
+        with lock:
+            samples.extend(timings)
+            spans.append((started, time.perf_counter()))
+
+    def thread(count):
+        try:
+            worker(count)
+        except Exception:
+            barrier.abort()
+            raise
+        finally:
+            connection.close()
+
+    if concurrency == 1:
+        worker(requests)
+    else:
+        shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        threads = [threading.Thread(target=thread, args=(share,)) for share in shares]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    if not samples:
+        raise RuntimeError(f"{endpoint.name}: every worker failed.")
+    wall = max(end for _, end in spans) - min(start for start, _ in spans)
+
+    latencies = sorted(sample[0] for sample in samples)
+    queries = sorted(sample[1] for sample in samples)
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample[2])] = statuses.get(str(sample[2]), 0) + 1
+
+    return {
+        "name": endpoint.name,
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample[2] >= 400),
+        "statuses": statuses,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(statistics.fmean(latencies), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "throughput_rps": round(len(samples) / wall, 1) if wall else None,
+        "queries": {"min": queries[0], "p50": percentile(queries, 50), "max": queries[-1]},
+    }
+
+
+def run_benchmark(user, endpoints=ENDPOINTS, requests=50, concurrency=4, warmup=2, progress=None):
+    """
+    Returns {"fixture", "dataset", "endpoints": [per-endpoint results],
+    "uncovered_routes"}. progress(result) is called after each endpoint.
+    """
+    fixture = load_fixture(user)
+    token = str(RefreshToken.for_user(user).access_token)
+
+    results = []
+    for endpoint in endpoints:
+        result = measure(endpoint, fixture, token, requests, concurrency, warmup)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+
+    return {
+        "fixture": {key: value for key, value in fixture.items() if key != "refresh"},
+        "dataset": dataset_size(fixture["workspace"]),
+        "endpoints": results,
+        "uncovered_routes": uncovered_routes(),
+    }
+
+
+def compare(previous, current):
+    """Rows of (name, p95 before, p95 after, change %, queries before, queries after)."""
+    before = {result["name"]: result for result in previous["endpoints"]}
+    rows = []
+    for result in current["endpoints"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        old_p95, new_p95 = old["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (new_p95 - old_p95) / old_p95 * 100 if old_p95 else 0.0
+        rows.append((result["name"], old_p95, new_p95, change, old["queries"]["p50"], result["queries"]["p50"]))
+    return rows
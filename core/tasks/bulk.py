@@ -0,0 +1,221 @@
+from django.db import transaction
+from django.db.models import Max
+
+from projects.models import WorkspaceMember
+from projects.permissions import is_workspace_admin
+
+from .models import Sprint, TaskList, Task, TaskAssignee
+from .ranking import POSITION_GAP
+from .serializers import TaskBulkCreateSerializer, TaskBulkUpdateSerializer
+from .utils import log_activities
+from .versions import bump_board_versions
+from .events import publish_board_event
+from .hierarchy import cyclic_parent_changes
+
+
+# -------------------------
+# BULK TASK CREATE / UPDATE / DELETE
+# Each function takes the list of items from the request body and returns
+# one result per item, in order: {"index", "id"} on success or
+# {"index", "errors"} when that item was rejected. Lookups are done once
+# per batch, never per item.
+# -------------------------
+
+def _error(index, message, field="non_field_errors"):
+    return {"index": index, "errors": {field: [message]}}
+
+
+def _validate(serializer_class, items, results, partial=False):
+    valid = []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item, partial=partial)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {"index": index, "errors": serializer.errors}
+    return valid
+
+
+def _workspace_of_tasks(user, task_ids):
+    """{task_id: workspace_id} for the visible tasks among task_ids."""
+    return dict(
+        Task.objects.visible_to(user)
+        .filter(pk__in=task_ids)
+        .values_list("id", "workspace_id")
+    )
+
+
+def _board_of_sprints(user, sprint_ids):
+    """{sprint_id: board_id} for the visible sprints among sprint_ids."""
+    return dict(
+        Sprint.objects.visible_to(user)
+        .filter(pk__in=sprint_ids)
+        .values_list("id", "board_id")
+    )
+
+
+def _publish(event_type, board_tasks):
+    """One event per board listing its task ids: [(board_id, task_id), ...]."""
+    by_board = {}
+    for board_id, task_id in board_tasks:
+        by_board.setdefault(board_id, []).append(task_id)
+    for board_id, ids in by_board.items():
+        publish_board_event(board_id, event_type, ids=ids)
+
+
+def _check_links(index, data, board_id, workspace_id, sprint_boards, parent_workspaces):
+    """Error result if the item's sprint / parent is not usable, else None."""
+    sprint = data.get("sprint")
+    if sprint is not None and sprint_boards.get(sprint) != board_id:
+        return _error(index, "Sprint not found on this board.", "sprint")
+
+    parent = data.get("parent")
+    if parent is not None and parent_workspaces.get(parent) != workspace_id:
+        return _error(index, "Parent task not found in this workspace.", "parent")
+    return None
+
+
+def bulk_create_tasks(user, items):
+    results = [None] * len(items)
+    valid = _validate(TaskBulkCreateSerializer, items, results)
+
+    lists = {
+        task_list.id: task_list
+        for task_list in TaskList.objects.visible_to(user)
+        .filter(pk__in={data["task_list_id"] for _, data in valid})
+        .select_related("board__project")
+    }
+    sprint_boards = _board_of_sprints(user, {d["sprint"] for _, d in valid if d.get("sprint")})
+    parent_workspaces = _workspace_of_tasks(user, {d["parent"] for _, d in valid if d.get("parent")})
+    members = set(
+        WorkspaceMember.objects.filter(
+            workspace_id__in={tl.board.project.workspace_id for tl in lists.values()},
+            user_id__in={uid for _, d in valid for uid in d.get("assignees", [])},
+        ).values_list("workspace_id", "user_id")
+    )
+    last_positions = dict(
+        Task.objects.filter(task_list_id__in=lists)
+        .values("task_list_id")
+        .annotate(last=Max("position"))
+        .values_list("task_list_id", "last")
+    )
+
+    to_create = []
+    for index, data in valid:
+        task_list = lists.get(data["task_list_id"])
+        if task_list is None:
+            results[index] = _error(index, "Task list not found or access denied.", "task_list_id")
+            continue
+
+        location = task_list.task_location()
+        workspace_id = location["workspace_id"]
+        error = _check_links(index, data, task_list.board_id, workspace_id, sprint_boards, parent_workspaces)
+        if error is None and any((workspace_id, uid) not in members for uid in data.get("assignees", [])):
+            error = _error(index, "Cannot assign a user who is not a workspace member.", "assignees")
+        if error is not None:
+            results[index] = error
+            continue
+
+        position = last_positions.get(task_list.id, 0) + POSITION_GAP
+        last_positions[task_list.id] = position
+
+        fields = {k: v for k, v in data.items() if k not in ("task_list_id", "assignees", "parent", "sprint")}
+        task = Task(
+            **fields,
+            **location,
+            parent_id=data.get("parent"),
+            sprint_id=data.get("sprint"),
+            position=position,
+            created_by=user,
+        )
+        to_create.append((index, task, data.get("assignees", [])))
+
+    with transaction.atomic():
+        Task.objects.bulk_create([task for _, task, _ in to_create])
+        TaskAssignee.objects.bulk_create(
+            [
+                TaskAssignee(task=task, user_id=uid, workspace_id=task.workspace_id)
+                for _, task, assignees in to_create
+                for uid in set(assignees)
+            ]
+        )
+        bump_board_versions(*(task.board_id for _, task, _ in to_create))
+        _publish("tasks.created", [(task.board_id, task.id) for _, task, _ in to_create])
+        log_activities(
+            user, "created task", "Task", [task.id for _, task, _ in to_create],
+            workspaces={task.id: task.workspace_id for _, task, _ in to_create},
+        )
+
+    for index, task, _ in to_create:
+        results[index] = {"index": index, "id": task.id}
+    return results
+
+
+def bulk_update_tasks(user, items):
+    results = [None] * len(items)
+    valid = _validate(TaskBulkUpdateSerializer, items, results, partial=True)
+
+    tasks = (
+        Task.objects.visible_to(user)
+        .in_bulk({data["id"] for _, data in valid if "id" in data})
+    )
+    sprint_boards = _board_of_sprints(user, {d["sprint"] for _, d in valid if d.get("sprint")})
+    parent_workspaces = _workspace_of_tasks(user, {d["parent"] for _, d in valid if d.get("parent")})
+    cyclic = cyclic_parent_changes({d["id"]: d["parent"] for _, d in valid if d.get("parent") and "id" in d})
+
+    changed, fields = {}, set()
+    for index, data in valid:
+        task = tasks.get(data.get("id"))
+        if task is None:
+            results[index] = _error(index, "Task not found or access denied.", "id")
+            continue
+
+        error = _check_links(index, data, task.board_id, task.workspace_id, sprint_boards, parent_workspaces)
+        if error is None and task.id in cyclic:
+            error = _error(index, "A task cannot be nested under itself or its own subtasks.", "parent")
+        if error is not None:
+            results[index] = error
+            continue
+
+        for attr, value in data.items():
+            if attr == "id":
+                continue
+            column = f"{attr}_id" if attr in ("parent", "sprint") else attr
+            setattr(task, column, value)
+            fields.add(column)
+        changed[task.id] = task
+        results[index] = {"index": index, "id": task.id}
+
+    with transaction.atomic():
+        if changed and fields:
+            Task.objects.bulk_update(changed.values(), sorted(fields), batch_size=500)
+        bump_board_versions(*(task.board_id for task in changed.values()))
+        _publish("tasks.updated", [(task.board_id, task.id) for task in changed.values()])
+        log_activities(
+            user, "updated task", "Task", list(changed),
+            workspaces={task.id: task.workspace_id for task in changed.values()},
+        )
+    return results
+
+
+def bulk_delete_tasks(user, ids):
+    workspaces = _workspace_of_tasks(user, ids)
+
+    results, deletable = [], []
+    for index, task_id in enumerate(ids):
+        workspace_id = workspaces.get(task_id)
+        if workspace_id is None:
+            results.append(_error(index, "Task not found or access denied.", "id"))
+        elif not is_workspace_admin(user, workspace_id):
+            results.append(_error(index, "Only workspace admins can delete tasks.", "id"))
+        else:
+            deletable.append(task_id)
+            results.append({"index": index, "id": task_id})
+
+    with transaction.atomic():
+        board_tasks = list(Task.objects.filter(pk__in=deletable).values_list("board_id", "id"))
+        bump_board_versions(*(board_id for board_id, _ in board_tasks))
+        Task.objects.filter(pk__in=deletable).delete()
+        _publish("tasks.deleted", board_tasks)
+        log_activities(user, "deleted task", "Task", deletable, workspaces=workspaces)
+    return results
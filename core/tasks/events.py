@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# BOARD EVENTS
+# Writes publish small deltas per board once their transaction commits;
+# the SSE / WebSocket endpoints (tasks/streams.py) relay them to the
+# clients viewing that board. The broker is selected with
+# settings.BOARD_EVENTS_BROKER.
+# -------------------------
+
+# A subscriber further behind than this is sent {"type": "resync"} and
+# skips the backlog; the client reloads the board instead.
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Backoff between Redis reconnect attempts, doubling up to the maximum.
+RECONNECT_DELAY_SECONDS = 1
+RECONNECT_MAX_DELAY_SECONDS = 30
+
+
+class Subscription:
+    """One client's queue. Filled from any thread, read on its event loop."""
+
+    def __init__(self, broker, board_id):
+        self.broker = broker
+        self.board_id = board_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # the client's loop is gone without closing the subscription
+            self.close()
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "board": self.board_id})
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fan-out to the subscribers of this worker process only (default)."""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, board_id):
+        subscription = Subscription(self, board_id)
+        with self.lock:
+            self.subscribers.setdefault(board_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            board = self.subscribers.get(subscription.board_id, set())
+            board.discard(subscription)
+            if not board:
+                self.subscribers.pop(subscription.board_id, None)
+
+    def publish(self, board_id, event):
+        self.deliver(board_id, event)
+
+    def deliver(self, board_id, event):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(board_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Fans events out to every worker through Redis pub/sub
+    (settings.BOARD_EVENTS_REDIS_URL). Each process runs one listener thread
+    that hands incoming events to its local subscribers. When the connection
+    drops it reconnects with backoff and sends every local subscriber
+    {"type": "resync"}, since anything published meanwhile was missed.
+    """
+
+    channel_prefix = "taskflow:board:"
+
+    def __init__(self, url=None):
+        super().__init__()
+        import redis
+
+        self.redis = redis.Redis.from_url(url or settings.BOARD_EVENTS_REDIS_URL)
+        self.listener = None
+
+    def subscribe(self, board_id):
+        if self.listener is None or not self.listener.is_alive():
+            with self.lock:
+                if self.listener is None or not self.listener.is_alive():
+                    self.listener = threading.Thread(target=self.listen, daemon=True)
+                    self.listener.start()
+        return super().subscribe(board_id)
+
+    def publish(self, board_id, event):
+        self.redis.publish(f"{self.channel_prefix}{board_id}", json.dumps(event, cls=DjangoJSONEncoder))
+
+    def listen(self):
+        from redis.exceptions import ConnectionError, TimeoutError
+
+        delay, reconnecting = RECONNECT_DELAY_SECONDS, False
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(f"{self.channel_prefix}*")
+                if reconnecting:
+                    self.resync_all()
+                delay, reconnecting = RECONNECT_DELAY_SECONDS, False
+                for message in pubsub.listen():
+                    self.receive(message)
+            except (ConnectionError, TimeoutError):
+                logger.warning("Board events lost Redis, reconnecting in %ss", delay, exc_info=True)
+                time.sleep(delay)
+                delay, reconnecting = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS), True
+            finally:
+                pubsub.close()
+
+    def receive(self, message):
+        try:
+            board_id = int(message["channel"].decode().removeprefix(self.channel_prefix))
+            event = json.loads(message["data"])
+        except (ValueError, TypeError):
+            logger.warning("Skipping malformed board event %r", message)
+            return
+        self.deliver(board_id, event)
+
+    def resync_all(self):
+        with self.lock:
+            board_ids = list(self.subscribers)
+        for board_id in board_ids:
+            self.deliver(board_id, {"type": "resync", "board": board_id})
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.BOARD_EVENTS_BROKER)()
+    return _broker
+
+
+def publish_board_event(board_id, event_type, **data):
+    """Publishes {"type", "board", **data} to the board after commit."""
+    event = {"type": event_type, "board": board_id, **data}
+    # round-trip through JSON now, so every broker sends the same plain data
+    event = json.loads(json.dumps(event, cls=DjangoJSONEncoder))
+    transaction.on_commit(lambda: get_broker().publish(board_id, event))
@@ -0,0 +1,161 @@
+import csv
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import OuterRef
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from .models import ActivityLog, Comment, Task, TaskAssignee
+
+
+# -------------------------
+# WORKSPACE EXPORT
+# Rows come from values_list().iterator(), which reads through a
+# server-side cursor in EXPORT_CHUNK_SIZE batches, and are written out as
+# NDJSON lines or CSV rows without model instances or serializers. Output
+# is sent in blocks of about EXPORT_BLOCK_SIZE bytes (gzipped on the fly
+# when the client accepts it), so memory use does not grow with the
+# workspace.
+# -------------------------
+
+def _tasks(workspace_id):
+    assignees = TaskAssignee.objects.filter(task=OuterRef("pk")).order_by("user_id").values("user_id")
+    return Task.objects.filter(workspace_id=workspace_id).annotate(assignees=ArraySubquery(assignees))
+
+
+# resource -> (queryset for a workspace, exported columns)
+RESOURCES = {
+    "tasks": (
+        _tasks,
+        [
+            "id", "title", "description", "work_type", "status", "priority",
+            "project_id", "board_id", "task_list_id", "position", "parent_id",
+            "sprint_id", "start_date", "due_date", "story_points",
+            "created_by_id", "created_at", "assignees",
+        ],
+    ),
+    "comments": (
+        lambda workspace_id: Comment.objects.filter(workspace_id=workspace_id),
+        ["id", "task_id", "user_id", "message", "created_at"],
+    ),
+    "activity": (
+        lambda workspace_id: ActivityLog.objects.filter(workspace_id=workspace_id),
+        ["id", "user_id", "action", "entity_type", "entity_id", "created_at"],
+    ),
+}
+
+
+def export_rows(workspace_id, resource):
+    """(columns, iterator of value tuples) for one resource, in id order."""
+    queryset, columns = RESOURCES[resource]
+    rows = (
+        queryset(workspace_id)
+        .order_by("id")
+        .values_list(*columns)
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+    return columns, rows
+
+
+def ndjson_lines(workspace_id, resources):
+    """One JSON object per line, tagged with its "type"."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for resource in resources:
+        columns, rows = export_rows(workspace_id, resource)
+        for row in rows:
+            yield encoder.encode({"type": resource, **dict(zip(columns, row))}) + "\n"
+
+
+class _Line:
+    """File-like object for csv.writer that hands back what was written."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(workspace_id, resource):
+    """Header row, then one row per record; list columns are space separated."""
+    writer = csv.writer(_Line())
+    columns, rows = export_rows(workspace_id, resource)
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(
+            [" ".join(map(str, value)) if isinstance(value, list) else value for value in row]
+        )
+
+
+def blocks(lines, compress=False):
+    """Joins lines into ~EXPORT_BLOCK_SIZE byte blocks, gzip-compressed if asked."""
+    gzip = zlib.compressobj(wbits=31) if compress else None
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= settings.EXPORT_BLOCK_SIZE:
+            block = b"".join(buffer)
+            buffer, size = [], 0
+            block = gzip.compress(block) if gzip else block
+            if block:
+                yield block
+
+    block = b"".join(buffer)
+    if gzip:
+        block = gzip.compress(block) + gzip.flush()
+    if block:
+        yield block
+
+
+async def _async_blocks(sync_blocks):
+    # step the generator on the request's sync thread, one block at a time,
+    # so its DB cursor stays on that thread's connection
+    step = sync_to_async(next, thread_sensitive=True)
+    while True:
+        block = await step(sync_blocks, None)
+        if block is None:
+            return
+        yield block
+
+
+def export_response(request, workspace_id, export_format, resources):
+    if export_format == "csv":
+        lines = csv_lines(workspace_id, resources[0])
+        content_type, extension = "text/csv; charset=utf-8", "csv"
+    else:
+        lines = ndjson_lines(workspace_id, resources)
+        content_type, extension = "application/x-ndjson", "ndjson"
+
+    compress = "gzip" in request.headers.get("Accept-Encoding", "")
+    content = blocks(lines, compress)
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        # Django would read a sync iterator to the end before sending it
+        content = _async_blocks(content)
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    if compress:
+        response["Content-Encoding"] = "gzip"
+    response["Vary"] = "Accept-Encoding"
+    name = "-".join(["workspace", str(workspace_id), *resources])
+    response["Content-Disposition"] = f'attachment; filename="{name}.{extension}"'
+    return response
+
+
+# Let ?format=ndjson|csv through DRF's content negotiation; the export
+# itself is streamed, these only render error responses.
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode() + b"\n"
+
+
+class CSVRenderer(NDJSONRenderer):
+    media_type = "text/csv"
+    format = "csv"
@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Task
+
+
+# -------------------------
+# TASK HIERARCHY (epic → story → subtask)
+# Whole subtrees are read with one recursive CTE instead of one request
+# per level. The CTE carries the path it walked, so a cycle that slipped
+# into the data ends the walk instead of looping; writes refuse to create
+# one in the first place (cyclic_parent_changes).
+# -------------------------
+
+DESCENDANTS_SQL = """
+    WITH RECURSIVE tree (id, path) AS (
+        SELECT id, ARRAY[id] FROM task WHERE id = ANY(%s)
+        UNION ALL
+        SELECT child.id, tree.path || child.id
+        FROM task child
+        JOIN tree ON child.parent_id = tree.id
+        WHERE child.id <> ALL(tree.path) AND cardinality(tree.path) <= %s
+    )
+    SELECT id FROM tree
+"""
+
+ANCESTORS_SQL = """
+    WITH RECURSIVE chain (id, parent_id, path) AS (
+        SELECT id, parent_id, ARRAY[id] FROM task WHERE id = ANY(%s)
+        UNION ALL
+        SELECT up.id, up.parent_id, chain.path || up.id
+        FROM task up
+        JOIN chain ON up.id = chain.parent_id
+        WHERE up.id <> ALL(chain.path)
+    )
+    SELECT DISTINCT id, parent_id FROM chain
+"""
+
+
+def subtree_tasks(root_ids, queryset=None):
+    """The roots and all their descendants, as one query over the CTE."""
+    queryset = Task.objects.all() if queryset is None else queryset
+    return queryset.filter(
+        id__in=RawSQL(DESCENDANTS_SQL, [list(root_ids), settings.TASK_TREE_MAX_DEPTH])
+    )
+
+
+def build_trees(root_ids, tasks, serialize):
+    """
+    Nests `tasks` (roots plus descendants) under their parents and rolls up
+    points and done counts over each subtree. Returns one dict per root
+    found, in root_ids order: serialize(task) + {"rollup", "children"}.
+    """
+    by_id = {task.id: task for task in tasks}
+    children = {}
+    for task in sorted(by_id.values(), key=lambda t: (t.position, t.id)):
+        if task.parent_id in by_id and task.id not in root_ids:
+            children.setdefault(task.parent_id, []).append(task)
+
+    def node(task, seen):
+        seen = seen | {task.id}
+        kids = [node(child, seen) for child in children.get(task.id, []) if child.id not in seen]
+
+        done = task.status == "DONE"
+        rollup = {
+            "tasks": 1 + sum(kid["rollup"]["tasks"] for kid in kids),
+            "done": int(done) + sum(kid["rollup"]["done"] for kid in kids),
+            "story_points": (task.story_points or 0) + sum(kid["rollup"]["story_points"] for kid in kids),
+            "completed_points": (task.story_points or 0) * done
+            + sum(kid["rollup"]["completed_points"] for kid in kids),
+        }
+        rollup["done_ratio"] = round(rollup["done"] / rollup["tasks"], 4)
+        return {**serialize(task), "rollup": rollup, "children": kids}
+
+    return [node(by_id[root_id], frozenset()) for root_id in root_ids if root_id in by_id]
+
+
+def cyclic_parent_changes(changes):
+    """
+    Task ids from {task_id: new_parent_id} whose change would put the task
+    under itself, taking the other changes in the same batch into account.
+    One CTE loads the current ancestor chains of every new parent.
+    """
+    changes = {task_id: parent_id for task_id, parent_id in changes.items() if parent_id is not None}
+    if not changes:
+        return set()
+
+    with connection.cursor() as cursor:
+        cursor.execute(ANCESTORS_SQL, [list(set(changes.values()))])
+        parents = dict(cursor.fetchall())
+    parents.update(changes)
+
+    cyclic = set()
+    for task_id, parent_id in changes.items():
+        seen, current = set(), parent_id
+        while current is not None and current not in seen:
+            if current == task_id:
+                cyclic.add(task_id)
+                break
+            seen.add(current)
+            current = parents.get(current)
+    return cyclic
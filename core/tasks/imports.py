@@ -0,0 +1,481 @@
+import csv
+import json
+import re
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from projects.models import WorkspaceMember
+
+from .events import publish_board_event
+from .hierarchy import cyclic_parent_changes
+from .models import Comment, Sprint, Task, TaskAssignee
+from .ranking import POSITION_GAP
+from .utils import log_activity
+from .versions import bump_board_versions
+
+
+# -------------------------
+# BULK TASK IMPORT (CSV / JSON / NDJSON, Jira-style columns)
+# Records are read as a stream and written IMPORT_BATCH_SIZE at a time:
+# per batch one lookup of the keys already on the board, one of the
+# assignees' emails, one bulk INSERT (or UPDATE) of the tasks and one each
+# for assignees and comments, in its own transaction. Parent links are set
+# after the last batch, so a record may name a parent further down the file.
+# Records with an external key are idempotent: a re-run skips (or, with
+# mode="update", updates) the tasks it already created.
+# -------------------------
+
+class ImportFormatError(ValueError):
+    """The file itself can't be read (bad JSON, unknown format)."""
+
+
+class RecordError(ValueError):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+FORMATS = ("csv", "json", "ndjson")
+
+# Jira export headers → record fields (after lower-casing, spaces → "_")
+ALIASES = {
+    "issue_key": "key",
+    "summary": "title",
+    "issue_type": "work_type",
+    "type": "work_type",
+    "parent_key": "parent",
+    "assignee": "assignees",
+    "custom_field_(story_points)": "story_points",
+    "due_date": "due_date",
+    "duedate": "due_date",
+    "created": "created_at",
+    "comment": "comments",
+    "column": "list",
+    "task_list": "list",
+}
+
+WORK_TYPES = {"task": "TASK", "sub-task": "TASK", "subtask": "TASK", "story": "STORY", "bug": "BUG", "epic": "EPIC"}
+STATUSES = {
+    "todo": "TODO", "to do": "TODO", "open": "TODO", "backlog": "TODO",
+    "in_progress": "IN_PROGRESS", "in progress": "IN_PROGRESS", "in review": "IN_PROGRESS",
+    "done": "DONE", "closed": "DONE", "resolved": "DONE",
+}
+PRIORITIES = {"highest": "HIGH", "high": "HIGH", "medium": "MEDIUM", "low": "LOW", "lowest": "LOW"}
+
+# column a task lands in when its record names none
+STATUS_COLUMNS = {"TODO": "to do", "IN_PROGRESS": "in progress", "DONE": "done"}
+
+# fields a re-run in "update" mode may change; column and position stay as they are
+UPDATE_FIELDS = [
+    "title", "description", "work_type", "status", "priority",
+    "story_points", "start_date", "due_date", "sprint",
+]
+
+MAX_REPORTED_ERRORS = 100
+PARENT_BATCH_SIZE = 5000
+
+LINK_PARENTS_SQL = """
+    UPDATE task SET parent_id = link.parent_id
+    FROM unnest(%s::integer[], %s::integer[]) AS link (id, parent_id)
+    WHERE task.id = link.id
+"""
+
+
+# -------------------------
+# Reading
+# -------------------------
+def _field(name):
+    name = str(name).strip().lower().replace(" ", "_")
+    return ALIASES.get(name, name)
+
+
+def read_records(stream, fmt):
+    """Yields one dict per record from a text stream."""
+    if fmt == "csv":
+        reader = csv.reader(stream)
+        header = [_field(name) for name in next(reader, [])]
+        for row in reader:
+            record = {}
+            for name, value in zip(header, row):
+                if name == "comments":
+                    # Jira repeats the Comment column, one comment per cell
+                    if value:
+                        record.setdefault("comments", []).append(value)
+                elif value or name not in record:
+                    record[name] = value
+            yield record
+        return
+
+    try:
+        if fmt == "ndjson":
+            records = (json.loads(line) for line in stream if line.strip())
+        elif fmt == "json":
+            records = json.load(stream)
+            records = records.get("tasks", []) if isinstance(records, dict) else records
+        else:
+            raise ImportFormatError(f"Unknown format '{fmt}', expected one of: {', '.join(FORMATS)}.")
+        yield from normalise_records(records)
+    except json.JSONDecodeError as error:
+        raise ImportFormatError(f"Invalid JSON: {error}")
+
+
+def normalise_records(records):
+    """Maps each record's keys to field names (JSON input, already parsed)."""
+    for record in records:
+        yield {_field(name): value for name, value in record.items()} if isinstance(record, dict) else record
+
+
+def format_of(filename):
+    extension = filename.rsplit(".", 1)[-1].lower()
+    return {"jsonl": "ndjson"}.get(extension, extension)
+
+
+# -------------------------
+# Cleaning one record
+# -------------------------
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _choice(value, choices, field, errors):
+    value = _text(value)
+    if value and value.lower() not in choices:
+        errors[field] = [f"Unknown value '{value}'."]
+    return choices.get(value.lower())
+
+
+def _date(value, field, errors):
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        errors[field] = [f"Expected an ISO date, got '{value}'."]
+    return parsed
+
+
+def _datetime(value):
+    """Aware datetime from an ISO datetime or date (midnight), else None."""
+    value = _text(value)
+    try:
+        parsed = parse_datetime(value) or parse_date(value)
+    except ValueError:
+        return None
+    if parsed is None:
+        return None
+    if not isinstance(parsed, datetime):
+        parsed = datetime.combine(parsed, time.min)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _emails(value):
+    values = value if isinstance(value, list) else re.split(r"[,;\s]+", _text(value))
+    return [email.strip().lower() for email in values if email and email.strip()]
+
+
+def _comment(value):
+    """(author email or "", body, created) from a dict or Jira's "date;author;body"."""
+    if isinstance(value, dict):
+        return _text(value.get("author")).lower(), _text(value.get("body")), _text(value.get("created"))
+    parts = _text(value).split(";", 2)
+    if len(parts) == 3:
+        return parts[1].strip().lower(), parts[2].strip(), parts[0].strip()
+    return "", _text(value), ""
+
+
+def clean_record(record):
+    """
+    Task field values plus the links to resolve ("key", "list", "sprint",
+    "parent", "assignees", "comments"). Raises RecordError.
+    """
+    if not isinstance(record, dict):
+        raise RecordError({"non_field_errors": ["Expected an object."]})
+
+    errors = {}
+    fields = {}
+    title = _text(record.get("title"))
+    if not title:
+        errors["title"] = ["This field is required."]
+    elif len(title) > 255:
+        errors["title"] = ["Ensure this field has no more than 255 characters."]
+    fields["title"] = title
+
+    if "description" in record:
+        fields["description"] = _text(record["description"]) or None
+    for field, choices in (("work_type", WORK_TYPES), ("status", STATUSES), ("priority", PRIORITIES)):
+        value = _choice(record.get(field), choices, field, errors)
+        if value:
+            fields[field] = value
+
+    points = _text(record.get("story_points"))
+    if points:
+        try:
+            fields["story_points"] = int(float(points))
+            if fields["story_points"] < 0:
+                raise ValueError
+        except ValueError:
+            errors["story_points"] = [f"Expected a whole number, got '{points}'."]
+
+    for field in ("start_date", "due_date"):
+        if field in record:
+            fields[field] = _date(record[field], field, errors)
+    created_at = _datetime(record.get("created_at"))
+    if _text(record.get("created_at")) and created_at is None:
+        errors["created_at"] = [f"Expected an ISO date or datetime, got '{_text(record['created_at'])}'."]
+
+    key = _text(record.get("key"))
+    if len(key) > 100:
+        errors["key"] = ["Ensure this field has no more than 100 characters."]
+
+    comments = record.get("comments") or []
+    if errors:
+        raise RecordError(errors)
+
+    return {
+        "fields": fields,
+        "created_at": created_at,
+        "key": key or None,
+        "list": _text(record.get("list")).lower(),
+        "sprint": _text(record.get("sprint")),
+        "sprint_start": _date(record.get("sprint_start"), "sprint_start", {}),
+        "sprint_end": _date(record.get("sprint_end"), "sprint_end", {}),
+        "parent": _text(record.get("parent")) or None,
+        "assignees": _emails(record.get("assignees")),
+        "comments": [_comment(c) for c in (comments if isinstance(comments, list) else [comments])],
+    }
+
+
+# -------------------------
+# Importing
+# -------------------------
+class TaskImporter:
+    """
+    Imports records into one board as `user`. mode: "skip" leaves tasks
+    whose key is already on the board alone, "update" rewrites their
+    fields (UPDATE_FIELDS) and adds missing assignees. progress(report) is
+    called after every batch.
+    """
+
+    def __init__(self, board, user, mode="skip", batch_size=None, progress=None):
+        if mode not in ("skip", "update"):
+            raise ValueError("mode must be 'skip' or 'update'.")
+        self.board = board
+        self.user = user
+        self.mode = mode
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.progress = progress
+
+        self.columns = list(board.task_lists.select_related("board__project").order_by("position"))
+        if not self.columns:
+            raise ValueError("The board has no columns to import into.")
+        self.columns_by_title = {column.title.lower(): column for column in self.columns}
+        self.workspace_id = self.columns[0].board.project.workspace_id
+        self.positions = dict(
+            Task.objects.filter(task_list__in=self.columns)
+            .values("task_list_id")
+            .annotate(last=Max("position"))
+            .values_list("task_list_id", "last")
+        )
+        self.sprints = {
+            name.lower(): sprint_id
+            for sprint_id, name in Sprint.objects.filter(board=board).values_list("id", "name")
+        }
+        self.members = {}   # email → user id, or None when not a workspace member
+        self.parents = []   # (task id, parent key), linked once every batch is in
+
+        self.report = {
+            "processed": 0, "created": 0, "updated": 0, "skipped": 0, "failed": 0,
+            "assignees": 0, "comments": 0, "sprints": 0, "parents": 0,
+            "unknown_users": 0, "unresolved_parents": 0, "errors": [],
+        }
+
+    def run(self, records):
+        numbered = enumerate(records, start=1)
+        while batch := list(islice(numbered, self.batch_size)):
+            self.import_batch(batch)
+            if self.progress is not None:
+                self.progress(self.report)
+
+        self.link_parents()
+        bump_board_versions(self.board.id)
+        # too many changes for per-card deltas; viewers reload the board
+        publish_board_event(self.board.id, "resync")
+        return self.report
+
+    def fail(self, number, errors):
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"record": number, "errors": errors})
+
+    # --- lookups, once per batch ---
+
+    def resolve_users(self, emails):
+        emails = set(emails) - set(self.members)
+        if not emails:
+            return
+        found = dict(
+            WorkspaceMember.objects.filter(workspace_id=self.workspace_id)
+            .annotate(email_lower=Lower("user__email"))
+            .filter(email_lower__in=emails)
+            .order_by("-user_id")
+            .values_list("email_lower", "user_id")
+        )
+        for email in emails:
+            self.members[email] = found.get(email)
+
+    def resolve_sprints(self, rows):
+        missing = {}
+        for _, row in rows:
+            name = row["sprint"]
+            if name and name.lower() not in self.sprints and name.lower() not in missing:
+                start = row["sprint_start"] or timezone.localdate()
+                missing[name.lower()] = Sprint(
+                    board=self.board, name=name[:100], start_date=start,
+                    end_date=row["sprint_end"] or start + timedelta(days=14),
+                )
+        if missing:
+            Sprint.objects.bulk_create(missing.values())
+            self.sprints.update({key: sprint.id for key, sprint in missing.items()})
+            self.report["sprints"] += len(missing)
+
+    def column_for(self, row):
+        status_column = STATUS_COLUMNS.get(row["fields"].get("status", "TODO"))
+        return (
+            self.columns_by_title.get(row["list"])
+            or self.columns_by_title.get(status_column)
+            or self.columns[0]
+        )
+
+    # --- one batch ---
+
+    def import_batch(self, batch):
+        self.report["processed"] += len(batch)
+        rows, keys = [], set()
+        for number, record in batch:
+            try:
+                row = clean_record(record)
+            except RecordError as error:
+                self.fail(number, error.errors)
+                continue
+            if row["key"] is not None:
+                if row["key"] in keys:
+                    self.fail(number, {"key": [f"Duplicate key '{row['key']}' in this batch."]})
+                    continue
+                keys.add(row["key"])
+            rows.append((number, row))
+
+        existing = {
+            task.external_key: task
+            for task in Task.objects.filter(board=self.board, external_key__in=keys).defer("search_vector")
+        }
+        self.resolve_users(
+            [email for _, row in rows for email in row["assignees"]]
+            + [author for _, row in rows for author, _, _ in row["comments"] if author]
+        )
+
+        with transaction.atomic():
+            self.resolve_sprints(rows)
+            created, updated = [], []
+            for _, row in rows:
+                sprint_id = self.sprints.get(row["sprint"].lower()) if row["sprint"] else None
+                task = existing.get(row["key"])
+                if task is None:
+                    column = self.column_for(row)
+                    position = self.positions.get(column.id, 0) + POSITION_GAP
+                    self.positions[column.id] = position
+                    task = Task(
+                        **row["fields"],
+                        **column.task_location(),
+                        sprint_id=sprint_id,
+                        position=position,
+                        created_by=self.user,
+                        external_key=row["key"],
+                    )
+                    if row["created_at"]:
+                        task.created_at = row["created_at"]
+                    created.append((task, row))
+                elif self.mode == "update":
+                    for field, value in row["fields"].items():
+                        setattr(task, field, value)
+                    if row["sprint"]:
+                        task.sprint_id = sprint_id
+                    updated.append((task, row))
+                else:
+                    self.report["skipped"] += 1
+
+            Task.objects.bulk_create([task for task, _ in created], batch_size=1000)
+            if updated:
+                Task.objects.bulk_update([task for task, _ in updated], UPDATE_FIELDS, batch_size=1000)
+
+            assignees = [
+                TaskAssignee(task=task, user_id=self.members[email], workspace_id=task.workspace_id)
+                for task, row in created + updated
+                for email in dict.fromkeys(row["assignees"])
+                if self.members.get(email)
+            ]
+            TaskAssignee.objects.bulk_create(assignees, ignore_conflicts=True, batch_size=1000)
+
+            # comments only come in with their task, so re-runs don't repeat them
+            comments = []
+            for task, row in created:
+                for author, body, created_at in row["comments"]:
+                    if not body:
+                        continue
+                    author_id = self.members.get(author)
+                    comments.append(Comment(
+                        task=task,
+                        user_id=author_id or self.user.id,
+                        workspace_id=task.workspace_id,
+                        # keep the original author when they aren't a member here
+                        message=body if author_id or not author else f"{author}: {body}",
+                        created_at=_datetime(created_at) or timezone.now(),
+                    ))
+            Comment.objects.bulk_create(comments, batch_size=1000)
+
+            bump_board_versions(self.board.id)
+            if created:
+                # one entry per batch rather than per task
+                log_activity(
+                    self.user, f"imported {len(created)} tasks", "Board", self.board.id,
+                    workspace_id=self.workspace_id,
+                )
+
+        self.parents.extend((task.id, row["parent"]) for task, row in created + updated if row["parent"])
+        self.report["created"] += len(created)
+        self.report["updated"] += len(updated)
+        self.report["assignees"] += len(assignees)
+        self.report["comments"] += len(comments)
+        self.report["unknown_users"] = sum(1 for user_id in self.members.values() if user_id is None)
+
+    def link_parents(self):
+        for start in range(0, len(self.parents), PARENT_BATCH_SIZE):
+            chunk = self.parents[start:start + PARENT_BATCH_SIZE]
+            ids = dict(
+                Task.objects.filter(board=self.board, external_key__in={key for _, key in chunk})
+                .values_list("external_key", "id")
+            )
+            changes = {task_id: ids[key] for task_id, key in chunk if key in ids and ids[key] != task_id}
+            cyclic = cyclic_parent_changes(changes)
+            linked = {task_id: parent_id for task_id, parent_id in changes.items() if task_id not in cyclic}
+
+            # one UPDATE over two arrays; bulk_update's CASE per row is far slower here
+            with connection.cursor() as cursor:
+                cursor.execute(LINK_PARENTS_SQL, [list(linked), list(linked.values())])
+            self.report["parents"] += len(linked)
+            self.report["unresolved_parents"] += len(chunk) - len(linked)
+        self.parents = []
+
+
+def import_tasks(board, user, records, **options):
+    """Imports an iterable of records into `board`; returns the report."""
+    return TaskImporter(board, user, **options).run(records)
@@ -0,0 +1,102 @@
+from django.db import connections
+
+from projects.models import Board, Project
+
+from .models import ActivityLog, Comment, Task, TaskAssignee
+
+
+# -------------------------
+# DENORMALISED TASK LOCATION
+# Task carries board_id / project_id / workspace_id, and its comments,
+# assignees and activity carry workspace_id, so scoping never walks
+# task_list → board → project. Writes that place a task set them from the
+# column (TaskList.task_location); the functions below re-copy them when a
+# task, board or project changes hands, and fill rows older than the columns.
+# -------------------------
+
+def sync_task_children(tasks, workspace_id):
+    """Re-points the comments, assignees and activity of `tasks` (ids or an id subquery)."""
+    Comment.objects.filter(task_id__in=tasks).update(workspace_id=workspace_id)
+    TaskAssignee.objects.filter(task_id__in=tasks).update(workspace_id=workspace_id)
+    ActivityLog.objects.filter(entity_type="Task", entity_id__in=tasks).update(workspace_id=workspace_id)
+
+
+def sync_board_location(board_id):
+    """After a board moved to another project."""
+    project_id, workspace_id = (
+        Board.objects.filter(pk=board_id).values_list("project_id", "project__workspace_id").get()
+    )
+    tasks = Task.objects.filter(board_id=board_id)
+    tasks.update(project_id=project_id, workspace_id=workspace_id)
+    sync_task_children(tasks.values("id"), workspace_id)
+
+
+def sync_project_location(project_id):
+    """After a project moved to another workspace."""
+    workspace_id = Project.objects.values_list("workspace_id", flat=True).get(pk=project_id)
+    tasks = Task.objects.filter(project_id=project_id)
+    tasks.update(workspace_id=workspace_id)
+    sync_task_children(tasks.values("id"), workspace_id)
+
+
+# One statement per table, run over id ranges so each batch is a short
+# transaction on a large table. Only rows that differ are written, so a
+# re-run after the backfill is cheap and also repairs drifted rows.
+BACKFILL_SQL = {
+    "task": """
+        UPDATE task SET board_id = b.id, project_id = p.id, workspace_id = p.workspace_id
+        FROM task_list tl
+        JOIN board b ON b.id = tl.board_id
+        JOIN project p ON p.id = b.project_id
+        WHERE task.task_list_id = tl.id
+          AND task.id >= %s AND task.id < %s
+          AND (task.board_id, task.project_id, task.workspace_id)
+              IS DISTINCT FROM (b.id, p.id, p.workspace_id)
+    """,
+    "comment": """
+        UPDATE comment SET workspace_id = t.workspace_id
+        FROM task t
+        WHERE comment.task_id = t.id
+          AND comment.id >= %s AND comment.id < %s
+          AND comment.workspace_id IS DISTINCT FROM t.workspace_id
+    """,
+    "task_assignee": """
+        UPDATE task_assignee SET workspace_id = t.workspace_id
+        FROM task t
+        WHERE task_assignee.task_id = t.id
+          AND task_assignee.id >= %s AND task_assignee.id < %s
+          AND task_assignee.workspace_id IS DISTINCT FROM t.workspace_id
+    """,
+    "activity_log": """
+        UPDATE activity_log SET workspace_id = t.workspace_id
+        FROM task t
+        WHERE activity_log.entity_type = 'Task' AND activity_log.entity_id = t.id
+          AND activity_log.id >= %s AND activity_log.id < %s
+          AND activity_log.workspace_id IS DISTINCT FROM t.workspace_id
+    """,
+}
+
+
+def backfill_locations(batch_size=10000, using="default", progress=None):
+    """
+    Fills the denormalised columns table by table (tasks first, the rest copy
+    from them). Returns {table: rows updated}; progress(table, updated) is
+    called after each batch.
+    """
+    connection = connections[using]
+    updated = {}
+    for table, sql in BACKFILL_SQL.items():
+        updated[table] = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT min(id), max(id) FROM {table}")
+            low, high = cursor.fetchone()
+        if low is None:
+            continue
+
+        for start in range(low, high + 1, batch_size):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [start, start + batch_size])
+                updated[table] += cursor.rowcount
+            if progress is not None:
+                progress(table, updated[table])
+    return updated
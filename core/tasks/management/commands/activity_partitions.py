@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly activity_log partitions and detach (or drop) "
+        "the ones older than the retention window. Safe to run daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead", type=int, default=settings.ACTIVITY_LOG_PARTITIONS_AHEAD,
+            help="Months of partitions to keep ready beyond the current one.",
+        )
+        parser.add_argument(
+            "--retention", type=int, default=settings.ACTIVITY_LOG_RETENTION_MONTHS,
+            help="Months of history to keep attached (0 keeps everything).",
+        )
+        parser.add_argument(
+            "--drop", action="store_true",
+            help="Drop expired partitions instead of only detaching them.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            raise CommandError("activity_log is not partitioned; run migrations first.")
+
+        current  = partitions.month_start(timezone.now())
+        existing = partitions.monthly_partitions()
+        dry_run  = options["dry_run"]
+
+        for offset in range(options["ahead"] + 1):
+            month = partitions.add_months(current, offset)
+            if month in existing:
+                continue
+            self.stdout.write(f"create {partitions.partition_name(month)}")
+            if not dry_run:
+                partitions.create_partition(month)
+
+        if options["retention"] <= 0:
+            return
+
+        cutoff = partitions.add_months(current, -options["retention"])
+        verb   = "drop" if options["drop"] else "detach"
+
+        # expired rows in the default partition get a partition of their
+        # own first, so they leave with the rest of their month
+        for month in partitions.default_partition_months(before=cutoff):
+            name = partitions.partition_name(month)
+            self.stdout.write(f"create {name} (rows from {partitions.DEFAULT_PARTITION})")
+            if not dry_run:
+                partitions.create_partition(month)
+            existing[month] = name
+
+        for month, name in sorted(existing.items()):
+            if month >= cutoff:
+                break
+            self.stdout.write(f"{verb} {name}")
+            if not dry_run:
+                partitions.detach_partition(name, drop=options["drop"])
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.locations import backfill_locations
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill (or repair) the denormalised board / project / workspace ids on "
+        "tasks and the workspace id on comments, assignees and activity, in "
+        "id-range batches. Only rows that differ are written, so re-runs are cheap."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000, help="Rows per id range (default 10000).")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        def progress(table, updated):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {table}: {updated} updated")
+
+        for table, updated in backfill_locations(options["batch_size"], progress=progress).items():
+            self.stdout.write(f"{table}: {updated} row(s) updated.")
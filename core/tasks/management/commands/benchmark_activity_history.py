@@ -0,0 +1,45 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import ActivityLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Time per-task history lookups (the /api/activity/?entity_type=Task&"
+        "entity_id= query) for random task ids and print one query plan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lookups", type=int, default=200)
+        parser.add_argument("--limit", type=int, default=50, help="Rows per history page.")
+
+    def handle(self, *args, **options):
+        bounds = ActivityLog.objects.filter(entity_type="Task").order_by("entity_id")
+        first, last = bounds.first(), bounds.last()
+        if first is None:
+            raise CommandError("No task activity to look up; seed the database first.")
+
+        def history(entity_id):
+            return ActivityLog.objects.filter(
+                entity_type="Task", entity_id=entity_id,
+            ).order_by("-created_at", "-id")[: options["limit"]]
+
+        timings = []
+        for _ in range(options["lookups"]):
+            entity_id = random.randint(first.entity_id, last.entity_id)
+            started = time.perf_counter()
+            list(history(entity_id))
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f"{ActivityLog.objects.count()} rows, {options['lookups']} lookups:"
+            f" p50 {statistics.median(timings):.2f} ms"
+            f"  p95 {timings[int(len(timings) * 0.95)]:.2f} ms"
+            f"  max {timings[-1]:.2f} ms"
+        )
+        self.stdout.write(history(first.entity_id).explain(analyze=True))
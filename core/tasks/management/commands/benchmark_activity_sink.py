@@ -0,0 +1,71 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from tasks import utils
+from tasks.models import Task
+
+
+SINKS = ["tasks.utils.SyncActivitySink", "tasks.utils.BufferedActivitySink"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a task update + activity log write from concurrent threads with "
+        "each activity sink and report per-update latency. Writes real rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--task", type=int, required=True, help="Id of the task to update.")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--updates", type=int, default=200, help="Updates per thread.")
+
+    def handle(self, *args, **options):
+        try:
+            task = Task.objects.select_related("created_by").get(pk=options["task"])
+        except Task.DoesNotExist:
+            raise CommandError(f"Task {options['task']} does not exist.")
+        if task.created_by is None:
+            raise CommandError("The task needs a created_by user to log activity as.")
+
+        for path in SINKS:
+            latencies = self.run(import_string(path)(), task, options["threads"], options["updates"])
+            latencies.sort()
+            self.stdout.write(
+                f"{path.rsplit('.', 1)[1]:<22}"
+                f" p50 {statistics.median(latencies):7.2f} ms"
+                f"  p95 {latencies[int(len(latencies) * 0.95)]:7.2f} ms"
+                f"  max {latencies[-1]:7.2f} ms"
+            )
+
+    def run(self, sink, task, threads, updates):
+        latencies = []
+        lock = threading.Lock()
+        previous, utils._sink = utils._sink, sink
+
+        def worker():
+            timings = []
+            for i in range(updates):
+                started = time.perf_counter()
+                with transaction.atomic():
+                    Task.objects.filter(pk=task.pk).update(position=i)
+                    utils.log_activity(task.created_by, "updated task", "Task", task.pk)
+                timings.append((time.perf_counter() - started) * 1000)
+            connection.close()
+            with lock:
+                latencies.extend(timings)
+
+        try:
+            pool = [threading.Thread(target=worker) for _ in range(threads)]
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+            sink.flush()
+        finally:
+            utils._sink = previous
+        return latencies
@@ -0,0 +1,99 @@
+import json
+import os
+import platform
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from tasks.benchmarks import ENDPOINTS, EXCLUDED_ROUTES, compare, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API route in-process under concurrency and report "
+        "p50/p95/p99 latency, throughput and SQL queries per endpoint, written "
+        "to JSON. Run it against seed_benchmark_data output; writes go to "
+        "throwaway rows that are deleted again (activity they log is kept)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", default="bench_1", help="Username to send requests as (default bench_1).")
+        parser.add_argument("--requests", type=int, default=50, help="Timed requests per endpoint.")
+        parser.add_argument("--concurrency", type=int, default=4, help="Threads sending requests.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per thread first.")
+        parser.add_argument("--only", help="Only endpoints whose 'METHOD /path' contains this text.")
+        parser.add_argument("--output", help="Results file (default benchmark-<timestamp>.json).")
+        parser.add_argument("--compare", help="Earlier results file to print p95 / query changes against.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}; run seed_benchmark_data first.")
+        if options["requests"] < 1 or options["concurrency"] < 1 or options["warmup"] < 0:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        previous = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as f:
+                    previous = json.load(f)
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Can't read {options['compare']}: {error}")
+
+        endpoints = [e for e in ENDPOINTS if not options["only"] or options["only"] in e.name]
+        if not endpoints:
+            raise CommandError(f"No endpoint matches {options['only']!r}.")
+
+        def progress(result):
+            latency = result["latency_ms"]
+            self.stdout.write(
+                f"{result['name'][:60]:<60}"
+                f" p50 {latency['p50']:8.2f}  p95 {latency['p95']:8.2f}  p99 {latency['p99']:8.2f} ms"
+                f"  {result['throughput_rps'] or 0:7.1f} req/s  {result['queries']['p50']:3} queries"
+                + (f"  {result['errors']} errors" if result["errors"] else "")
+            )
+
+        started = datetime.now()
+        # lets the test client's host through ALLOWED_HOSTS and keeps mail in memory
+        setup_test_environment()
+        try:
+            results = run_benchmark(
+                user, endpoints, options["requests"], options["concurrency"], options["warmup"], progress,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+        finally:
+            teardown_test_environment()
+
+        results = {
+            "started_at": started.isoformat(timespec="seconds"),
+            "settings": {
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "warmup": options["warmup"],
+                "debug": settings.DEBUG,
+                "python": platform.python_version(),
+            },
+            **results,
+            "excluded_routes": EXCLUDED_ROUTES,
+        }
+        output = options["output"] or f"benchmark-{started:%Y%m%d-%H%M%S}.json"
+        if os.path.dirname(output):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+        for route in results["uncovered_routes"]:
+            self.stdout.write(self.style.WARNING(f"Not benchmarked: {route}"))
+        if previous is not None:
+            self.stdout.write(f"\nChanges against {options['compare']}:")
+            for name, old, new, change, old_queries, new_queries in compare(previous, results):
+                self.stdout.write(
+                    f"{name[:60]:<60} p95 {old:8.2f} → {new:8.2f} ms ({change:+6.1f}%)"
+                    f"  queries {old_queries} → {new_queries}"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output}."))
@@ -0,0 +1,50 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Time ranked full-text task searches (the /api/tasks/search/ query) "
+        "for one user with words sampled from existing task titles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Username to scope searches to.")
+        parser.add_argument("--searches", type=int, default=100)
+        parser.add_argument("--limit", type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}.")
+
+        titles = list(Task.objects.visible_to(user).values_list("title", flat=True)[:1000])
+        words = [word for title in titles for word in title.split() if len(word) > 3]
+        if not words:
+            raise CommandError("No visible tasks to sample search terms from; seed the database first.")
+
+        def search(text):
+            return Task.objects.visible_to(user).search(text)[: options["limit"]]
+
+        timings = []
+        for _ in range(options["searches"]):
+            text = random.choice(words)
+            started = time.perf_counter()
+            list(search(text))
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f"{options['searches']} searches:"
+            f" p50 {statistics.median(timings):.2f} ms"
+            f"  p95 {timings[int(len(timings) * 0.95)]:.2f} ms"
+            f"  max {timings[-1]:.2f} ms"
+        )
+        self.stdout.write(search(random.choice(words)).explain(analyze=True))
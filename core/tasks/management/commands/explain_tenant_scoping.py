@@ -0,0 +1,58 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.models import Workspace, Project, Board
+from tasks.models import Sprint, TaskList, Task, TaskAssignee, Comment, ActivityLog
+
+
+# The JOIN + DISTINCT scoping every viewset used before visible_to().
+LEGACY_SCOPES = {
+    "workspaces":     (Workspace,    "workspacemember__user"),
+    "projects":       (Project,      "workspace__workspacemember__user"),
+    "boards":         (Board,        "project__workspace__workspacemember__user"),
+    "sprints":        (Sprint,       "board__project__workspace__workspacemember__user"),
+    "task-lists":     (TaskList,     "board__project__workspace__workspacemember__user"),
+    "tasks":          (Task,         "task_list__board__project__workspace__workspacemember__user"),
+    "task-assignees": (TaskAssignee, "task__task_list__board__project__workspace__workspacemember__user"),
+    "comments":       (Comment,      "task__task_list__board__project__workspace__workspacemember__user"),
+    "activity":       (ActivityLog,  "user__workspacemember__workspace__workspacemember__user"),
+}
+
+TIMING_RE = re.compile(r"Execution Time: ([\d.]+) ms")
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the tenant-scoped list query of every viewset for one user, "
+        "legacy JOIN + DISTINCT vs. visible_to(). Run against a seeded database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Username to scope queries to.")
+        parser.add_argument("--limit", type=int, default=50, help="Page size to apply (default 50).")
+        parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE (executes the queries).")
+        parser.add_argument("--plans", action="store_true", help="Print the full plans, not just timings.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}.")
+
+        limit   = options["limit"]
+        explain = {"analyze": True, "buffers": True} if options["analyze"] else {}
+
+        for name, (model, lookup) in LEGACY_SCOPES.items():
+            legacy  = model.objects.filter(**{lookup: user}).distinct()[:limit]
+            current = model.objects.visible_to(user)[:limit]
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"/api/{name}/"))
+            for label, qs in (("legacy ", legacy), ("current", current)):
+                plan = qs.explain(**explain)
+                timing = TIMING_RE.search(plan)
+                summary = f"{timing.group(1)} ms" if timing else plan.splitlines()[0]
+                self.stdout.write(f"  {label}  {summary}")
+                if options["plans"]:
+                    self.stdout.write("    " + plan.replace("\n", "\n    "))
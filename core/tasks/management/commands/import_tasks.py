@@ -0,0 +1,59 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.models import Board
+from tasks.imports import FORMATS, ImportFormatError, format_of, import_tasks, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Import tasks (with assignees matched by email, sprints, parent links and "
+        "comments) into a board from a CSV, JSON or NDJSON file, Jira-style column "
+        "names accepted. Records with a key are idempotent: re-runs skip them, or "
+        "update them with --mode update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument("--board", type=int, required=True, help="Board id to import into.")
+        parser.add_argument("--user", required=True, help="Username recorded as creator of the tasks.")
+        parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension).")
+        parser.add_argument("--mode", choices=["skip", "update"], default="skip",
+                            help="What to do with tasks already imported (default skip).")
+        parser.add_argument("--batch-size", type=int, help="Records per transaction (default IMPORT_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        try:
+            board = Board.objects.select_related("project").get(pk=options["board"])
+        except Board.DoesNotExist:
+            raise CommandError(f"No board with id {options['board']}.")
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}.")
+
+        fmt = options["format"] or format_of(options["path"])
+        started = time.monotonic()
+
+        def progress(report):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"  {report['processed']} records, {report['created']} created, "
+                f"{report['updated']} updated, {report['failed']} failed "
+                f"({report['processed'] / max(elapsed, 0.001):.0f} records/s)"
+            )
+
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as stream:
+                report = import_tasks(
+                    board, user, read_records(stream, fmt),
+                    mode=options["mode"], batch_size=options["batch_size"], progress=progress,
+                )
+        except (OSError, ImportFormatError, ValueError) as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.monotonic() - started:.1f}s."))
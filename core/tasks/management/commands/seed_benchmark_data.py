@@ -0,0 +1,67 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.seeding import seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a benchmark dataset: workspaces with members, projects, boards, "
+        "columns, sprints, tasks, assignees, comments and activity. Users are "
+        "<prefix>_1..N with the prefix as password; <prefix>_1 is a superuser in "
+        "every workspace. Adds to the database, it never deletes. Refuses to "
+        "run with DEBUG off unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workspaces", type=int, default=2)
+        parser.add_argument("--members", type=int, default=20, help="Members per workspace.")
+        parser.add_argument("--projects", type=int, default=3, help="Projects per workspace.")
+        parser.add_argument("--boards", type=int, default=2, help="Boards per project.")
+        parser.add_argument("--lists", type=int, default=4, help="Columns per board (at most 6).")
+        parser.add_argument("--sprints", type=int, default=4, help="Sprints per board.")
+        parser.add_argument("--tasks", type=int, default=500, help="Tasks per board.")
+        parser.add_argument("--assignees", type=float, default=1.5, help="Average assignees per task.")
+        parser.add_argument("--comments", type=float, default=2.0, help="Average comments per task.")
+        parser.add_argument("--activity", type=float, default=3.0, help="Average activity entries per task.")
+        parser.add_argument("--prefix", default="bench", help="Username prefix and password (default bench).")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed (default 1).")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Tasks generated per batch.")
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Seed even with DEBUG off (creates a superuser whose password is the prefix).",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError(
+                f"DEBUG is off; this creates the superuser {options['prefix']}_1 with password "
+                f"{options['prefix']!r}. Pass --force if this really is a benchmark database."
+            )
+        sizes = ["workspaces", "members", "projects", "boards", "lists", "sprints", "tasks"]
+        if any(options[name] < 1 for name in sizes) or options["batch_size"] < 1:
+            raise CommandError(f"--{', --'.join(sizes)} and --batch-size must be positive.")
+
+        started = time.monotonic()
+
+        def progress(report):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"  {report['boards']} boards, {report['tasks']} tasks "
+                f"({report['tasks'] / max(elapsed, 0.001):.0f} tasks/s)"
+            )
+
+        report = seed_benchmark_data(
+            **{name: options[name] for name in (
+                *sizes, "assignees", "comments", "activity", "prefix", "seed", "batch_size",
+            )},
+            progress=progress,
+        )
+        self.stdout.write(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {time.monotonic() - started:.1f}s. Log in as {options['prefix']}_1 "
+            f"(password {options['prefix']!r})."
+        ))
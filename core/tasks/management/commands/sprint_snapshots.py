@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.sprints import take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Record today's points for every running sprint (and the final row of "
+        "sprints that ended since the last run). Run daily from cron; re-running "
+        "the same day just refreshes that day's rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Snapshot date as YYYY-MM-DD (default: today).")
+
+    def handle(self, *args, **options):
+        day = None
+        if options["date"]:
+            try:
+                day = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD.")
+
+        count = take_snapshots(day)
+        self.stdout.write(f"Wrote {count} sprint snapshot(s).")
@@ -0,0 +1,141 @@
+# Generated by Django 5.2.11 on 2026-10-18 16:40
+
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Rebuilds activity_log as a table range-partitioned by month on created_at.
+# Postgres requires the partition key in the primary key, so the table's
+# primary key becomes (id, created_at); id keeps its own sequence.
+# Later months are created by `manage.py activity_partitions`.
+
+COLUMNS = "id, action, entity_type, entity_id, created_at, user_id"
+MONTHS_AHEAD = 3
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_activity_log(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    execute = schema_editor.execute
+    execute("ALTER TABLE activity_log RENAME TO activity_log_unpartitioned")
+    execute("ALTER TABLE activity_log_unpartitioned RENAME CONSTRAINT activity_log_pkey TO activity_log_unpartitioned_pkey")
+    execute(
+        "ALTER TABLE activity_log_unpartitioned RENAME CONSTRAINT "
+        "activity_log_user_id_f1e09264_fk_auth_user_id TO activity_log_unpartitioned_user_fk"
+    )
+    execute("ALTER INDEX activity_log_user_id_f1e09264 RENAME TO activity_log_unpartitioned_user_id")
+    execute("ALTER INDEX activity_created_id_idx RENAME TO activity_log_unpartitioned_created_id")
+
+    execute(
+        """
+        CREATE TABLE activity_log (
+            id          integer      NOT NULL,
+            action      varchar(255) NOT NULL,
+            entity_type varchar(50)  NOT NULL,
+            entity_id   integer      NOT NULL,
+            created_at  timestamp with time zone NOT NULL,
+            user_id     integer      NOT NULL,
+            CONSTRAINT activity_log_pkey PRIMARY KEY (id, created_at),
+            CONSTRAINT activity_log_user_id_f1e09264_fk_auth_user_id
+                FOREIGN KEY (user_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    execute("CREATE INDEX activity_log_user_id_f1e09264 ON activity_log (user_id)")
+    execute("CREATE INDEX activity_created_id_idx ON activity_log (created_at, id)")
+    execute("CREATE TABLE activity_log_default PARTITION OF activity_log DEFAULT")
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(created_at) FROM activity_log_unpartitioned")
+        (oldest,) = cursor.fetchone()
+
+    now   = timezone.now()
+    month = date((oldest or now).year, (oldest or now).month, 1)
+    last  = add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        execute(
+            f"CREATE TABLE activity_log_y{month:%Y}m{month:%m} PARTITION OF activity_log "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        month = add_months(month, 1)
+
+    # check the deferred user FK now, or its pending trigger events block
+    # the DDL that follows in this transaction
+    execute("SET CONSTRAINTS ALL IMMEDIATE")
+    execute(f"INSERT INTO activity_log ({COLUMNS}) SELECT {COLUMNS} FROM activity_log_unpartitioned")
+    execute("DROP TABLE activity_log_unpartitioned")
+
+    execute("CREATE SEQUENCE activity_log_id_seq AS integer OWNED BY activity_log.id")
+    execute("SELECT setval('activity_log_id_seq', COALESCE((SELECT max(id) FROM activity_log), 0) + 1, false)")
+    execute("ALTER TABLE activity_log ALTER COLUMN id SET DEFAULT nextval('activity_log_id_seq')")
+
+
+def unpartition_activity_log(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    execute = schema_editor.execute
+    execute("ALTER TABLE activity_log RENAME TO activity_log_partitioned")
+    execute("ALTER TABLE activity_log_partitioned RENAME CONSTRAINT activity_log_pkey TO activity_log_partitioned_pkey")
+    execute(
+        "ALTER TABLE activity_log_partitioned RENAME CONSTRAINT "
+        "activity_log_user_id_f1e09264_fk_auth_user_id TO activity_log_partitioned_user_fk"
+    )
+    execute("ALTER INDEX activity_log_user_id_f1e09264 RENAME TO activity_log_partitioned_user_id")
+    execute("ALTER INDEX activity_created_id_idx RENAME TO activity_log_partitioned_created_id")
+
+    execute(
+        """
+        CREATE TABLE activity_log (
+            id          integer      NOT NULL PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+            action      varchar(255) NOT NULL,
+            entity_type varchar(50)  NOT NULL,
+            entity_id   integer      NOT NULL,
+            created_at  timestamp with time zone NOT NULL,
+            user_id     integer      NOT NULL,
+            CONSTRAINT activity_log_user_id_f1e09264_fk_auth_user_id
+                FOREIGN KEY (user_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED
+        )
+        """
+    )
+    execute("CREATE INDEX activity_log_user_id_f1e09264 ON activity_log (user_id)")
+    execute("CREATE INDEX activity_created_id_idx ON activity_log (created_at, id)")
+    execute("SET CONSTRAINTS ALL IMMEDIATE")
+    execute(
+        f"INSERT INTO activity_log ({COLUMNS}) OVERRIDING SYSTEM VALUE "
+        f"SELECT {COLUMNS} FROM activity_log_partitioned"
+    )
+    execute("DROP TABLE activity_log_partitioned CASCADE")
+    execute(
+        "SELECT setval(pg_get_serial_sequence('activity_log', 'id'), "
+        "COALESCE((SELECT max(id) FROM activity_log), 0) + 1, false)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_activity_log, unpartition_activity_log),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['entity_type', 'entity_id', 'created_at'], name='activity_entity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', 'created_at'], name='activity_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+# Re-number every column's cards to multiples of ranking.POSITION_GAP (1024),
+# keeping their current (position, id) order, so moves can take midpoints.
+
+SPREAD_POSITIONS = """
+UPDATE task
+SET position = ranked.rank * 1024
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY task_list_id ORDER BY position, id) AS rank
+    FROM task
+) AS ranked
+WHERE task.id = ranked.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_partition_activity_log'),
+    ]
+
+    operations = [
+        migrations.RunSQL(SPREAD_POSITIONS, migrations.RunSQL.noop),
+    ]
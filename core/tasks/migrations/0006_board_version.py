@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-18 16:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_alter_project_table_alter_workspace_table_and_more'),
+        ('tasks', '0005_task_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardVersion',
+            fields=[
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='version', serialize=False, to='projects.board')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'board_version',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-18 16:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SprintSnapshot',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('total_points', models.PositiveIntegerField(default=0)),
+                ('completed_points', models.PositiveIntegerField(default=0)),
+                ('total_tasks', models.PositiveIntegerField(default=0)),
+                ('completed_tasks', models.PositiveIntegerField(default=0)),
+                ('sprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='tasks.sprint')),
+            ],
+            options={
+                'db_table': 'sprint_snapshot',
+                'ordering': ['sprint', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('sprint', 'date'), name='sprint_snapshot_sprint_date_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 5.2.11 on 2026-10-18 17:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+# Adds the denormalised board / project / workspace ids (tasks/locations.py)
+# and fills them in batches. Not atomic, so every batch commits on its own;
+# `manage.py backfill_task_locations` runs the same backfill again.
+# The new indexes are built concurrently so task and activity_log stay
+# writable meanwhile.
+
+ACTIVITY_INDEX = "activity_workspace_created_idx"
+ACTIVITY_INDEX_COLUMNS = "workspace_id, created_at, id"
+
+def backfill(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    from tasks.locations import backfill_locations
+
+    backfill_locations(using=schema_editor.connection.alias)
+
+
+def create_activity_index(apps, schema_editor):
+    """
+    Postgres can't CREATE INDEX CONCURRENTLY on a partitioned table, so the
+    parent index is created ON ONLY activity_log (invalid until complete),
+    each partition's index is built concurrently and attached to it.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    execute = schema_editor.execute
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child  ON child.oid  = i.inhrelid "
+            "WHERE parent.relname = 'activity_log' AND pg_table_is_visible(parent.oid)"
+        )
+        partitions = [row[0] for row in cursor.fetchall()]
+
+    if not partitions:
+        execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {ACTIVITY_INDEX} ON activity_log ({ACTIVITY_INDEX_COLUMNS})")
+        return
+    execute(f"CREATE INDEX IF NOT EXISTS {ACTIVITY_INDEX} ON ONLY activity_log ({ACTIVITY_INDEX_COLUMNS})")
+    for partition in partitions:
+        index = f"{partition}_workspace_created_idx"
+        execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {partition} ({ACTIVITY_INDEX_COLUMNS})")
+        execute(f"ALTER INDEX {ACTIVITY_INDEX} ATTACH PARTITION {index}")
+
+
+def drop_activity_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # drops the partitions' indexes with it
+    schema_editor.execute(f"DROP INDEX IF EXISTS {ACTIVITY_INDEX}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('projects', '0004_invite_email'),
+        ('tasks', '0007_sprint_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitylog',
+            name='workspace',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.workspace'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='workspace',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.workspace'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='board',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.board'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='project',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.project'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.workspace'),
+        ),
+        migrations.AddField(
+            model_name='taskassignee',
+            name='workspace',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='projects.workspace'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='activitylog',
+                    index=models.Index(fields=['workspace', 'created_at', 'id'], name='activity_workspace_created_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_activity_index, drop_activity_index),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['board', 'position', 'id'], name='task_board_position_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['project'], name='task_project_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['workspace'], name='task_workspace_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='taskassignee',
+            index=models.Index(fields=['workspace'], name='task_assignee_workspace_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['workspace'], name='comment_workspace_idx'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-18 17:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_invite_email'),
+        ('tasks', '0008_task_locations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='external_key',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('board', 'external_key'), name='task_board_external_key_uniq'),
+        ),
+    ]
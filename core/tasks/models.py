@@ -1,11 +1,46 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
 from django.utils import timezone
 
-from projects.models import Board
+from projects.models import Board, Project, Workspace, WorkspaceMember, WorkspaceScopedQuerySet, member_workspace_ids
 
 User = settings.AUTH_USER_MODEL
 
+# Text search configuration for Task.search_vector and the queries against it
+TASK_SEARCH_CONFIG = "english"
+
+
+# -------------------------
+# TENANT-SCOPED QUERYSETS
+# -------------------------
+class BoardScopedQuerySet(WorkspaceScopedQuerySet):
+    workspace_field = "board__project__workspace"
+
+
+class TaskChildQuerySet(WorkspaceScopedQuerySet):
+    # denormalised copy of task.workspace, see Task.board / project / workspace
+    workspace_field = "workspace"
+
+
+class ActivityLogQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Activity in the user's workspaces. Entries without a workspace
+        (written before it was recorded, for tasks since deleted) fall back
+        to "by anyone who shares a workspace with the user".
+        """
+        workspaces = member_workspace_ids(user)
+        return self.filter(
+            models.Q(workspace_id__in=workspaces)
+            | models.Q(
+                workspace_id__isnull=True,
+                user_id__in=WorkspaceMember.objects.filter(workspace_id__in=workspaces).values("user_id"),
+            )
+        )
+
+
 class Sprint(models.Model):
     id = models.AutoField(primary_key=True)
 
@@ -22,6 +57,8 @@ class Sprint(models.Model):
 
     is_active = models.BooleanField(default=False)
 
+    objects = BoardScopedQuerySet.as_manager()
+
     class Meta:
         db_table = "sprint"
         ordering = ["-start_date"]
@@ -42,6 +79,8 @@ class TaskList(models.Model):
     title = models.CharField(max_length=100)
     position = models.IntegerField()
 
+    objects = BoardScopedQuerySet.as_manager()
+
     class Meta:
         db_table = "task_list"
         ordering = ["position"]
@@ -49,6 +88,80 @@ class TaskList(models.Model):
     def __str__(self):
         return self.title
 
+    def task_location(self):
+        """
+        Column + denormalised ids for a task placed in this column, as Task
+        field values. Expects board__project to be loaded (select_related).
+        """
+        return {
+            "task_list": self,
+            "board_id": self.board_id,
+            "project_id": self.board.project_id,
+            "workspace_id": self.board.project.workspace_id,
+        }
+
+
+
+class TaskQuerySet(WorkspaceScopedQuerySet):
+    workspace_field = "workspace"
+
+    def search(self, text):
+        """
+        Tasks matching web-search style `text` ("quoted phrases", -exclude,
+        or), best match first. Served by the GIN index on search_vector.
+        """
+        query = SearchQuery(text, search_type="websearch", config=TASK_SEARCH_CONFIG)
+        return (
+            self.filter(search_vector=query)
+            .annotate(rank=SearchRank(models.F("search_vector"), query))
+            .order_by("-rank", "id")
+        )
+
+    # TaskSerializer fields whose columns differ from the field name
+    CARD_FIELD_COLUMNS = {
+        "workspace": ("workspace",),
+        "team": ("project",),
+        "sprint_name": ("sprint", "sprint__name"),
+        "assignees": (),
+    }
+
+    def with_card_relations(self, fields=None):
+        """
+        Everything TaskSerializer touches (sprint name, assignees) in a fixed
+        number of queries, however many cards are in the result. Workspace
+        and team ids are columns on the task itself.
+
+        With `fields` (a sparse fieldset, see TaskSerializer.requested_fields)
+        only those columns are loaded, plus position / id for ordering, and
+        the sprint join and assignee prefetch only when asked for.
+        """
+        if fields is None:
+            return self.defer("search_vector").select_related(
+                "sprint",
+            ).prefetch_related(
+                models.Prefetch(
+                    "task_assignees",
+                    queryset=TaskAssignee.objects.select_related("user"),
+                )
+            )
+
+        columns = {"id", "position"}
+        for field in fields:
+            columns.update(self.CARD_FIELD_COLUMNS.get(field, (field,)))
+
+        qs = self.only(*columns)
+        if "sprint_name" in fields:
+            qs = qs.select_related("sprint")
+        if "assignees" in fields:
+            qs = qs.prefetch_related(
+                models.Prefetch(
+                    "task_assignees",
+                    queryset=TaskAssignee.objects.select_related("user").only(
+                        "task_id", "user__id", "user__username", "user__email",
+                    ),
+                )
+            )
+        return qs
 
 
 class Task(models.Model):
@@ -102,6 +215,41 @@ class Task(models.Model):
 
     position = models.IntegerField(default=0)
 
+    # Copies of task_list.board / board.project / project.workspace, so
+    # tenant scoping and serialization are one hop. Set from the column on
+    # create and on moves (TaskList.task_location, ranking.place) and kept
+    # in step when a board / project moves (tasks/locations.py). Rows older
+    # than these columns are filled by `manage.py backfill_task_locations`.
+    board = models.ForeignKey(
+        Board,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+
+    project = models.ForeignKey(
+        Project,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+
+    workspace = models.ForeignKey(
+        Workspace,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+
     parent = models.ForeignKey(
         "self",
         null=True,
@@ -132,14 +280,60 @@ class Task(models.Model):
 
     created_at = models.DateTimeField(default=timezone.now)
 
+    # Issue key in the system the task was imported from (e.g. "WEB-123"),
+    # unique per board so re-running an import finds its tasks (tasks/imports.py)
+    external_key = models.CharField(max_length=100, null=True, blank=True)
+
+    # Full-text index over title (weight A) and description (weight B),
+    # computed by Postgres on every write. Used by /api/tasks/search/.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config=TASK_SEARCH_CONFIG)
+            + SearchVector("description", weight="B", config=TASK_SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         db_table = "task"
         ordering = ["position", "id"]
         managed = True
+        indexes = [
+            # keyset pagination on (position, id), globally and per column
+            models.Index(fields=["position", "id"], name="task_position_id_idx"),
+            models.Index(fields=["task_list", "position", "id"], name="task_list_position_id_idx"),
+            GinIndex(fields=["search_vector"], name="task_search_vector_idx"),
+            # board listings in card order
+            models.Index(fields=["board", "position", "id"], name="task_board_position_id_idx"),
+            models.Index(fields=["project"], name="task_project_idx"),
+            models.Index(fields=["workspace"], name="task_workspace_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["board", "external_key"], name="task_board_external_key_uniq"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # callers that only set task_list (admin, shell, tests) still get the ids
+        if self.workspace_id is None and self.task_list_id is not None:
+            task_list = TaskList.objects.select_related("board__project").get(pk=self.task_list_id)
+            for attr, value in task_list.task_location().items():
+                setattr(self, attr, value)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "board", "project", "workspace"}
+        super().save(*args, **kwargs)
+
+
+def _task_workspace(instance):
+    """Fills instance.workspace_id from its task, unless the caller set it."""
+    if instance.workspace_id is None and instance.task_id is not None:
+        instance.workspace_id = Task.objects.values_list("workspace_id", flat=True).get(pk=instance.task_id)
+
 
 # -------------------------
 # TASK ASSIGNEE
@@ -158,13 +352,33 @@ class TaskAssignee(models.Model):
         on_delete=models.CASCADE
     )
 
+    # copy of task.workspace (see Task.workspace)
+    workspace = models.ForeignKey(
+        Workspace,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+
+    objects = TaskChildQuerySet.as_manager()
+
     class Meta:
         db_table = "task_assignee"
         unique_together = ("task", "user")
+        indexes = [
+            models.Index(fields=["workspace"], name="task_assignee_workspace_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} → {self.task}"
 
+    def save(self, *args, **kwargs):
+        _task_workspace(self)
+        super().save(*args, **kwargs)
+
 
 # -------------------------
 # COMMENT
@@ -186,12 +400,34 @@ class Comment(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(default=timezone.now)
 
+    # copy of task.workspace (see Task.workspace)
+    workspace = models.ForeignKey(
+        Workspace,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+
+    objects = TaskChildQuerySet.as_manager()
+
     class Meta:
         db_table = "comment"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="comment_created_id_idx"),
+            models.Index(fields=["task", "created_at", "id"], name="comment_task_created_id_idx"),
+            models.Index(fields=["workspace"], name="comment_workspace_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} on {self.task}"
 
+    def save(self, *args, **kwargs):
+        _task_workspace(self)
+        super().save(*args, **kwargs)
+
 
 # -------------------------
 # ACTIVITY LOG
@@ -208,10 +444,94 @@ class ActivityLog(models.Model):
     entity_type = models.CharField(max_length=50)
     entity_id = models.IntegerField()
 
+    # workspace of the entity when it was logged; null for older entries
+    # whose task no longer exists (see ActivityLogQuerySet.visible_to)
+    workspace = models.ForeignKey(
+        Workspace,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="+"
+    )
+
     created_at = models.DateTimeField(default=timezone.now)
 
+    objects = ActivityLogQuerySet.as_manager()
+
     class Meta:
         db_table = "activity_log"
+        # The table is range-partitioned by month on created_at (migration
+        # 0003), so its real primary key is (id, created_at); id stays unique
+        # through its sequence. See tasks/partitions.py.
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="activity_created_id_idx"),
+            # history of one task / entity
+            models.Index(fields=["entity_type", "entity_id", "created_at"], name="activity_entity_idx"),
+            # feed of the members of a workspace
+            models.Index(fields=["user", "created_at"], name="activity_user_created_idx"),
+            # feed of a workspace
+            models.Index(fields=["workspace", "created_at", "id"], name="activity_workspace_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} {self.action} {self.entity_type}({self.entity_id})"
+
+
+# -------------------------
+# BOARD VERSION
+# Bumped on every task / list / assignee / comment write under the board
+# (tasks/versions.py); board-scoped GETs use it as their ETag.
+# -------------------------
+class BoardVersion(models.Model):
+    board = models.OneToOneField(
+        Board,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="version"
+    )
+
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "board_version"
+
+    def __str__(self):
+        return f"{self.board_id} v{self.version}"
+
+
+# -------------------------
+# SPRINT SNAPSHOT
+# Points per sprint per day, written by `manage.py sprint_snapshots`
+# (tasks/sprints.py); burndown / burnup / velocity read only these rows.
+# -------------------------
+class SprintSnapshot(models.Model):
+    id = models.AutoField(primary_key=True)
+
+    sprint = models.ForeignKey(
+        Sprint,
+        on_delete=models.CASCADE,
+        related_name="snapshots"
+    )
+
+    date = models.DateField()
+
+    total_points = models.PositiveIntegerField(default=0)
+    completed_points = models.PositiveIntegerField(default=0)
+    total_tasks = models.PositiveIntegerField(default=0)
+    completed_tasks = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "sprint_snapshot"
+        ordering = ["sprint", "date"]
+        constraints = [
+            models.UniqueConstraint(fields=["sprint", "date"], name="sprint_snapshot_sprint_date_uniq"),
+        ]
+
+    @property
+    def remaining_points(self):
+        return self.total_points - self.completed_points
+
+    def __str__(self):
+        return f"{self.sprint} {self.date}: {self.remaining_points} pts left"
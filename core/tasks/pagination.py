@@ -0,0 +1,125 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# -------------------------
+# KEYSET (CURSOR) PAGINATION
+# -------------------------
+class KeysetPagination(BasePagination):
+    """
+    Seeks past the last row of the previous page with a composite
+    `(a, b) > (last_a, last_b)` filter instead of OFFSET, so every page
+    costs the same. The cursor is the last row's ordering values, base64
+    encoded. `ordering` must end in a unique field (id) and every field
+    must sort in the same direction, matching a composite index.
+    """
+    ordering = ("id",)
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor, queryset.model)))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next":    self.get_next_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next":    {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.API_PAGE_SIZE
+        return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [getattr(last, field.lstrip("-")) for field in self.ordering]
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(values),
+        )
+
+    def after(self, values):
+        """(a > x) OR (a = x AND b > y) ... for the ordering fields."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, values):
+        # isoformat() keeps microseconds; DjangoJSONEncoder would round
+        # datetimes to milliseconds and skip rows inside the same ms.
+        raw = json.dumps(values, default=lambda value: value.isoformat())
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor, model):
+        """Ordering values from the cursor, each coerced by its model field."""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            values = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValidationError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+
+class TaskPagination(KeysetPagination):
+    ordering = ("position", "id")
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ("created_at", "id")
+
+
+class ActivityLogPagination(KeysetPagination):
+    # newest first; served by the same (created_at, id) index
+    ordering = ("-created_at", "-id")
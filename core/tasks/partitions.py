@@ -0,0 +1,119 @@
+import re
+from datetime import date
+
+from django.db import connection, transaction
+
+
+# -------------------------
+# ACTIVITY LOG PARTITIONS
+# activity_log is range-partitioned by month on created_at (migration 0003).
+# Partitions are named activity_log_yYYYYmMM; activity_log_default catches
+# rows outside every monthly range.
+# -------------------------
+PARENT = "activity_log"
+DEFAULT_PARTITION = "activity_log_default"
+PARTITION_RE = re.compile(r"^activity_log_y(\d{4})m(\d{2})$")
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT}_y{month:%Y}m{month:%m}"
+
+
+def is_partitioned():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+            """,
+            [PARENT],
+        )
+        return cursor.fetchone() is not None
+
+
+def monthly_partitions():
+    """{month: partition name} for every monthly partition attached to activity_log."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child  ON child.oid  = i.inhrelid
+            WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+            """,
+            [PARENT],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    months = {}
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return months
+
+
+def default_partition_months(before):
+    """Months that have rows in the default partition, older than `before`."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')::date "
+            f"FROM {DEFAULT_PARTITION} WHERE created_at < %s ORDER BY 1",
+            [before.isoformat()],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_partition(month):
+    """
+    Creates the partition for `month`. Rows that already landed in the
+    default partition for that range are moved into it, since Postgres
+    refuses to add a range the default partition has rows for.
+    """
+    name  = partition_name(month)
+    start = month.isoformat()
+    end   = add_months(month, 1).isoformat()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= %s AND created_at < %s)",
+            [start, end],
+        )
+        (stranded,) = cursor.fetchone()
+
+        if stranded:
+            cursor.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}")
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {PARENT} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        if stranded:
+            # the FK to auth_user is deferred; its pending checks would block
+            # re-attaching the default partition in this transaction
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE created_at >= %s AND created_at < %s RETURNING *) "
+                f"INSERT INTO {PARENT} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    return name
+
+
+def detach_partition(name, drop=False):
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {name}")
+        if drop:
+            cursor.execute(f"DROP TABLE {name}")
@@ -0,0 +1,126 @@
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .locations import sync_task_children
+from .models import Task, TaskList
+from .versions import bump_board_versions
+
+
+# -------------------------
+# GAP-BASED CARD POSITIONS
+# Cards in a column are spaced POSITION_GAP apart, so moving a card only
+# rewrites that card: it takes the midpoint of its new neighbours. When two
+# neighbours end up adjacent the column is renumbered.
+# -------------------------
+POSITION_GAP = 1024
+
+# A move that leaves less room than this schedules a background rebalance.
+DENSE_GAP = 8
+
+
+def position_between(previous, following):
+    """
+    Position for a card between two neighbour positions (None = no
+    neighbour on that side), or None when there is no integer gap left.
+    """
+    if previous is None and following is None:
+        return POSITION_GAP
+    if previous is None:
+        return following - POSITION_GAP
+    if following is None:
+        return previous + POSITION_GAP
+    if following - previous > 1:
+        return (previous + following) // 2
+    return None
+
+
+def neighbour_positions(task_list_id, after=None, before=None, exclude=None):
+    """
+    Positions of the cards a moved card will sit between. `after` / `before`
+    are ids of the card directly above / below the target slot; with neither
+    the card goes to the bottom of the column.
+    """
+    cards = Task.objects.filter(task_list_id=task_list_id).exclude(pk=exclude)
+
+    if after is not None:
+        above = cards.values("position", "id").get(pk=after)
+        below = cards.filter(
+            Q(position__gt=above["position"]) | Q(position=above["position"], id__gt=above["id"])
+        ).order_by("position", "id").values("position").first()
+        return above["position"], below["position"] if below else None
+
+    if before is not None:
+        below = cards.values("position", "id").get(pk=before)
+        above = cards.filter(
+            Q(position__lt=below["position"]) | Q(position=below["position"], id__lt=below["id"])
+        ).order_by("-position", "-id").values("position").first()
+        return above["position"] if above else None, below["position"]
+
+    last = cards.order_by("-position", "-id").values("position").first()
+    return last["position"] if last else None, None
+
+
+def next_position(task_list_id):
+    """Position for a new card at the bottom of a column."""
+    return position_between(*neighbour_positions(task_list_id))
+
+
+def rebalance(task_list_id):
+    """Renumbers a column to POSITION_GAP, 2 * POSITION_GAP, ... keeping order."""
+    with transaction.atomic():
+        cards = list(
+            Task.objects.select_for_update()
+            .filter(task_list_id=task_list_id)
+            .order_by("position", "id")
+            .only("id", "position")
+        )
+        for index, card in enumerate(cards, start=1):
+            card.position = index * POSITION_GAP
+        Task.objects.bulk_update(cards, ["position"], batch_size=500)
+        bump_board_versions(TaskList.objects.values_list("board_id", flat=True).get(pk=task_list_id))
+
+
+def rebalance_in_background(task_list_id):
+    """Rebalances a column on a worker thread once the current transaction commits."""
+
+    def run():
+        try:
+            rebalance(task_list_id)
+        finally:
+            connection.close()
+
+    transaction.on_commit(lambda: threading.Thread(target=run, daemon=True).start())
+
+
+def place(task, task_list_id, after=None, before=None):
+    """
+    Moves `task` into the slot described by after / before in the given
+    column and saves it. Only the moved row is written unless the slot has
+    no room left, in which case the column is renumbered first. A move to
+    another column also re-copies the board / project / workspace ids.
+    """
+    previous, following = neighbour_positions(task_list_id, after, before, exclude=task.pk)
+    position = position_between(previous, following)
+
+    if position is None:
+        rebalance(task_list_id)
+        previous, following = neighbour_positions(task_list_id, after, before, exclude=task.pk)
+        position = position_between(previous, following)
+    elif previous is not None and following is not None and following - previous < DENSE_GAP:
+        rebalance_in_background(task_list_id)
+
+    fields = ["task_list", "position"]
+    if task.task_list_id != task_list_id:
+        target = TaskList.objects.select_related("board__project").get(pk=task_list_id)
+        location = target.task_location()
+        if location["workspace_id"] != task.workspace_id:
+            sync_task_children([task.pk], location["workspace_id"])
+        for attr, value in location.items():
+            setattr(task, attr, value)
+        fields += ["board", "project", "workspace"]
+
+    task.position = position
+    task.save(update_fields=fields)
+    return task
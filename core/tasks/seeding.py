@@ -0,0 +1,237 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from projects.models import Board, Project, Workspace, WorkspaceMember
+
+from .models import ActivityLog, Comment, Sprint, Task, TaskAssignee, TaskList
+from .ranking import POSITION_GAP
+
+
+# -------------------------
+# BENCHMARK DATASET
+# Generates workspaces with members, projects, boards, columns, sprints,
+# tasks (epics with child tasks), assignees, comments and activity, written
+# with bulk_create one board at a time. A fixed seed gives the same dataset
+# shape on every run. Users are named <prefix>_<n> with the prefix as their
+# password; <prefix>_1 is a superuser and an admin of every workspace.
+# -------------------------
+
+WORDS = (
+    "login signup invoice payment report export import search filter board "
+    "sprint dashboard profile settings email webhook cache timeout retry queue "
+    "upload avatar billing plan refund audit permission role invite token "
+    "session mobile layout sidebar modal tooltip chart metrics alert backup "
+    "migration index query latency onboarding checkout cart coupon shipping"
+).split()
+
+VERBS = "Fix Add Update Remove Refactor Improve Investigate Document Test Migrate".split()
+
+COLUMNS = ["To Do", "In Progress", "Review", "QA", "Blocked", "Done"]
+
+ACTIONS = ["created task", "updated task", "moved task", "assigned user", "commented on task"]
+
+# share of tasks that are epics; other tasks get one of these work types
+EPIC_RATIO = 0.05
+WORK_TYPES = ["TASK"] * 5 + ["STORY"] * 3 + ["BUG"] * 2
+PRIORITIES = ["LOW", "MEDIUM", "MEDIUM", "HIGH"]
+
+SPRINT_DAYS = 14
+HISTORY_DAYS = 180
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+class BenchmarkSeeder:
+    """
+    Sizes are per parent: `members` per workspace, `projects` per workspace,
+    `boards` per project, `lists` and `sprints` and `tasks` per board;
+    `assignees`, `comments` and `activity` are averages per task.
+    """
+
+    def __init__(
+        self, workspaces=2, members=20, projects=3, boards=2, lists=4, sprints=4,
+        tasks=500, assignees=1.5, comments=2.0, activity=3.0,
+        prefix="bench", seed=1, batch_size=5000, progress=None,
+    ):
+        self.workspaces = workspaces
+        self.members = members
+        self.projects = projects
+        self.boards = boards
+        self.lists = min(lists, len(COLUMNS))
+        self.sprints = sprints
+        self.tasks = tasks
+        self.assignees = assignees
+        self.comments = comments
+        self.activity = activity
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.progress = progress
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+        self.report = {
+            name: 0 for name in (
+                "users", "workspaces", "members", "projects", "boards", "lists",
+                "sprints", "tasks", "assignees", "comments", "activity",
+            )
+        }
+
+    def run(self):
+        users = self.create_users(self.members + self.workspaces - 1)
+        for n in range(1, self.workspaces + 1):
+            # the first user is in every workspace, the rest are a sliding window
+            others = users[n: n + self.members - 1]
+            self.seed_workspace(n, [users[0], *others])
+        return self.report
+
+    # -------------------------
+    # USERS AND WORKSPACES
+    # -------------------------
+    def create_users(self, count):
+        names = [f"{self.prefix}_{n}" for n in range(1, count + 1)]
+        existing = {user.username: user for user in User.objects.filter(username__in=names)}
+        password = make_password(self.prefix)
+        missing = [
+            User(
+                username=name, email=f"{name}@example.com", password=password,
+                is_superuser=name == names[0], is_staff=name == names[0],
+            )
+            for name in names if name not in existing
+        ]
+        User.objects.bulk_create(missing, batch_size=self.batch_size)
+        self.report["users"] += len(missing)
+        existing.update((user.username, user) for user in User.objects.filter(username__in=names))
+        return [existing[name] for name in names]
+
+    @transaction.atomic
+    def seed_workspace(self, n, users):
+        owner = users[0]
+        workspace = Workspace.objects.create(name=f"{self.prefix.title()} workspace {n}", owner=owner)
+        WorkspaceMember.objects.bulk_create(
+            WorkspaceMember(
+                workspace=workspace, user=user,
+                role="ADMIN" if user == owner or self.rng.random() < 0.1 else "MEMBER",
+                joined_at=self.now - timedelta(days=self.rng.randint(0, HISTORY_DAYS)),
+            )
+            for user in users
+        )
+        self.report["workspaces"] += 1
+        self.report["members"] += len(users)
+
+        for p in range(1, self.projects + 1):
+            project = Project.objects.create(name=f"Project {n}.{p}", workspace=workspace, created_by=owner)
+            self.report["projects"] += 1
+            for b in range(1, self.boards + 1):
+                board = Board.objects.create(name=f"Board {n}.{p}.{b}", project=project)
+                self.report["boards"] += 1
+                self.seed_board(board, project, workspace, users)
+                if self.progress is not None:
+                    self.progress(self.report)
+
+    # -------------------------
+    # BOARD CONTENT
+    # -------------------------
+    def seed_board(self, board, project, workspace, users):
+        columns = TaskList.objects.bulk_create(
+            TaskList(board=board, title=title, position=i)
+            for i, title in enumerate(COLUMNS[: self.lists])
+        )
+        start = (self.now - timedelta(days=SPRINT_DAYS * self.sprints)).date()
+        sprints = Sprint.objects.bulk_create(
+            Sprint(
+                board=board, name=f"Sprint {s + 1}",
+                start_date=start + timedelta(days=SPRINT_DAYS * s),
+                end_date=start + timedelta(days=SPRINT_DAYS * (s + 1) - 1),
+                is_active=s == self.sprints - 1,
+            )
+            for s in range(self.sprints)
+        )
+        self.report["lists"] += len(columns)
+        self.report["sprints"] += len(sprints)
+
+        location = {"board_id": board.id, "project_id": project.id, "workspace_id": workspace.id}
+        positions = {column.id: 0 for column in columns}
+        epics = []
+        remaining = self.tasks
+        while remaining > 0:
+            size = min(self.batch_size, remaining)
+            remaining -= size
+            epic_count = max(1, round(size * EPIC_RATIO)) if not epics else round(size * EPIC_RATIO)
+            epics += self.create_tasks(epic_count, columns, sprints, positions, location, users, epics=None)
+            self.create_tasks(size - epic_count, columns, sprints, positions, location, users, epics=epics)
+
+    def create_tasks(self, count, columns, sprints, positions, location, users, epics):
+        rng = self.rng
+        tasks = []
+        for _ in range(count):
+            i = rng.randrange(len(columns))
+            column = columns[i]
+            positions[column.id] += POSITION_GAP
+            status = "TODO" if i == 0 else "DONE" if i == len(columns) - 1 else "IN_PROGRESS"
+            created_at = self.now - timedelta(days=rng.uniform(0, HISTORY_DAYS))
+            start_date = created_at.date() + timedelta(days=rng.randint(0, 7))
+            tasks.append(Task(
+                title=f"{rng.choice(VERBS)} {_sentence(rng, rng.randint(2, 5))}",
+                description=_sentence(rng, rng.randint(8, 40)) if rng.random() < 0.7 else None,
+                work_type="EPIC" if epics is None else rng.choice(WORK_TYPES),
+                status=status,
+                priority=rng.choice(PRIORITIES),
+                task_list=column,
+                position=positions[column.id],
+                parent_id=rng.choice(epics).id if epics and rng.random() < 0.6 else None,
+                sprint=rng.choice(sprints) if sprints and rng.random() < 0.6 else None,
+                start_date=start_date,
+                due_date=start_date + timedelta(days=rng.randint(1, 30)),
+                story_points=rng.choice([1, 2, 3, 5, 8, 13]) if rng.random() < 0.8 else None,
+                created_by=rng.choice(users),
+                created_at=created_at,
+                **location,
+            ))
+        tasks = Task.objects.bulk_create(tasks, batch_size=1000)
+        self.report["tasks"] += len(tasks)
+
+        workspace_id = location["workspace_id"]
+        assignees, comments, activity = [], [], []
+        for task in tasks:
+            for user in rng.sample(users, min(len(users), self._count(self.assignees))):
+                assignees.append(TaskAssignee(task=task, user=user, workspace_id=workspace_id))
+            for _ in range(self._count(self.comments)):
+                comments.append(Comment(
+                    task=task, user=rng.choice(users), message=_sentence(rng, rng.randint(3, 30)),
+                    created_at=self._after(task.created_at), workspace_id=workspace_id,
+                ))
+            activity.append(ActivityLog(
+                user=task.created_by, action="created task", entity_type="Task",
+                entity_id=task.id, created_at=task.created_at, workspace_id=workspace_id,
+            ))
+            for _ in range(self._count(max(self.activity - 1, 0))):
+                activity.append(ActivityLog(
+                    user=rng.choice(users), action=rng.choice(ACTIONS), entity_type="Task",
+                    entity_id=task.id, created_at=self._after(task.created_at), workspace_id=workspace_id,
+                ))
+
+        TaskAssignee.objects.bulk_create(assignees, batch_size=1000)
+        Comment.objects.bulk_create(comments, batch_size=1000)
+        ActivityLog.objects.bulk_create(activity, batch_size=1000)
+        self.report["assignees"] += len(assignees)
+        self.report["comments"] += len(comments)
+        self.report["activity"] += len(activity)
+        return tasks
+
+    def _count(self, mean):
+        """Between 0 and 2 × mean, averaging mean."""
+        whole = int(mean * 2)
+        return self.rng.randint(0, whole) if whole else 0
+
+    def _after(self, moment):
+        return moment + (self.now - moment) * self.rng.random()
+
+
+def seed_benchmark_data(**options):
+    return BenchmarkSeeder(**options).run()
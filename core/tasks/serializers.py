@@ -1,5 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch, prefetch_related_objects
+
+from projects.models import WorkspaceMember
 
 from .models import (
     Sprint,
@@ -9,6 +12,7 @@ from .models import (
     Comment,
     ActivityLog,
 )
+from .hierarchy import cyclic_parent_changes
 
 User = get_user_model()
 
@@ -43,10 +47,58 @@ class TaskListSerializer(serializers.ModelSerializer):
         ]
 
 
+# ---------------------------
+# Sparse fieldsets
+# ---------------------------
+class SparseFieldsMixin:
+    """
+    Serializes only the field names in context["fields"] (all when absent or
+    None). Views build that set from the query string with requested_fields.
+    """
+    # named presets for ?view=
+    field_views = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = self.context.get("fields")
+        if wanted is not None:
+            for name in set(self.fields) - set(wanted):
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, params):
+        """
+        ?fields=a,b and / or ?view=<preset> pick the fields (together: both),
+        ?exclude=a,b drops some; `id` is always kept. None when the query
+        string asks for everything. Unknown names are a ValidationError.
+        """
+        view = params.get("view")
+        fields = _field_names(params.get("fields"))
+        exclude = _field_names(params.get("exclude"))
+        if not (view or fields or exclude):
+            return None
+
+        if view and view not in cls.field_views:
+            raise serializers.ValidationError({"view": [f"Choose from: {', '.join(cls.field_views)}."]})
+
+        available = set(cls.Meta.fields)
+        for param, names in (("fields", fields), ("exclude", exclude)):
+            unknown = names - available
+            if unknown:
+                raise serializers.ValidationError({param: [f"Unknown fields: {', '.join(sorted(unknown))}."]})
+
+        wanted = (set(cls.field_views.get(view, ())) | fields) if (view or fields) else available
+        return (wanted - exclude) | {"id"}
+
+
+def _field_names(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
 # ---------------------------
 # Task (READ)
 # ---------------------------
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     assignees = serializers.SerializerMethodField()
     sprint_name = serializers.CharField(source="sprint.name", read_only=True)
 
@@ -79,7 +131,17 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_by", "created_at"]
 
+    field_views = {
+        # what a Kanban card shows
+        "card": [
+            "title", "work_type", "priority", "status", "task_list",
+            "position", "story_points", "due_date", "assignees",
+        ],
+    }
+
     # 🔹 USERS
+    # Relies on the caller prefetching "task_assignees__user" (see
+    # TaskQuerySet.with_card_relations) so a list of cards costs one query.
     def get_assignees(self, obj):
         return [
             {
@@ -87,23 +149,24 @@ class TaskSerializer(serializers.ModelSerializer):
                 "username": ta.user.username,
                 "email": ta.user.email,
             }
-            for ta in obj.task_assignees.select_related("user")
+            for ta in obj.task_assignees.all()
         ]
 
     # 🔹 WORKSPACE (DERIVED)
     def get_workspace(self, obj):
-        return obj.task_list.board.project.workspace.id
+        return obj.workspace_id
 
     # 🔹 TEAM (PROJECT)
     def get_team(self, obj):
-        return obj.task_list.board.project.id
+        return obj.project_id
 
 
 # ---------------------------
 # Task (CREATE / UPDATE)
 # ---------------------------
 class TaskCreateSerializer(serializers.ModelSerializer):
-    task_list_id = serializers.IntegerField(write_only=True)
+    # Required on create; ignored on update (moves go through /api/tasks/move/)
+    task_list_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
     assignees = serializers.ListField(
         child=serializers.IntegerField(),
         required=False,
@@ -127,18 +190,35 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             "task_list_id",
         ]
 
+    def validate(self, attrs):
+        if self.instance is None and attrs.get("task_list_id") is None:
+            raise serializers.ValidationError({"task_list_id": ["This field is required."]})
+
+        parent = attrs.get("parent")
+        if self.instance is not None and parent is not None:
+            if cyclic_parent_changes({self.instance.id: parent.id}):
+                raise serializers.ValidationError({"parent": ["A task cannot be nested under itself or its own subtasks."]})
+        return attrs
+
+    # Respond with the full card, same shape as GET /api/tasks/{id}/
+    def to_representation(self, instance):
+        return TaskSerializer(instance, context=self.context).data
+
     def create(self, validated_data):
         validated_data.pop("task_list_id", None)
 
-        assignees = validated_data.pop("assignees", [])
+        assignees = set(validated_data.pop("assignees", []))
 
-        task = Task.objects.create(**validated_data)
+        task = Task(**validated_data)
 
-        for user_id in assignees:
-            TaskAssignee.objects.create(
-                task=task,
-                user_id=user_id
-            )
+        if assignees:
+            check_workspace_members(task.workspace_id, assignees)
+
+        task.save()
+
+        TaskAssignee.objects.bulk_create(
+            [TaskAssignee(task=task, user_id=user_id, workspace_id=task.workspace_id) for user_id in assignees]
+        )
 
         return task
 
@@ -147,23 +227,127 @@ class TaskCreateSerializer(serializers.ModelSerializer):
 
         assignees = validated_data.pop("assignees", None)
 
+        if assignees is not None:
+            wanted  = set(assignees)
+            current = {ta.user_id for ta in instance.task_assignees.all()}
+            added   = wanted - current
+            removed = current - wanted
+
+            if added:
+                check_workspace_members(instance.workspace_id, added)
+
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
         instance.save()
 
+        # Only the difference is written; an unchanged list costs no writes
         if assignees is not None:
-            instance.task_assignees.all().delete()
-
-            for user_id in assignees:
-                TaskAssignee.objects.create(
-                    task=instance,
-                    user_id=user_id
+            if removed:
+                instance.task_assignees.filter(user_id__in=removed).delete()
+            if added:
+                TaskAssignee.objects.bulk_create(
+                    [TaskAssignee(task=instance, user_id=user_id, workspace_id=instance.workspace_id) for user_id in added]
+                )
+            if added or removed:
+                # the prefetched list is from before the edit, and DRF only
+                # drops it after perform_update has serialized the task
+                getattr(instance, "_prefetched_objects_cache", {}).pop("task_assignees", None)
+                prefetch_related_objects(
+                    [instance], Prefetch("task_assignees", queryset=TaskAssignee.objects.select_related("user")),
                 )
 
         return instance
 
 
+def check_workspace_members(workspace_id, user_ids):
+    """Raises a ValidationError unless every user id is a member of the workspace (one query)."""
+    members = set(
+        WorkspaceMember.objects.filter(
+            workspace_id=workspace_id,
+            user_id__in=user_ids,
+        ).values_list("user_id", flat=True)
+    )
+    missing = set(user_ids) - members
+    if missing:
+        raise serializers.ValidationError({
+            "assignees": [f"Not workspace members: {', '.join(map(str, sorted(missing)))}."]
+        })
+
+
+# ---------------------------
+# Task (BULK CREATE / UPDATE)
+# parent / sprint / task_list are plain ids here; tasks/bulk.py checks
+# them for the whole batch at once instead of one query per item.
+# ---------------------------
+class TaskBulkCreateSerializer(serializers.ModelSerializer):
+    task_list_id = serializers.IntegerField()
+    parent = serializers.IntegerField(required=False, allow_null=True)
+    sprint = serializers.IntegerField(required=False, allow_null=True)
+    assignees = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=True,
+    )
+
+    class Meta:
+        model = Task
+        fields = [
+            "title",
+            "description",
+            "work_type",
+            "priority",
+            "status",
+            "parent",
+            "sprint",
+            "start_date",
+            "due_date",
+            "story_points",
+            "assignees",
+            "task_list_id",
+        ]
+
+
+class TaskBulkUpdateSerializer(TaskBulkCreateSerializer):
+    id = serializers.IntegerField()
+
+    # moves go through /api/tasks/move/, assignees through /api/task-assignees/
+    task_list_id = None
+    assignees = None
+
+    class Meta(TaskBulkCreateSerializer.Meta):
+        fields = [
+            "id",
+            "title",
+            "description",
+            "work_type",
+            "priority",
+            "status",
+            "parent",
+            "sprint",
+            "start_date",
+            "due_date",
+            "story_points",
+        ]
+
+
+# ---------------------------
+# Task Move (drag & drop)
+# ---------------------------
+class TaskMoveSerializer(serializers.Serializer):
+    task = serializers.IntegerField()
+    task_list = serializers.IntegerField()
+
+    # id of the card directly above / below the drop slot; neither = bottom
+    after = serializers.IntegerField(required=False, allow_null=True)
+    before = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs.get("after") is not None and attrs.get("before") is not None:
+            raise serializers.ValidationError("Give either 'after' or 'before', not both.")
+        return attrs
+
+
 # ---------------------------
 # Task Assignee
 # ---------------------------
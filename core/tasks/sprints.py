@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Sprint, SprintSnapshot, Task
+
+
+# -------------------------
+# SPRINT PROGRESS
+# `take_snapshots` records each running sprint's points once a day
+# (manage.py sprint_snapshots, from cron). The chart functions only read
+# those rows; a day without a snapshot repeats the day before it.
+# -------------------------
+DONE = "DONE"
+
+
+def snapshot_sprints(day):
+    """Sprints that need a row for `day`: running ones, plus ended ones missing their final row."""
+    final_row = SprintSnapshot.objects.filter(sprint=OuterRef("pk"), date=OuterRef("end_date"))
+    return Sprint.objects.filter(
+        Q(start_date__lte=day, end_date__gte=day)
+        | Q(end_date__lt=day) & ~Exists(final_row)
+    )
+
+
+def take_snapshots(day=None, sprints=None):
+    """
+    Upserts one SprintSnapshot per sprint for `day` (default today) from a
+    single grouped aggregate over the sprints' tasks. Sprints that already
+    ended get their row dated on their end date, so a late run still closes
+    them out. Returns the number of rows written.
+    """
+    day = day or timezone.localdate()
+    sprints = list(snapshot_sprints(day) if sprints is None else sprints)
+    if not sprints:
+        return 0
+
+    totals = {
+        row["sprint_id"]: row
+        for row in Task.objects.filter(sprint__in=sprints)
+        .values("sprint_id")
+        .annotate(
+            total_points=Coalesce(Sum("story_points"), 0),
+            completed_points=Coalesce(Sum("story_points", filter=Q(status=DONE)), 0),
+            total_tasks=Count("id"),
+            completed_tasks=Count("id", filter=Q(status=DONE)),
+        )
+    }
+
+    fields = ["total_points", "completed_points", "total_tasks", "completed_tasks"]
+    rows = [
+        SprintSnapshot(
+            sprint=sprint,
+            date=min(day, sprint.end_date),
+            **{field: totals.get(sprint.id, {}).get(field, 0) for field in fields},
+        )
+        for sprint in sprints
+    ]
+    SprintSnapshot.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["sprint", "date"],
+        update_fields=fields,
+    )
+    return len(rows)
+
+
+def _daily(sprint, today=None):
+    """[(date, snapshot or None)] from the sprint's start to its end or today."""
+    today = today or timezone.localdate()
+    last = min(sprint.end_date, today)
+    snapshots = {s.date: s for s in SprintSnapshot.objects.filter(sprint=sprint, date__lte=last)}
+
+    days, current, day = [], None, sprint.start_date
+    while day <= last:
+        current = snapshots.get(day, current)
+        days.append((day, current))
+        day += timedelta(days=1)
+    return days
+
+
+def burndown(sprint, today=None):
+    """Remaining points per day against the straight line from the first day's scope to zero."""
+    days = _daily(sprint, today)
+    start = next((s.total_points for _, s in days if s is not None), 0)
+    length = max((sprint.end_date - sprint.start_date).days, 1)
+
+    return [
+        {
+            "date": day,
+            "remaining": s.remaining_points if s else None,
+            "ideal": round(start * (1 - (day - sprint.start_date).days / length), 2),
+        }
+        for day, s in days
+    ]
+
+
+def burnup(sprint, today=None):
+    """Completed points and total scope per day."""
+    return [
+        {
+            "date": day,
+            "completed": s.completed_points if s else None,
+            "scope": s.total_points if s else None,
+        }
+        for day, s in _daily(sprint, today)
+    ]
+
+
+def velocity(sprints):
+    """
+    Committed (scope on the first snapshot) and completed (on the last) points
+    per sprint, oldest first, plus the average completed.
+    """
+    sprints = sorted(sprints, key=lambda sprint: sprint.start_date)
+    first, last = {}, {}
+    for s in SprintSnapshot.objects.filter(sprint__in=sprints).order_by("date"):
+        first.setdefault(s.sprint_id, s)
+        last[s.sprint_id] = s
+
+    rows = [
+        {
+            "sprint": sprint.id,
+            "name": sprint.name,
+            "start_date": sprint.start_date,
+            "end_date": sprint.end_date,
+            "committed": first[sprint.id].total_points if sprint.id in first else None,
+            "completed": last[sprint.id].completed_points if sprint.id in last else None,
+        }
+        for sprint in sprints
+    ]
+    completed = [row["completed"] for row in rows if row["completed"] is not None]
+    return {
+        "sprints": rows,
+        "average": round(sum(completed) / len(completed), 2) if completed else None,
+    }
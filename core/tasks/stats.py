@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BoardVersion, Task, TaskAssignee
+
+
+# -------------------------
+# BOARD / WORKSPACE STATISTICS
+# Every breakdown of the task set comes from one aggregate query built
+# from Count(filter=...) / Sum(filter=...); per-assignee numbers need a
+# second, grouped query. Results are cached under the board versions
+# (tasks/versions.py), so any task write yields a new key, and under the
+# date, so overdue counts roll over at midnight.
+# -------------------------
+DONE = "DONE"
+
+BREAKDOWNS = {
+    "by_status": ("status", Task.STATUS_CHOICES),
+    "by_priority": ("priority", Task.PRIORITY_CHOICES),
+    "by_work_type": ("work_type", Task.WORK_TYPE_CHOICES),
+}
+
+
+def _points(condition=None):
+    return Coalesce(Sum("story_points", filter=condition), 0)
+
+
+def task_stats(tasks, today=None):
+    """Breakdowns, overdue count and story-point sums for a Task queryset."""
+    today = today or timezone.localdate()
+    open_task = ~Q(status=DONE)
+
+    aggregates = {
+        "total": Count("id"),
+        "overdue": Count("id", filter=Q(due_date__lt=today) & open_task),
+        "due_today": Count("id", filter=Q(due_date=today) & open_task),
+        "unassigned": Count("id", filter=~Exists(TaskAssignee.objects.filter(task=OuterRef("pk")))),
+        "points_total": _points(),
+        "points_completed": _points(Q(status=DONE)),
+    }
+    for name, (field, choices) in BREAKDOWNS.items():
+        for value, _ in choices:
+            aggregates[f"{name}:{value}"] = Count("id", filter=Q(**{field: value}))
+    for value, _ in Task.STATUS_CHOICES:
+        aggregates[f"points_by_status:{value}"] = _points(Q(status=value))
+
+    row = tasks.aggregate(**aggregates)
+
+    stats = {
+        "total": row["total"],
+        "overdue": row["overdue"],
+        "due_today": row["due_today"],
+        "unassigned": row["unassigned"],
+        "story_points": {
+            "total": row["points_total"],
+            "completed": row["points_completed"],
+            "remaining": row["points_total"] - row["points_completed"],
+        },
+    }
+    for name in (*BREAKDOWNS, "points_by_status"):
+        prefix = f"{name}:"
+        stats[name] = {key[len(prefix):]: value for key, value in row.items() if key.startswith(prefix)}
+
+    stats["by_assignee"] = list(
+        TaskAssignee.objects.filter(task__in=tasks)
+        .values("user_id", "user__username")
+        .annotate(
+            tasks=Count("task_id"),
+            open=Count("task_id", filter=~Q(task__status=DONE)),
+            overdue=Count("task_id", filter=Q(task__due_date__lt=today) & ~Q(task__status=DONE)),
+            points=Coalesce(Sum("task__story_points"), 0),
+        )
+        .order_by("-tasks", "user_id")
+    )
+    return stats
+
+
+def _cached(key, compute):
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute()
+        cache.set(key, stats, settings.STATS_CACHE_TTL)
+    return stats
+
+
+def board_stats(board_id):
+    today = timezone.localdate()
+    version = BoardVersion.objects.filter(board_id=board_id).values_list("version", flat=True).first() or 0
+    return _cached(
+        f"board_stats:{board_id}:{version}:{today}",
+        lambda: task_stats(Task.objects.filter(board_id=board_id), today),
+    )
+
+
+def workspace_stats(workspace_id):
+    today = timezone.localdate()
+    # count + sum of the boards' versions moves on every write in the workspace
+    versions = BoardVersion.objects.filter(board__project__workspace_id=workspace_id).aggregate(
+        boards=Count("board_id"), total=Coalesce(Sum("version"), 0)
+    )
+    return _cached(
+        f"workspace_stats:{workspace_id}:{versions['boards']}:{versions['total']}:{today}",
+        lambda: task_stats(Task.objects.filter(workspace_id=workspace_id), today),
+    )
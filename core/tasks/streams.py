@@ -0,0 +1,129 @@
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from projects.models import Board
+from projects.permissions import is_workspace_member
+
+from .events import get_broker
+
+
+# -------------------------
+# BOARD EVENT STREAMS
+# GET /api/boards/<id>/events/   Server-Sent Events
+# ws://<host>/ws/boards/<id>/    WebSocket (routed in core/asgi.py)
+# Both take the access token as ?token=<jwt> (browsers cannot set headers
+# on EventSource / WebSocket) or a Bearer header, and only admit members of
+# the board's workspace. Each message is one JSON event from tasks/events.py.
+# Serve these from the ASGI entry point (uvicorn core.asgi:application):
+# under WSGI an open stream would hold a worker thread for good, so the SSE
+# endpoint answers 400 there instead. ?probe=1 checks access and transport
+# without opening the stream (204), so clients subscribe only when it works.
+# -------------------------
+HEARTBEAT_SECONDS = 15
+
+WEBSOCKET_PATH = re.compile(r"^/ws/boards/(?P<board_id>\d+)/?$")
+
+
+def board_access(raw_token, board_id):
+    """None if allowed, else (status, error message)."""
+    if not raw_token:
+        return 401, "Authentication credentials were not provided."
+    auth = JWTAuthentication()
+    try:
+        user = auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return 401, "Token is invalid or expired."
+
+    workspace_id = (
+        Board.objects.filter(pk=board_id)
+        .values_list("project__workspace_id", flat=True)
+        .first()
+    )
+    if workspace_id is None or not is_workspace_member(user, workspace_id):
+        return 403, "You are not a member of this board's workspace."
+    return None
+
+
+def websocket_access(raw_token, board_id):
+    # outside Django's request cycle, so manage the connection like it would
+    close_old_connections()
+    try:
+        return board_access(raw_token, board_id)
+    finally:
+        close_old_connections()
+
+
+def token_from_request(request):
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header.removeprefix("Bearer ").strip()
+    return request.GET.get("token")
+
+
+async def board_events(request, board_id):
+    denied = await sync_to_async(board_access)(token_from_request(request), board_id)
+    if denied:
+        status, error = denied
+        return JsonResponse({"error": error}, status=status)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "Live board events need the ASGI server."}, status=400)
+    if request.GET.get("probe"):
+        return HttpResponse(status=204)
+
+    async def stream():
+        subscription = get_broker().subscribe(board_id)
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def board_websocket(scope, receive, send):
+    """Bare ASGI WebSocket app: pushes the board's events, ignores client messages."""
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    match = WEBSOCKET_PATH.match(scope["path"])
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token", [None])[0]
+    if match is None or await sync_to_async(websocket_access)(token, int(match["board_id"])):
+        await send({"type": "websocket.close", "code": 4403})
+        return
+
+    await send({"type": "websocket.accept"})
+    subscription = get_broker().subscribe(int(match["board_id"]))
+
+    async def push():
+        while True:
+            event = await subscription.get()
+            await send({"type": "websocket.send", "text": json.dumps(event)})
+
+    pusher = asyncio.create_task(push())
+    try:
+        while (await receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        pusher.cancel()
+        subscription.close()
@@ -1,11 +1,125 @@
-from .models import ActivityLog
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
 from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ActivityLog
+
+
+# -------------------------
+# ACTIVITY SINKS
+# Selected with settings.ACTIVITY_LOG_SINK.
+# -------------------------
+class SyncActivitySink:
+    """One INSERT per entry, inside the caller's transaction (default)."""
+
+    def write(self, entry):
+        entry.save()
+
+    def write_many(self, entries):
+        ActivityLog.objects.bulk_create(entries)
+
+    def flush(self):
+        pass
+
+
+class BufferedActivitySink:
+    """
+    Collects entries per worker process and writes them with bulk_create.
+
+    An entry only joins the buffer once the caller's transaction commits
+    (transaction.on_commit), so rolled-back requests never log anything.
+    The buffer is flushed when it reaches ACTIVITY_LOG_BATCH_SIZE entries,
+    ACTIVITY_LOG_FLUSH_INTERVAL seconds after the first buffered entry, and
+    at interpreter shutdown. Entries still buffered when a worker is killed
+    are lost, which is the trade-off for taking the insert off the hot path.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.batch_size = batch_size or settings.ACTIVITY_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.ACTIVITY_LOG_FLUSH_INTERVAL
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.timer = None
+        atexit.register(self.flush)
+
+    def write(self, entry):
+        self.write_many([entry])
 
-def log_activity(user, action, entity_type, entity_id):
-    ActivityLog.objects.create(
+    def write_many(self, entries):
+        transaction.on_commit(lambda: self.enqueue(entries))
+
+    def enqueue(self, entries):
+        with self.lock:
+            self.buffer.extend(entries)
+            full = len(self.buffer) >= self.batch_size
+            if not full and self.timer is None:
+                self.timer = threading.Timer(self.flush_interval, self.flush_from_timer)
+                self.timer.daemon = True
+                self.timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            entries, self.buffer = self.buffer, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if entries:
+            ActivityLog.objects.bulk_create(entries, batch_size=self.batch_size)
+
+    def flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # the timer thread got its own DB connection; don't leak it
+            connection.close()
+
+
+_sink = None
+
+
+def get_activity_sink():
+    global _sink
+    if _sink is None:
+        _sink = import_string(settings.ACTIVITY_LOG_SINK)()
+    return _sink
+
+
+def flush_activity():
+    get_activity_sink().flush()
+
+
+def log_activity(user, action, entity_type, entity_id, workspace_id=None):
+    get_activity_sink().write(ActivityLog(
         user=user,
         action=action,
         entity_type=entity_type,
         entity_id=entity_id,
+        workspace_id=workspace_id,
         created_at=timezone.now()
-    )
+    ))
+
+
+def log_activities(user, action, entity_type, entity_ids, workspaces=None):
+    """
+    One activity entry per entity id, written as a single batch.
+    `workspaces` maps entity id → workspace id.
+    """
+    now = timezone.now()
+    workspaces = workspaces or {}
+    get_activity_sink().write_many([
+        ActivityLog(
+            user=user,
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            workspace_id=workspaces.get(entity_id),
+            created_at=now,
+        )
+        for entity_id in entity_ids
+    ])
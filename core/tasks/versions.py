@@ -0,0 +1,103 @@
+from django.db import connection
+from rest_framework import status
+from rest_framework.response import Response
+
+from projects.models import Board
+from projects.permissions import is_workspace_member
+
+from .models import BoardVersion
+
+
+# -------------------------
+# BOARD VERSIONS / CONDITIONAL GET
+# Every write under a board bumps its row in board_version inside the
+# writing transaction. Board-scoped GETs answer with a weak ETag built from
+# that number, and a request whose If-None-Match still matches gets a 304
+# after one indexed lookup, without building the payload.
+# -------------------------
+
+def bump_board_versions(*board_ids):
+    """Increments the version of each board (ids), creating rows as needed."""
+    board_ids = sorted({board_id for board_id in board_ids if board_id is not None})
+    if not board_ids:
+        return
+
+    # sorted ids: concurrent writers lock the rows in the same order
+    table = BoardVersion._meta.db_table
+    rows = ", ".join(["(%s, 1)"] * len(board_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (board_id, version) VALUES {rows} "
+            f"ON CONFLICT (board_id) DO UPDATE SET version = {table}.version + 1",
+            board_ids,
+        )
+
+
+def board_etag(board_id, version):
+    return f'W/"board-{board_id}-v{version or 0}"'
+
+
+def etag_matches(header, etag):
+    """Weak comparison of an If-None-Match header against our ETag."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+class BoardETagMixin:
+    """
+    Conditional GET for board-scoped viewsets: `list` with ?board=<id> and
+    `retrieve`. `board_field` is the path from the viewset's model to Board.
+    """
+    board_field = "board"
+
+    def current_board_version(self):
+        """(board_id, version) if the request is board-scoped and visible, else None."""
+        if self.action == "retrieve":
+            model, pk, prefix = self.get_queryset().model, self.kwargs.get("pk"), f"{self.board_field}__"
+        elif self.action == "list":
+            model, pk, prefix = Board, self.request.query_params.get("board"), ""
+        else:
+            return None
+
+        # a malformed pk is the view's 404 / 400 to report, not ours
+        try:
+            row = model.objects.filter(pk=pk).values_list(
+                f"{prefix}id", f"{prefix}project__workspace_id", f"{prefix}version__version"
+            ).first()
+        except (TypeError, ValueError):
+            return None
+
+        if row is None or not is_workspace_member(self.request.user, row[1]):
+            return None
+        return row[0], row[2]
+
+    def conditional(self, view, request, *args, **kwargs):
+        if self.action == "list" and not request.query_params.get("board"):
+            return view(request, *args, **kwargs)
+
+        current = self.current_board_version()
+        if current is None:
+            return view(request, *args, **kwargs)
+
+        # read before the payload: a write racing with this request can only
+        # pair newer data with an older tag, which just costs a refetch
+        etag = board_etag(*current)
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view(request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
@@ -1,3 +1,8 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, ValidationError
@@ -14,15 +19,22 @@ from .serializers import (
     SprintSerializer,
     TaskSerializer,
     TaskCreateSerializer,
+    TaskMoveSerializer,
     TaskListSerializer,
     TaskAssigneeSerializer,
     CommentSerializer,
     ActivityLogSerializer,
 )
 
-from projects.models import WorkspaceMember
-from projects.permissions import is_workspace_admin  # ✅ clean, no cross-view import
+from projects.permissions import is_workspace_admin, is_workspace_member
+from .bulk import bulk_create_tasks, bulk_update_tasks, bulk_delete_tasks
+from .hierarchy import build_trees, subtree_tasks
+from .pagination import TaskPagination, CommentPagination, ActivityLogPagination
+from .ranking import next_position, place
+from . import sprints
 from .utils import log_activity
+from .versions import BoardETagMixin, bump_board_versions
+from .events import publish_board_event
 
 
 
@@ -30,63 +42,121 @@ from .utils import log_activity
 # -------------------------
 # SPRINT (READ ONLY)
 # -------------------------
-class SprintViewSet(ReadOnlyModelViewSet):
+class SprintViewSet(BoardETagMixin, ReadOnlyModelViewSet):
     serializer_class = SprintSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         # Visible only to members of the workspace the sprint belongs to
-        return Sprint.objects.filter(
-            board__project__workspace__workspacemember__user=self.request.user
-        ).distinct()
+        qs = Sprint.objects.visible_to(self.request.user)
+
+        # ?board= scopes the list, so its ETag (the board's version) covers it
+        board_id = self.request.query_params.get("board")
+        if board_id:
+            if not board_id.isdigit():
+                raise ValidationError({"board": ["Must be an integer."]})
+            qs = qs.filter(board_id=board_id)
+
+        return qs
+
+    # BURNDOWN / BURNUP
+    # GET /api/sprints/{id}/burndown/   [{ date, remaining, ideal }]
+    # GET /api/sprints/{id}/burnup/     [{ date, completed, scope }]
+    # Read from the daily sprint_snapshot rows (manage.py sprint_snapshots).
+    @action(detail=True, methods=["get"])
+    def burndown(self, request, pk=None):
+        sprint = self.get_object()
+        return Response({"sprint": sprint.id, "days": sprints.burndown(sprint)})
+
+    @action(detail=True, methods=["get"])
+    def burnup(self, request, pk=None):
+        sprint = self.get_object()
+        return Response({"sprint": sprint.id, "days": sprints.burnup(sprint)})
+
+    # VELOCITY
+    # GET /api/sprints/velocity/?board=<id>&limit=<n>
+    # Committed vs completed points of the board's last n finished sprints.
+    @action(detail=False, methods=["get"])
+    def velocity(self, request):
+        board_id = request.query_params.get("board")
+        if not board_id:
+            raise ValidationError({"board": ["This parameter is required."]})
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 6)), 52))
+        except ValueError:
+            raise ValidationError({"limit": ["Must be an integer."]})
+
+        finished = (
+            self.get_queryset()
+            .filter(board_id=board_id, end_date__lt=timezone.localdate())
+            .order_by("-end_date")[:limit]
+        )
+        return Response(sprints.velocity(finished))
 
 
 # -------------------------
 # TASK LIST (KANBAN COLUMNS)
 # -------------------------
-class TaskListViewSet(ReadOnlyModelViewSet):
+class TaskListViewSet(BoardETagMixin, ReadOnlyModelViewSet):
     serializer_class = TaskListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         board_id = self.request.query_params.get("board")
 
-        qs = TaskList.objects.filter(
-            board__project__workspace__workspacemember__user=self.request.user
-        )
+        qs = TaskList.objects.visible_to(self.request.user)
 
         if board_id:
             qs = qs.filter(board_id=board_id)
 
-        return qs.distinct()
+        return qs
 
 # -------------------------
 # TASK (KANBAN CARD)
 # -------------------------
-class TaskViewSet(ModelViewSet):
+class TaskViewSet(BoardETagMixin, ModelViewSet):
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskPagination
+    board_field = "board"
 
     def get_serializer_class(self):
-        if self.action == "create":
+        if self.action in ("create", "update", "partial_update"):
             return TaskCreateSerializer
         return TaskSerializer
 
+    # sparse fieldsets only for reads; writes need the whole row, and respond
+    # with (and publish) the whole task
+    sparse_actions = ("list", "retrieve", "tree", "descendants", "search")
+
     def get_queryset(self):
-        qs = Task.objects.filter(
-            task_list__board__project__workspace__workspacemember__user=self.request.user
-        ).distinct()
+        fields = self.card_fields() if self.action in self.sparse_actions else None
+        qs = Task.objects.visible_to(self.request.user).with_card_relations(fields)
 
         board_id = self.request.query_params.get("board")
         task_list_id = self.request.query_params.get("task_list")
 
         if board_id:
-            qs = qs.filter(task_list__board_id=board_id)
+            qs = qs.filter(board_id=board_id)
 
         if task_list_id:
             qs = qs.filter(task_list_id=task_list_id)
 
         return qs
 
+    # SPARSE FIELDSETS
+    # ?fields=title,status  ?exclude=description  ?view=card
+    # Unrequested fields are neither serialized nor loaded.
+    def card_fields(self):
+        if not hasattr(self, "_card_fields"):
+            self._card_fields = TaskSerializer.requested_fields(self.request.query_params)
+        return self._card_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.sparse_actions:
+            context["fields"] = self.card_fields()
+        return context
+
     # CREATE
     def perform_create(self, serializer):
         user = self.request.user
@@ -94,9 +164,10 @@ class TaskViewSet(ModelViewSet):
         task_list_id = serializer.validated_data.pop("task_list_id")
 
         try:
-            task_list = TaskList.objects.get(
-                id=task_list_id,
-                board__project__workspace__workspacemember__user=user,
+            task_list = (
+                TaskList.objects.visible_to(user)
+                .select_related("board__project")
+                .get(id=task_list_id)
             )
 
         except TaskList.DoesNotExist:
@@ -106,37 +177,199 @@ class TaskViewSet(ModelViewSet):
 
         task = serializer.save(
             created_by=user,
-            task_list=task_list,
+            position=next_position(task_list.id),
+            **task_list.task_location(),
         )
+        bump_board_versions(task.board_id)
+        publish_board_event(task.board_id, "task.created", task=serializer.data)
 
         log_activity(
             user=user,
             action="created task",
             entity_type="Task",
             entity_id=task.id,
+            workspace_id=task.workspace_id,
         )
 
     # UPDATE
     def perform_update(self, serializer):
         task = serializer.save()
+        bump_board_versions(task.board_id)
+        publish_board_event(task.board_id, "task.updated", task=serializer.data)
 
         log_activity(
             user=self.request.user,
             action="updated task",
             entity_type="Task",
             entity_id=task.id,
+            workspace_id=task.workspace_id,
         )
 
     # DELETE
     def perform_destroy(self, instance):
-        workspace = instance.task_list.board.project.workspace
-
-        if not is_workspace_admin(self.request.user, workspace):
+        if not is_workspace_admin(self.request.user, instance.workspace_id):
             raise PermissionDenied(
                 "Only workspace admins can delete tasks."
             )
 
+        task_id = instance.id
         instance.delete()
+        bump_board_versions(instance.board_id)
+        publish_board_event(instance.board_id, "task.deleted", id=task_id)
+
+    # TREE
+    # GET /api/tasks/{id}/tree/
+    # The task with all its descendants nested under "children", each node
+    # with a "rollup" of tasks / done / story points / done_ratio over its
+    # subtree. One recursive CTE, whatever the depth.
+    @action(detail=True, methods=["get"])
+    def tree(self, request, pk=None):
+        root = self.get_object()
+        return Response(self.subtrees([root.id])[0])
+
+    # DESCENDANTS (bulk)
+    # GET /api/tasks/descendants/?ids=<id>,<id>,...
+    # Same trees for several roots (e.g. every epic on a board) in one go.
+    @action(detail=False, methods=["get"])
+    def descendants(self, request):
+        try:
+            ids = [int(i) for i in request.query_params.get("ids", "").split(",") if i.strip()]
+        except ValueError:
+            raise ValidationError({"ids": ["Comma-separated task ids are required."]})
+        if not ids or len(ids) > settings.TASK_BULK_LIMIT:
+            raise ValidationError({"ids": [f"Between 1 and {settings.TASK_BULK_LIMIT} task ids are required."]})
+        return Response({"results": self.subtrees(ids)})
+
+    def subtrees(self, root_ids):
+        fields = self.card_fields()
+        if fields is not None:
+            # build_trees nests and rolls up on these
+            fields = fields | {"parent", "status", "story_points"}
+        tasks = subtree_tasks(root_ids, Task.objects.visible_to(self.request.user).with_card_relations(fields))
+        context = self.get_serializer_context()
+        return build_trees(root_ids, tasks, lambda task: TaskSerializer(task, context=context).data)
+
+    # SEARCH
+    # GET /api/tasks/search/?q=<text>&board=&sprint=&status=&assignee=&limit=
+    # Ranked full-text search over title + description in the caller's workspaces.
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        params = request.query_params
+        text = params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": ["A search query is required."]})
+
+        qs = Task.objects.visible_to(request.user).search(text)
+
+        if params.get("board"):
+            qs = qs.filter(board_id=params["board"])
+        if params.get("sprint"):
+            qs = qs.filter(sprint_id=params["sprint"])
+        if params.get("status"):
+            qs = qs.filter(status=params["status"])
+        if params.get("assignee"):
+            qs = qs.filter(task_assignees__user_id=params["assignee"])
+
+        try:
+            limit = int(params.get("limit", settings.API_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({"limit": ["Must be an integer."]})
+        limit = max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+
+        tasks = qs.with_card_relations(self.card_fields())[:limit]
+        serializer = TaskSerializer(tasks, many=True, context=self.get_serializer_context())
+        return Response({"results": serializer.data})
+
+    # BULK
+    # POST   /api/tasks/bulk/  { tasks: [ { title, task_list_id, ... }, ... ] }
+    # PATCH  /api/tasks/bulk/  { tasks: [ { id, ...changed fields }, ... ] }
+    # DELETE /api/tasks/bulk/  { ids:   [ ... ] }
+    # Items are validated independently; the response has one result per
+    # item, { index, id } or { index, errors }, in request order.
+    @action(detail=False, methods=["post", "patch", "delete"])
+    def bulk(self, request):
+        key = "ids" if request.method == "DELETE" else "tasks"
+        items = request.data.get(key) if isinstance(request.data, dict) else None
+
+        if not isinstance(items, list) or not items:
+            raise ValidationError({key: ["A non-empty list is required."]})
+        if len(items) > settings.TASK_BULK_LIMIT:
+            raise ValidationError({key: [f"At most {settings.TASK_BULK_LIMIT} items per request."]})
+
+        if request.method == "POST":
+            results = bulk_create_tasks(request.user, items)
+        elif request.method == "PATCH":
+            results = bulk_update_tasks(request.user, items)
+        else:
+            if not all(isinstance(task_id, int) for task_id in items):
+                raise ValidationError({key: ["Task ids must be integers."]})
+            results = bulk_delete_tasks(request.user, items)
+
+        return Response({"results": results})
+
+    # MOVE (drag & drop)
+    # POST /api/tasks/move/
+    # Body: { task, task_list, after?, before? }  or  { moves: [ ...same... ] }
+    # Every move in the body is applied in one transaction.
+    @action(detail=False, methods=["post"])
+    def move(self, request):
+        payload = request.data
+        if isinstance(payload, dict):
+            payload = payload.get("moves", [payload])
+        serializer = TaskMoveSerializer(data=payload, many=True)
+        serializer.is_valid(raise_exception=True)
+        moves = serializer.validated_data
+
+        user = request.user
+        task_ids = [m["task"] for m in moves]
+        list_ids = {m["task_list"] for m in moves}
+
+        with transaction.atomic():
+            tasks = (
+                Task.objects.visible_to(user)
+                .select_for_update()
+                .in_bulk(task_ids)
+            )
+            visible_lists = dict(
+                TaskList.objects.visible_to(user)
+                .filter(pk__in=list_ids)
+                .values_list("pk", "board_id")
+            )
+
+            if len(tasks) != len(set(task_ids)) or set(visible_lists) != list_ids:
+                raise ValidationError("Task or task list not found or access denied.")
+
+            # boards the cards leave and the boards they land on
+            bump_board_versions(
+                *(task.board_id for task in tasks.values()),
+                *visible_lists.values(),
+            )
+
+            for m in moves:
+                task = tasks[m["task"]]
+                source_board = task.board_id
+                try:
+                    place(task, m["task_list"], m.get("after"), m.get("before"))
+                except Task.DoesNotExist:
+                    raise ValidationError("'after' / 'before' must be a card in the target list.")
+
+                # a card moved to another board leaves its old board too
+                for board_id in {source_board, visible_lists[m["task_list"]]}:
+                    publish_board_event(
+                        board_id, "task.moved",
+                        id=task.id, task_list=task.task_list_id, position=task.position,
+                    )
+
+                log_activity(
+                    user=user,
+                    action="moved task",
+                    entity_type="Task",
+                    entity_id=m["task"],
+                    workspace_id=task.workspace_id,
+                )
+
+        moved = Task.objects.filter(pk__in=task_ids).with_card_relations()
+        return Response(TaskSerializer(moved, many=True, context=self.get_serializer_context()).data)
 # -------------------------
 # TASK ASSIGNEE
 # -------------------------
@@ -145,37 +378,50 @@ class TaskAssigneeViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return TaskAssignee.objects.filter(
-            task__task_list__board__project__workspace__workspacemember__user=self.request.user
-        ).distinct()
+        return TaskAssignee.objects.visible_to(self.request.user)
 
     def perform_create(self, serializer):
         task            = serializer.validated_data["task"]
         user_to_assign  = serializer.validated_data["user"]
-        workspace       = task.task_list.board.project.workspace
+        workspace       = task.workspace_id
 
         # The person being assigned must already be a workspace member
-        if not WorkspaceMember.objects.filter(
-            user=user_to_assign,
-            workspace=workspace,
-        ).exists():
+        if not is_workspace_member(user_to_assign, workspace):
             raise PermissionDenied("Cannot assign a user who is not a workspace member.")
 
-        assignee = serializer.save()
+        assignee = serializer.save(workspace_id=workspace)
+        bump_board_versions(task.board_id)
+        publish_board_event(
+            task.board_id, "assignee.added",
+            task=assignee.task_id,
+            user={"id": user_to_assign.id, "username": user_to_assign.username, "email": user_to_assign.email},
+        )
 
         log_activity(
             user=self.request.user,
             action="assigned user",
             entity_type="Task",
             entity_id=assignee.task.id,
+            workspace_id=workspace,
         )
 
     # Only ADMINs can remove assignees
     def perform_destroy(self, instance):
-        workspace = instance.task.task_list.board.project.workspace
-        if not is_workspace_admin(self.request.user, workspace):
+        if not is_workspace_admin(self.request.user, instance.workspace_id):
             raise PermissionDenied("Only workspace admins can remove assignees.")
         instance.delete()
+        bump_board_versions(instance.task.board_id)
+        publish_board_event(
+            instance.task.board_id, "assignee.removed",
+            task=instance.task_id, user=instance.user_id,
+        )
+
+    def perform_update(self, serializer):
+        previous = serializer.instance.task.board_id
+        task = serializer.validated_data.get("task", serializer.instance.task)
+        assignee = serializer.save(workspace_id=task.workspace_id)
+        bump_board_versions(previous, assignee.task.board_id)
+        publish_board_event(assignee.task.board_id, "assignee.updated", assignee=serializer.data)
 
 
 # -------------------------
@@ -184,41 +430,59 @@ class TaskAssigneeViewSet(ModelViewSet):
 class CommentViewSet(ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CommentPagination
 
     def get_queryset(self):
-        return Comment.objects.filter(
-            task__task_list__board__project__workspace__workspacemember__user=self.request.user
-        ).distinct()
+        qs = Comment.objects.visible_to(self.request.user).select_related("user")
+
+        task_id = self.request.query_params.get("task")
+        if task_id:
+            qs = qs.filter(task_id=task_id)
+
+        return qs
 
     def perform_create(self, serializer):
         task      = serializer.validated_data["task"]
-        workspace = task.task_list.board.project.workspace
+        workspace = task.workspace_id
 
-        if not WorkspaceMember.objects.filter(
-            user=self.request.user,
-            workspace=workspace,
-        ).exists():
+        if not is_workspace_member(self.request.user, workspace):
             raise PermissionDenied("Not a workspace member.")
 
-        comment = serializer.save(user=self.request.user)
+        comment = serializer.save(user=self.request.user, workspace_id=workspace)
+        bump_board_versions(task.board_id)
+        publish_board_event(task.board_id, "comment.created", comment=serializer.data)
 
         log_activity(
             user=self.request.user,
             action="commented on task",
             entity_type="Task",
             entity_id=comment.task.id,
+            workspace_id=workspace,
         )
 
     # Users can only delete their own comments; ADMINs can delete any
     def perform_destroy(self, instance):
-        workspace = instance.task.task_list.board.project.workspace
+        workspace = instance.workspace_id
         is_own    = instance.user == self.request.user
         is_admin  = is_workspace_admin(self.request.user, workspace)
 
         if not is_own and not is_admin:
             raise PermissionDenied("You can only delete your own comments.")
 
+        comment_id = instance.id
         instance.delete()
+        bump_board_versions(instance.task.board_id)
+        publish_board_event(
+            instance.task.board_id, "comment.deleted",
+            task=instance.task_id, id=comment_id,
+        )
+
+    def perform_update(self, serializer):
+        previous = serializer.instance.task.board_id
+        task = serializer.validated_data.get("task", serializer.instance.task)
+        comment = serializer.save(workspace_id=task.workspace_id)
+        bump_board_versions(previous, comment.task.board_id)
+        publish_board_event(comment.task.board_id, "comment.updated", comment=serializer.data)
 
 
 # -------------------------
@@ -227,8 +491,16 @@ class CommentViewSet(ModelViewSet):
 class ActivityLogViewSet(ReadOnlyModelViewSet):
     serializer_class = ActivityLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ActivityLogPagination
 
     def get_queryset(self):
-        return ActivityLog.objects.filter(
-            user__workspacemember__workspace__workspacemember__user=self.request.user
-        ).distinct()
\ No newline at end of file
+        qs = ActivityLog.objects.visible_to(self.request.user).select_related("user")
+
+        # history of one entity, e.g. ?entity_type=Task&entity_id=42
+        entity_type = self.request.query_params.get("entity_type")
+        entity_id = self.request.query_params.get("entity_id")
+
+        if entity_type and entity_id:
+            qs = qs.filter(entity_type=entity_type, entity_id=entity_id)
+
+        return qs
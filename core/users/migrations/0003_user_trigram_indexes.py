@@ -0,0 +1,39 @@
+# Generated by Django 5.2.11 on 2026-10-18 18:10
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# Trigram GIN indexes on auth_user so the typeahead's substring search is
+# an index scan rather than a full table scan. On Postgres icontains
+# compiles to UPPER(col::text) LIKE UPPER(%s), so the UPPER() expressions
+# are indexed, not the plain columns. Built concurrently so a large
+# auth_user stays writable.
+
+INDEXES = {
+    "auth_user_email_upper_trgm_idx":    "UPPER(email::text)",
+    "auth_user_username_upper_trgm_idx": "UPPER(username::text)",
+}
+
+
+def create_index(name, expression):
+    return migrations.RunSQL(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+        f"ON auth_user USING gin (({expression}) gin_trgm_ops)",
+        f"DROP INDEX CONCURRENTLY IF EXISTS {name}",
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0002_delete_userprofile'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        *(create_index(name, expression) for name, expression in INDEXES.items()),
+    ]
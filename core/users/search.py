@@ -0,0 +1,103 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from core.caching import cache_is_shared
+from projects.models import WorkspaceMember
+
+
+# =========================
+# USER TYPEAHEAD SEARCH
+# Substring match on email / username, served by the pg_trgm GIN indexes
+# on UPPER(email) / UPPER(username) from users migration 0003 (icontains
+# compiles to UPPER(col::text) LIKE UPPER(%s)). Prefix matches rank first,
+# then trigram similarity. With a shared cache backend results are cached
+# per (scope, workspace, query) for USER_SEARCH_CACHE_TTL seconds, and
+# membership changes bump a per-workspace generation so stale pages are
+# never served after an invite or removal. A per-process cache couldn't
+# pass that bump to other workers, so results aren't cached with it.
+# =========================
+RESULT_LIMIT = 5
+
+_has_trigram = {}
+
+
+def trigram_available():
+    """Whether pg_trgm is installed on the default database (checked once)."""
+    if connection.vendor != "postgresql":
+        return False
+    if connection.alias not in _has_trigram:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _has_trigram[connection.alias] = cursor.fetchone() is not None
+    return _has_trigram[connection.alias]
+
+
+def _generation_key(workspace_id):
+    return f"user_search_gen:{workspace_id}"
+
+
+def _generation(workspace_id):
+    return cache.get_or_set(_generation_key(workspace_id), 0, None)
+
+
+def invalidate_user_search(workspace_id):
+    """Call after adding or removing a workspace member."""
+    try:
+        cache.incr(_generation_key(workspace_id))
+    except ValueError:
+        cache.set(_generation_key(workspace_id), 1, None)
+
+
+def ranked_users(query, users=None):
+    """Users whose email or username contains `query`, best matches first."""
+    users = User.objects.all() if users is None else users
+    users = users.filter(Q(email__icontains=query) | Q(username__icontains=query))
+
+    prefix_rank = Case(
+        When(email__istartswith=query, then=Value(0)),
+        When(username__istartswith=query, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+    users = users.annotate(prefix_rank=prefix_rank)
+
+    if trigram_available():
+        users = users.annotate(
+            similarity=Greatest(TrigramSimilarity("email", query), TrigramSimilarity("username", query))
+        )
+        return users.order_by("prefix_rank", "-similarity", "email")
+    return users.order_by("prefix_rank", "email")
+
+
+def _search(query, workspace_id, members, limit):
+    member_ids = WorkspaceMember.objects.filter(workspace_id=workspace_id).values("user_id")
+    users = User.objects.filter(pk__in=member_ids) if members else User.objects.exclude(pk__in=member_ids)
+    return list(ranked_users(query, users).values("id", "email", "username")[:limit])
+
+
+def find_users(query, workspace_id, members, limit=RESULT_LIMIT):
+    """
+    Top matches as [{id, email, username}]. `members=True` searches the
+    workspace's members (assignee lookup), `members=False` everyone else
+    (invite lookup).
+    """
+    query = query.lower()
+    if not cache_is_shared():
+        return _search(query, workspace_id, members, limit)
+
+    scope = "members" if members else "invite"
+    digest = hashlib.md5(query.encode()).hexdigest()
+    key = f"user_search:{scope}:{workspace_id}:{_generation(workspace_id)}:{limit}:{digest}"
+
+    results = cache.get(key)
+    if results is None:
+        results = _search(query, workspace_id, members, limit)
+        cache.set(key, results, settings.USER_SEARCH_CACHE_TTL)
+    return results
@@ -1,3 +1,80 @@
-from django.test import TestCase
+import tempfile
+from importlib import import_module
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from projects.models import Workspace, WorkspaceMember
+from .search import ranked_users
+
+
+class UserSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user("admin", "admin@example.com", "pw")
+        self.workspace = Workspace.objects.create(name="Acme", owner=self.admin)
+        WorkspaceMember.objects.create(workspace=self.workspace, user=self.admin, role="ADMIN")
+        self.client.force_authenticate(self.admin)
+
+    def test_prefix_matches_rank_before_substring_matches(self):
+        User.objects.create_user("zed", "mary.ann@example.com")
+        User.objects.create_user("annie", "annie@example.com")
+        User.objects.create_user("bob", "bob@ann.io")
+
+        response = self.client.get("/api/search-user/", {"q": "ann", "workspace": self.workspace.id})
+
+        emails = [u["email"] for u in response.data]
+        self.assertEqual(emails[0], "annie@example.com")
+        self.assertCountEqual(emails, ["annie@example.com", "mary.ann@example.com", "bob@ann.io"])
+
+    def test_member_search_matches_username(self):
+        dev = User.objects.create_user("devon", "d@example.com")
+        WorkspaceMember.objects.create(workspace=self.workspace, user=dev)
+        User.objects.create_user("devlin", "outsider@example.com")
+
+        response = self.client.get("/api/users/search/", {"q": "dev", "workspace": self.workspace.id})
+
+        self.assertEqual([u["id"] for u in response.data], [dev.id])
+
+    def test_cached_invite_results_refresh_after_member_added(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location,
+        }}):
+            self.check_invite_results_refresh()
+
+    def test_results_are_not_cached_per_process(self):
+        self.check_invite_results_refresh()
+        self.assertFalse(any(key.startswith(":1:user_search:") for key in cache._cache))
+
+    def check_invite_results_refresh(self):
+        User.objects.create_user("carol", "carol@example.com")
+        params = {"q": "carol", "workspace": self.workspace.id}
+        self.assertEqual(len(self.client.get("/api/search-user/", params).data), 1)
+
+        self.client.post(
+            "/api/add-workspace-member/",
+            {"workspace": self.workspace.id, "email": "carol@example.com"},
+        )
+
+        self.assertEqual(self.client.get("/api/search-user/", params).data, [])
+
+    def test_substring_filter_uses_the_trigram_indexes(self):
+        # the test database is built from the models, so add the indexes
+        # from users migration 0003 here (not concurrently: we're in a transaction)
+        migration = import_module("users.migrations.0003_user_trigram_indexes")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                self.skipTest("pg_trgm is not installed on this server")
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for name, expression in migration.INDEXES.items():
+                cursor.execute(f"CREATE INDEX {name} ON auth_user USING gin (({expression}) gin_trgm_ops)")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        plan = User.objects.filter(pk__in=ranked_users("ann").values("pk")).explain()
+
+        self.assertIn("auth_user_email_upper_trgm_idx", plan)
+        self.assertIn("auth_user_username_upper_trgm_idx", plan)
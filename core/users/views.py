@@ -8,6 +8,8 @@ from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from .serializers import RegisterSerializer, UserSerializer
 from projects.models import WorkspaceMember
+from projects.permissions import is_workspace_member
+from .search import find_users
 
 
 # =========================
@@ -58,24 +60,18 @@ class WorkspaceUserViewSet(ReadOnlyModelViewSet):
             return User.objects.none()
 
         # Caller must themselves be a member of the requested workspace
-        caller_is_member = WorkspaceMember.objects.filter(
-            user=self.request.user,
-            workspace_id=workspace_id,
-        ).exists()
-
-        if not caller_is_member:
+        if not is_workspace_member(self.request.user, workspace_id):
             return User.objects.none()
 
-        return (
-            User.objects.filter(workspacemember__workspace_id=workspace_id)
-            .distinct()
-            .order_by("email")
-        )
+        return User.objects.filter(
+            pk__in=WorkspaceMember.objects.filter(workspace_id=workspace_id).values("user_id")
+        ).order_by("email")
 
 
 # =========================
 # SEARCH USERS (for task assignee search within a workspace)
-# GET /api/users/search/?q=<email>&workspace=<id>
+# GET /api/users/search/?q=<email or username>&workspace=<id>
+# Prefix matches first, then by trigram similarity (users/search.py).
 #
 # NOTE: To invite NEW users to a workspace use:
 #       GET /api/search-user/?q=<email>&workspace=<id>   (admin only)
@@ -97,28 +93,11 @@ def search_users(request):
         )
 
     # Caller must be a member of the workspace they're searching within
-    caller_is_member = WorkspaceMember.objects.filter(
-        user=request.user,
-        workspace_id=workspace_id,
-    ).exists()
-
-    if not caller_is_member:
+    if not is_workspace_member(request.user, workspace_id):
         return Response(
             {"error": "You are not a member of this workspace."},
             status=status.HTTP_403_FORBIDDEN,
         )
 
     # Only search within that workspace's existing members
-    users = (
-        User.objects.filter(
-            workspacemember__workspace_id=workspace_id,
-            email__icontains=query,
-        )
-        .distinct()
-        .order_by("email")[:5]
-    )
-
-    return Response([
-        {"id": u.id, "email": u.email, "username": u.username}
-        for u in users
-    ])
\ No newline at end of file
+    return Response(find_users(query, workspace_id, members=True))
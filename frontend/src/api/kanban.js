@@ -6,5 +6,18 @@ export const getTaskLists = (boardId) =>
 export const getTasks = () =>
   api.get("tasks/");
 
+// { task_list, after?, before? } — after/before: id of the neighbouring card
 export const moveTask = (taskId, data) =>
-  api.patch(`tasks/${taskId}/`, data);
+  api.post("tasks/move/", { task: taskId, ...data });
+
+// every comment on the task; follows the paginated `next` links
+export const getComments = async (taskId) => {
+  const comments = [];
+  let url = `comments/?task=${taskId}&page_size=200`;
+  while (url) {
+    const { data } = await api.get(url);
+    comments.push(...data.results);
+    url = data.next;
+  }
+  return comments;
+};
@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import api from "../api/axios";
+import { getComments } from "../api/kanban";
 
 // ── CONSTANTS ─────────────────────────────────────────────────────────
 const PRIORITY_CONFIG = {
@@ -59,7 +60,7 @@ function TaskDetailPanel({ task, workspaceId, onClose, onSaved }) {
   useEffect(() => {
     setForm({ ...task });
     setEditing(false);
-    api.get(`/comments/?task=${task.id}`).then(r => setComments(r.data)).catch(() => {});
+    getComments(task.id).then(setComments).catch(() => {});
   }, [task.id]);
 
   const handleAddTask = async (column) => {
@@ -93,7 +94,7 @@ function TaskDetailPanel({ task, workspaceId, onClose, onSaved }) {
     if (!newComment.trim()) return;
     await api.post("/comments/", { task: task.id, message: newComment });
     setNewComment("");
-    api.get(`/comments/?task=${task.id}`).then(r => setComments(r.data)).catch(() => {});
+    getComments(task.id).then(setComments).catch(() => {});
   };
 
   const prio = PRIORITY_CONFIG[form.priority] || PRIORITY_CONFIG.MEDIUM;
@@ -309,18 +310,75 @@ export default function KanbanBoard({ selectedProject, selectedWorkspace }) {
     loadBoardData(activeBoard.id);
   }, [activeBoard?.id]);
 
+  // ── live updates: apply the board's event deltas ─────────────────
+  // the probe answers 204 only when the server can stream (ASGI), so a
+  // plain runserver / WSGI deployment just skips live updates
+  useEffect(() => {
+    if (!activeBoard) return;
+    let source = null;
+    let cancelled = false;
+    api.get(`/boards/${activeBoard.id}/events/`, { params: { probe: 1 } })
+      .then(() => { if (!cancelled) source = subscribe(); })
+      .catch(() => {});
+    return () => { cancelled = true; source?.close(); };
+  }, [activeBoard?.id]);
+
+  const subscribe = () => {
+    const token  = localStorage.getItem("access_token");
+    const source = new EventSource(
+      `${api.defaults.baseURL}/boards/${activeBoard.id}/events/?token=${encodeURIComponent(token)}`
+    );
+
+    const removeCard = (prev, id) => {
+      const next = {};
+      Object.keys(prev).forEach(cid => { next[cid] = prev[cid].filter(t => t.id !== id); });
+      return next;
+    };
+    const putCard = (prev, card) => {
+      const next = removeCard(prev, card.id);
+      if (next[card.task_list]) {
+        next[card.task_list] = [...next[card.task_list], card].sort((a, b) => a.position - b.position);
+      }
+      return next;
+    };
+    const on = (type, handler) =>
+      source.addEventListener(type, e => handler(JSON.parse(e.data)));
+
+    on("task.created", e => setTasksByCol(prev => putCard(prev, e.task)));
+    on("task.updated", e => setTasksByCol(prev => putCard(prev, e.task)));
+    on("task.deleted", e => setTasksByCol(prev => removeCard(prev, e.id)));
+    on("task.moved",   e => setTasksByCol(prev => {
+      const card = Object.values(prev).flat().find(t => t.id === e.id);
+      if (!card) return prev;
+      return putCard(prev, { ...card, task_list: e.task_list, position: e.position });
+    }));
+    on("assignee.added", e => setTasksByCol(prev => {
+      const card = Object.values(prev).flat().find(t => t.id === e.task);
+      if (!card || card.assignees.some(a => a.id === e.user.id)) return prev;
+      return putCard(prev, { ...card, assignees: [...card.assignees, e.user] });
+    }));
+    on("assignee.removed", e => setTasksByCol(prev => {
+      const card = Object.values(prev).flat().find(t => t.id === e.task);
+      if (!card) return prev;
+      return putCard(prev, { ...card, assignees: card.assignees.filter(a => a.id !== e.user) });
+    }));
+    // bulk changes and overflowed queues: reload the whole board
+    ["tasks.created", "tasks.updated", "tasks.deleted", "resync"].forEach(type =>
+      on(type, () => loadBoardData(activeBoard.id))
+    );
+
+    return source;
+  };
+
   const loadBoardData = async (boardId) => {
     setLoadingBoard(true);
     try {
-      const [colsRes, tasksRes] = await Promise.all([
-      api.get(`/task-lists/?board=${boardId}`),
-      api.get(`/tasks/?board=${boardId}`),
-    ]);
-      const cols  = colsRes.data.sort((a, b) => a.position - b.position);
-      const tasks = tasksRes.data;
+      // ✅ one round-trip: columns with their cards already grouped
+      const res  = await api.get(`/boards/${boardId}/snapshot/`);
+      const cols = res.data.columns.sort((a, b) => a.position - b.position);
       const grouped = {};
-      cols.forEach(c => { grouped[c.id] = tasks.filter(t => t.task_list === c.id); });
-      setColumns(cols);
+      cols.forEach(c => { grouped[c.id] = c.tasks; });
+      setColumns(cols.map(({ tasks, ...col }) => col));
       setTasksByCol(grouped);
     } catch (err) {
       console.error("Failed to load board data:", err);